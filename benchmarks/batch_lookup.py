@@ -0,0 +1,46 @@
+"""大量のコードの検索について、辞書を1件ずつ引く場合と、
+jma_codes.batch (numpy.searchsorted) でまとめて引く場合とを比較する
+
+$ python benchmarks/batch_lookup.py [件数]
+
+市町村等のコード (一部は存在しないコード) から、name, fuken, ichiji を引く。
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from jma_codes import load_table
+from jma_codes.batch import load_columns
+
+COLUMNS = ["name", "fuken", "ichiji"]
+
+
+def main(n: int) -> None:
+    items = load_table("forecast_area_tree")["items"]
+    rng = np.random.default_rng(0)
+    codes = rng.choice(np.array(list(items) + ["9999999"], dtype=str), size=n)
+
+    t = time.perf_counter()
+    expected = {column: [] for column in COLUMNS}
+    for code in codes.tolist():
+        item = items.get(code, {})
+        for column in COLUMNS:
+            expected[column].append(item.get(column))
+    by_dict = time.perf_counter() - t
+
+    table = load_columns("forecast_area_tree")
+    t = time.perf_counter()
+    result = table.lookup(codes, COLUMNS)
+    batch = time.perf_counter() - t
+
+    for column in COLUMNS:
+        assert result[column].tolist() == expected[column]
+    print(f"codes={n} missing={(~result['found']).sum()}")
+    print(f"{'dict':<8} {by_dict:>7.3f} s  {n / by_dict / 1e6:>6.2f} M codes/s")
+    print(f"{'batch':<8} {batch:>7.3f} s  {n / batch / 1e6:>6.2f} M codes/s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,83 @@
+"""震度観測点の表を、辞書として読み込む場合と mmap インデックスを使う場合とで、
+ワーカープロセスごとのメモリ使用量を比較する
+
+$ python -m tools.code_index
+$ python benchmarks/code_index_rss.py [ワーカー数]
+
+RSS には共有ページも含まれるため、共有分を按分した PSS と、
+プロセス固有の Private もあわせて表示する。
+"""
+
+import json
+import multiprocessing as mp
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TABLES = ["PointSeismicIntensity", "PointRealtimeSeismicIntensity"]
+PARTS = ["pointToCity", "cityToSaibun"]
+
+
+def _memory_kb() -> dict[str, int]:
+    result = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                result[key] = int(value.split()[0])
+    return {
+        "rss": result["Rss"],
+        "pss": result["Pss"],
+        "private": result["Private_Clean"] + result["Private_Dirty"],
+    }
+
+
+def _worker(mode: str, barrier, queue) -> None:
+    from jma_codes.codeindex import load_index
+
+    before = _memory_kb()
+    tables = []
+    for name in TABLES:
+        if mode == "dict":
+            with open(ROOT / "json" / f"{name}.json", encoding="utf-8") as f:
+                data = json.load(f)
+            tables.extend(data[part] for part in PARTS)
+        else:
+            tables.extend(load_index(name, part) for part in PARTS)
+
+    # すべてのコードを引いて、インデックスの全ページに触れておく
+    for table in tables:
+        for code in list(table):
+            table[code]
+
+    barrier.wait()  # 全ワーカーが読み込み終えた状態で計測する
+    after = _memory_kb()
+    queue.put({k: after[k] - before[k] for k in after})
+    barrier.wait()
+
+
+def run(mode: str, workers: int) -> dict[str, float]:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(mode, barrier, queue)) for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {k: sum(r[k] for r in results) / workers for k in results[0]}
+
+
+def main(workers: int) -> None:
+    print(f"{workers} workers, per-process increase after loading (KB)")
+    print(f"{'mode':<6} {'RSS':>8} {'PSS':>8} {'Private':>8}")
+    for mode in ["dict", "mmap"]:
+        r = run(mode, workers)
+        print(f"{mode:<6} {r['rss']:>8.0f} {r['pss']:>8.0f} {r['private']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,129 @@
+"""震度観測点と K-net 観測点の名前の照合 (IntensityPoints.find_station) について、
+都道府県ごとの索引を使う場合と、従来の全件走査とを比較する
+
+$ python benchmarks/find_station.py [K-net 観測点数] [照合回数]
+
+ネットワークに依存しないよう、合成したデータを使う。
+両者の結果が一致することは tests/test_find_station.py で確認している。
+"""
+
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tools.utils.seisvolc_point import (  # noqa: E402
+    _REMOVE_CITY_PAT,
+    PREFECTURE_MAP,
+    IntensityPoints,
+    PointInfo,
+)
+
+CHARS = "山川田中大小上下本新北南東西原島野井沢岡村木松宮高石谷津浜崎"
+
+
+def find_station_linear(
+    self: IntensityPoints, jma_name: str, jma_city_code: str
+) -> Optional[PointInfo]:
+    """索引を使わない、従来の照合"""
+
+    if point := self._jma_points.get(jma_name):
+        return point
+
+    prefecture = PREFECTURE_MAP[jma_city_code[:2]]
+    found: list[PointInfo] = []
+    stripped_jma_name = _REMOVE_CITY_PAT.sub("", jma_name)
+    for (_, name), info in self._nied_points.items():
+        if info.prefecture != prefecture:
+            continue
+        if name in stripped_jma_name:
+            found.append(info)
+    if not found:
+        pass
+    elif len(found) == 1:
+        return found[0]
+    else:
+        for info in found:
+            if stripped_jma_name.endswith(info.name):
+                return info
+        found.sort(key=lambda x: len(stripped_jma_name) - len(x.name))
+        return found[0]
+
+    if station := self._jma_json_points.get(jma_name):
+        return station
+    return None
+
+
+def _word(rng: random.Random, lo: int, hi: int) -> str:
+    return "".join(rng.choices(CHARS, k=rng.randint(lo, hi)))
+
+
+def make_points(n_sites: int, seed: int = 0) -> IntensityPoints:
+    rng = random.Random(seed)
+    points = IntensityPoints.__new__(IntensityPoints)
+    points._jma_points = {}
+    points._jma_json_points = {}
+    points._nied_points = {}
+    prefectures = list(PREFECTURE_MAP.values())
+    for _ in range(n_sites):
+        pref = rng.choice(prefectures)
+        name = _word(rng, 2, 4)
+        points._nied_points[(pref, name)] = PointInfo(
+            kind="k-net",
+            name=name,
+            lat=rng.uniform(24, 46),
+            lng=rng.uniform(123, 146),
+            prefecture=pref,
+        )
+    points._index_nied()
+    return points
+
+
+def make_queries(
+    points: IntensityPoints, n: int, seed: int = 1
+) -> list[tuple[str, str]]:
+    """K-net の観測点名を含む名前 (一部は含まない名前) を作る"""
+
+    rng = random.Random(seed)
+    code_of = {v: k for k, v in PREFECTURE_MAP.items()}
+    sites = list(points._nied_points)
+    queries = []
+    for _ in range(n):
+        pref, name = rng.choice(sites)
+        if rng.random() < 0.2:
+            name = _word(rng, 2, 4)
+        city = _word(rng, 1, 3) + rng.choice("市町村区")
+        name = _word(rng, 0, 2) + name + _word(rng, 0, 2)
+        queries.append((city + name, code_of[pref] + "100"))
+    return queries
+
+
+def main(n_sites: int, n_queries: int) -> None:
+    logging.getLogger("tools.utils.seisvolc_point").setLevel(logging.ERROR)
+    points = make_points(n_sites)
+    queries = make_queries(points, n_queries)
+
+    t = time.perf_counter()
+    for q in queries:
+        find_station_linear(points, *q)
+    linear = time.perf_counter() - t
+
+    t = time.perf_counter()
+    found = [points.find_station(*q) for q in queries]
+    indexed = time.perf_counter() - t
+
+    matched = sum(r is not None for r in found)
+    print(f"sites={n_sites} queries={n_queries} matched={matched}")
+    print(f"{'linear':<10} {linear * 1000:>9.1f} ms")
+    print(f"{'indexed':<10} {indexed * 1000:>9.1f} ms  (x{linear / indexed:.0f})")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1700,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4400,
+    )
@@ -0,0 +1,84 @@
+"""コード表の読み込み時間とメモリ使用量を、JSONとスナップショットで比較する
+
+$ python -m tools.snapshot
+$ python benchmarks/load_tables.py [テーブル名 ...]
+"""
+
+import json
+import os
+import pickle
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+JSON_DIR = ROOT / "json"
+SNAPSHOT_DIR = ROOT / "src" / "jma_codes" / "snapshot"
+
+DEFAULT_TABLES = ["PointSeismicIntensity", "forecast_area_tree", "amedas_ame"]
+
+
+def _load(kind: str, name: str):
+    if kind == "json":
+        with open(JSON_DIR / f"{name}.json", encoding="utf-8") as f:
+            return json.load(f)
+    else:
+        with open(SNAPSHOT_DIR / f"{name}.pickle", "rb") as f:
+            return pickle.load(f)
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def _child(kind: str, name: str) -> None:
+    """別プロセスで1回だけ読み込み、時間とRSSの増分を出力する"""
+
+    before = _rss_kb()
+    t = time.perf_counter()
+    data = _load(kind, name)
+    elapsed = time.perf_counter() - t
+    after = _rss_kb()
+    assert data
+    print(json.dumps({"ms": elapsed * 1000, "rss_kb": after - before}))
+
+
+def main(names: list[str]) -> None:
+    if not SNAPSHOT_DIR.is_dir():
+        sys.exit("snapshot not found; run `python -m tools.snapshot` first")
+
+    print(
+        f"{'table':<28} {'kind':<9} {'size KB':>9} {'cold ms':>9} {'warm ms':>9} {'RSS KB':>9}"
+    )
+    for name in names:
+        for kind, path in [
+            ("json", JSON_DIR / f"{name}.json"),
+            ("snapshot", SNAPSHOT_DIR / f"{name}.pickle"),
+        ]:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", kind, name],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            cold = json.loads(out)
+
+            n = 10
+            t = time.perf_counter()
+            for _ in range(n):
+                _load(kind, name)
+            warm = (time.perf_counter() - t) / n * 1000
+
+            size = path.stat().st_size / 1024
+            print(
+                f"{name:<28} {kind:<9} {size:>9.0f} {cold['ms']:>9.2f} {warm:>9.2f} {cold['rss_kb']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+    else:
+        main(sys.argv[1:] or DEFAULT_TABLES)
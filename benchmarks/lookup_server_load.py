@@ -0,0 +1,167 @@
+"""コード表の HTTP サーバ (jma_codes.server) の負荷試験
+
+$ python benchmarks/lookup_server_load.py [秒数] [接続数]
+
+サーバを別プロセスで起動し、持続接続 (keep-alive) を張った複数のクライアントから
+次のリクエストを繰り返し送り、種類ごとのレイテンシ (p50, p99) と1秒あたりのリクエスト数を出力する。
+
+- single: GET /tables/PointSeismicIntensity/pointToCity/{コード}
+- etag: 同じリクエストに If-None-Match を付けたもの (304)
+- batch-get: GET /tables/PointSeismicIntensity/pointToCity?codes=... (100 コード)
+- batch-post: POST /lookup (table, 1000 コード)
+- resolve: POST /lookup (codeType, 1000 コード)
+"""
+
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from jma_codes import load_table
+
+TABLE, PART = "PointSeismicIntensity", "pointToCity"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(
+    method: str,
+    path: str,
+    body: bytes = b"",
+    headers: Optional[dict[str, str]] = None,
+) -> bytes:
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    if body:
+        lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8") + body
+
+
+async def _roundtrip(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: bytes
+) -> tuple[int, dict[str, str], bytes]:
+    writer.write(request)
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {
+        k.strip().lower(): v.strip()
+        for k, _, v in (line.partition(":") for line in lines[1:] if line)
+    }
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    return status, headers, body
+
+
+def _requests(rng: random.Random, codes: list[str], etag: str) -> dict[str, bytes]:
+    code = rng.choice(codes)
+    many = rng.sample(codes, 1000)
+    return {
+        "single": _request("GET", f"/tables/{TABLE}/{PART}/{code}"),
+        "etag": _request(
+            "GET", f"/tables/{TABLE}/{PART}/{code}", headers={"If-None-Match": etag}
+        ),
+        "batch-get": _request(
+            "GET", f"/tables/{TABLE}/{PART}?codes={','.join(many[:100])}"
+        ),
+        "batch-post": _request(
+            "POST",
+            "/lookup",
+            json.dumps({"table": TABLE, "part": PART, "codes": many}).encode(),
+        ),
+        "resolve": _request(
+            "POST",
+            "/lookup",
+            json.dumps({"codeType": "震度観測点", "codes": many}).encode(),
+        ),
+    }
+
+
+EXPECTED = {
+    "single": 200,
+    "etag": 304,
+    "batch-get": 200,
+    "batch-post": 200,
+    "resolve": 200,
+}
+
+
+async def _client(
+    port: int, seed: int, codes: list[str], etag: str, deadline: float
+) -> dict[str, list[float]]:
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    latencies: dict[str, list[float]] = {kind: [] for kind in EXPECTED}
+    while time.perf_counter() < deadline:
+        for kind, request in _requests(rng, codes, etag).items():
+            t = time.perf_counter()
+            status, _, _ = await _roundtrip(reader, writer, request)
+            latencies[kind].append(time.perf_counter() - t)
+            assert status == EXPECTED[kind], (kind, status)
+    writer.close()
+    return latencies
+
+
+def _percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(port: int, seconds: float, connections: int) -> None:
+    codes = sorted(load_table(TABLE)[PART])
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _, headers, _ = await _roundtrip(
+        reader, writer, _request("GET", f"/tables/{TABLE}/{PART}/{codes[0]}")
+    )
+    writer.close()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            _client(port, i, codes, headers["etag"], start + seconds)
+            for i in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    print(f"{connections} connections, {elapsed:.1f} s")
+    print(f"{'request':<11} {'count':>7} {'p50 (ms)':>9} {'p99 (ms)':>9} {'req/s':>8}")
+    total = 0
+    for kind in EXPECTED:
+        values = [v for r in results for v in r[kind]]
+        total += len(values)
+        print(
+            f"{kind:<11} {len(values):>7} {_percentile(values, 0.5) * 1e3:>9.2f}"
+            f" {_percentile(values, 0.99) * 1e3:>9.2f} {len(values) / elapsed:>8.1f}"
+        )
+    print(f"{'total':<11} {total:>7} {'':>9} {'':>9} {total / elapsed:>8.1f}")
+
+
+def main(seconds: float, connections: int) -> None:
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "jma_codes.server", "--port", str(port)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert server.stdout is not None
+        server.stdout.readline()  # listening on ...
+        asyncio.run(run(port, seconds, connections))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 10,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
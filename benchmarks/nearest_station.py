@@ -0,0 +1,46 @@
+"""最寄りの観測点の検索について、空間インデックスと全件走査とを比較する
+
+$ python -m tools.spatial_index
+$ python benchmarks/nearest_station.py [レイヤ名] [検索回数]
+"""
+
+import random
+import sys
+import time
+
+from jma_codes import load_table
+from jma_codes.spatial import LAYERS, distance, load_spatial_index, points_of
+
+
+def main(layer: str, n: int) -> None:
+    rng = random.Random(0)
+    queries = [(rng.uniform(129, 146), rng.uniform(31, 45)) for _ in range(n)]
+
+    name, part = LAYERS[layer]
+    points = points_of(load_table(name)[part])
+    t = time.perf_counter()
+    expected = [
+        min(distance(lng, lat, *lnglat) for lnglat in points.values())
+        for lng, lat in queries
+    ]
+    brute = time.perf_counter() - t
+
+    index = load_spatial_index(layer)
+    t = time.perf_counter()
+    actual = [index.nearest(lng, lat)[0][1] for lng, lat in queries]
+    indexed = time.perf_counter() - t
+
+    # 同じ座標の地点があるため、距離で比較する
+    assert all(abs(a - e) < 1e-6 for a, e in zip(actual, expected))
+    print(f"layer={layer} points={len(points)} queries={n}")
+    print(f"{'brute force':<12} {brute / n * 1e6:>9.1f} us/query")
+    print(
+        f"{'kd-tree':<12} {indexed / n * 1e6:>9.1f} us/query  (x{brute / indexed:.0f})"
+    )
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "amedas_ame",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+    )
@@ -0,0 +1,75 @@
+"""コード表を json.load の辞書の辞書として読み込む場合と、型付きのレコード
+(jma_codes.records) として読み込む場合とで、メモリ使用量を比較する
+
+$ python benchmarks/records_rss.py
+
+それぞれ別のプロセスで読み込み、読み込み前後の RSS の増加と、tracemalloc で数えた
+Python オブジェクトの大きさを表示する (tracemalloc 自体もメモリを使うため、RSS は
+tracemalloc を使わないプロセスで測る)。
+"""
+
+import ctypes
+import gc
+import json
+import multiprocessing as mp
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TABLES = {
+    "PointSeismicIntensity": ["pointToCity", "cityToSaibun"],
+    "forecast_area_tree": ["items"],
+}
+
+
+def _rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not found")
+
+
+def _worker(mode: str, trace: bool, queue) -> None:
+    from jma_codes.records import load_records
+
+    gc.collect()
+    before = _rss_kb()
+    if trace:
+        tracemalloc.start()
+    tables = []
+    for name, parts in TABLES.items():
+        if mode == "dict":
+            with open(ROOT / "json" / f"{name}.json", encoding="utf-8") as f:
+                data = json.load(f)
+            tables.extend(data[part] for part in parts)
+            del data
+        else:
+            tables.extend(load_records(name, part) for part in parts)
+    gc.collect()
+    ctypes.CDLL("libc.so.6").malloc_trim(0)  # 解放済みのヒープを OS に返してから測る
+    if trace:
+        queue.put(tracemalloc.get_traced_memory()[0] // 1024)
+    else:
+        queue.put(_rss_kb() - before)
+
+
+def run(mode: str, trace: bool) -> int:
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_worker, args=(mode, trace, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main() -> None:
+    print(", ".join(f"{name} ({'/'.join(parts)})" for name, parts in TABLES.items()))
+    print(f"{'mode':<8} {'RSS (KB)':>9} {'traced (KB)':>12}")
+    for mode in ["dict", "records"]:
+        print(f"{mode:<8} {run(mode, False):>9} {run(mode, True):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""jma_codes.jmaxml による電文のコードの解決の速度を測る
+
+$ python benchmarks/resolve_jmaxml.py [電文数]
+
+コード表から合成した次の電文を、それぞれ繰り返し解決し、1秒あたりの電文数とコード数を出力する。
+
+- 震源・震度に関する情報: 震央地名、都道府県・細分区域・市町村等・震度観測点 (CodeDefine)。
+  大きな地震の電文として、震央に近い観測点 (市町村等ごとにまとまる) を含むものと、
+  全国から無作為に選んだ観測点 (市町村等ごとに1地点程度) を含むもの、全観測点を含むもの
+- 気象警報・注意報: Areas/@codeType, Area/@codeType と、Kind/Code (Warning/@type から)
+- 津波警報: 津波予報区と警報等情報要素 (CodeDefine)、潮位観測点 (Code/@type)、固定付加文
+"""
+
+import math
+import random
+import sys
+import time
+from collections.abc import Callable
+from typing import Optional
+
+from jma_codes import load_table
+from jma_codes.jmaxml import Resolver
+
+NS = (
+    'xmlns="http://xml.kishou.go.jp/jmaxml1/" '
+    'xmlns:jmx_ib="http://xml.kishou.go.jp/jmaxml1/informationBasis1/" '
+    'xmlns:jmx_eb="http://xml.kishou.go.jp/jmaxml1/elementBasis1/"'
+)
+
+
+# 震央 (石川県能登地方)
+EPICENTER = (137.27, 37.50)
+
+
+def earthquake_message(
+    stations: int, near: Optional[tuple[float, float]] = None
+) -> bytes:
+    """震度観測点を stations 地点含む、震源・震度に関する情報
+
+    near を与えた場合はその地点に近い観測点を、省略した場合は無作為に選ぶ
+    """
+
+    points = load_table("PointSeismicIntensity")["pointToCity"]
+    prefectures = load_table("AreaInformationPrefectureEarthquake")["items"]
+    if near is None:
+        chosen = sorted(random.sample(sorted(points), stations))
+    else:
+        chosen = sorted(
+            sorted(points, key=lambda c: math.dist(points[c]["lnglat"], near))[
+                :stations
+            ]
+        )
+
+    # 都道府県 -> 細分区域 -> 市町村等 -> 観測点
+    tree: dict[str, dict[str, dict[str, list[str]]]] = {}
+    for code in chosen:
+        p = points[code]
+        pref = p["cityCode"][:2]
+        pref = pref if pref in prefectures else "01"
+        tree.setdefault(pref, {}).setdefault(p["seisSaibunCode"], {}).setdefault(
+            p["cityCode"], []
+        ).append(code)
+
+    body = []
+    for pref, areas in tree.items():
+        body.append(
+            f"<Pref><Name>{prefectures[pref]['name']}</Name><Code>{pref}</Code>"
+        )
+        for area, cities in areas.items():
+            body.append(f"<Area><Name>-</Name><Code>{area}</Code>")
+            for city, codes in cities.items():
+                body.append(f"<City><Name>-</Name><Code>{city}</Code>")
+                for code in codes:
+                    body.append(
+                        f"<IntensityStation><Name>{points[code]['name']}</Name>"
+                        f"<Code>{code}</Code><Int>3</Int></IntensityStation>"
+                    )
+                body.append("</City>")
+            body.append("</Area>")
+        body.append("</Pref>")
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Report {NS}>
+<Control><Title>震源・震度に関する情報</Title></Control>
+<jmx_ib:Head><jmx_ib:Title>震源・震度情報</jmx_ib:Title></jmx_ib:Head>
+<Body xmlns="http://xml.kishou.go.jp/jmaxml1/body/seismology1/">
+<Earthquake><Hypocenter><Area>
+<Name>石川県能登地方</Name><Code type="震央地名">390</Code>
+</Area></Hypocenter></Earthquake>
+<Intensity><Observation>
+<CodeDefine>
+<Type xpath="Pref/Code">地震情報／都道府県等</Type>
+<Type xpath="Pref/Area/Code">地震情報／細分区域</Type>
+<Type xpath="Pref/Area/City/Code">気象・地震・火山情報／市町村等</Type>
+<Type xpath="Pref/Area/City/IntensityStation/Code">震度観測点</Type>
+</CodeDefine>
+<MaxInt>3</MaxInt>
+{"".join(body)}
+</Observation></Intensity>
+<Comments><ForecastComment codeType="固定付加文">
+<Text>-</Text><Code>0215 0230</Code>
+</ForecastComment></Comments>
+</Body>
+</Report>
+""".encode("utf-8")
+
+
+def warning_message(cities: int) -> bytes:
+    """市町村等を cities 件含む、気象警報・注意報"""
+
+    items = load_table("forecast_area_tree")["items"]
+    codes = random.sample(
+        sorted(c for c, v in items.items() if v["level"] == "city"), cities
+    )
+    areas = "".join(
+        f"<jmx_ib:Area><jmx_ib:Name>{items[c]['name']}</jmx_ib:Name>"
+        f"<jmx_ib:Code>{c}</jmx_ib:Code></jmx_ib:Area>"
+        for c in codes
+    )
+    warnings = "".join(
+        f"<Item><Kind><Name>大雨注意報</Name><Code>10</Code></Kind>"
+        f'<Area codeType="気象・地震・火山情報／市町村等"><Name>{items[c]["name"]}</Name>'
+        f"<Code>{c}</Code></Area></Item>"
+        for c in codes
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Report {NS}>
+<Control><Title>気象警報・注意報（Ｈ２７）</Title></Control>
+<jmx_ib:Head><jmx_ib:Headline><jmx_ib:Information type="気象警報・注意報（市町村等）">
+<jmx_ib:Item>
+<jmx_ib:Kind><jmx_ib:Name>大雨注意報</jmx_ib:Name><jmx_ib:Code>10</jmx_ib:Code></jmx_ib:Kind>
+<jmx_ib:Areas codeType="気象・地震・火山情報／市町村等">{areas}</jmx_ib:Areas>
+</jmx_ib:Item>
+</jmx_ib:Information></jmx_ib:Headline></jmx_ib:Head>
+<Body xmlns="http://xml.kishou.go.jp/jmaxml1/body/meteorology1/">
+<Warning type="気象警報・注意報（市町村等）">{warnings}</Warning>
+</Body>
+</Report>
+""".encode("utf-8")
+
+
+def tsunami_message() -> bytes:
+    areas = load_table("AreaTsunami")["items"]
+    stations = load_table("PointTsunami")["items"]
+    forecast = "".join(
+        f"<Item><Area><Name>{a['name']}</Name><Code>{code}</Code></Area>"
+        f"<Category><Kind><Name>津波注意報</Name><Code>62</Code></Kind></Category></Item>"
+        for code, a in areas.items()
+    )
+    observation = "".join(
+        f'<Station><Name>{s["name"]}</Name><Code type="潮位観測点">{code}</Code></Station>'
+        for code, s in list(stations.items())[:50]
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Report {NS}>
+<Control><Title>津波警報・注意報・予報a</Title></Control>
+<Body xmlns="http://xml.kishou.go.jp/jmaxml1/body/seismology1/">
+<Tsunami>
+<Observation><Item>{observation}</Item></Observation>
+<Forecast>
+<CodeDefine>
+<Type xpath="Item/Area/Code">津波予報区</Type>
+<Type xpath="Item/Category/Kind/Code">警報等情報要素／津波警報・注意報・予報</Type>
+</CodeDefine>
+{forecast}
+</Forecast>
+</Tsunami>
+<Comments><WarningComment codeType="固定付加文"><Text>-</Text><Code>0149 0122</Code></WarningComment></Comments>
+</Body>
+</Report>
+""".encode("utf-8")
+
+
+def measure(
+    label: str, message: bytes, resolve: Callable[[bytes], list], n: int
+) -> None:
+    codes = len(resolve(message))  # コード表の読み込みを含めない
+    t = time.perf_counter()
+    for _ in range(n):
+        resolve(message)
+    elapsed = time.perf_counter() - t
+    print(
+        f"{label:<26} {len(message) / 1024:>7.1f} KiB {codes:>6} codes"
+        f"  {n / elapsed:>8.1f} msg/s  {n * codes / elapsed / 1e6:>5.2f} M codes/s"
+    )
+
+
+def main(n: int) -> None:
+    random.seed(0)
+    resolver = Resolver()
+
+    def resolve(message: bytes) -> list:
+        return list(resolver.resolve(message))
+
+    all_points = load_table("PointSeismicIntensity")["pointToCity"]
+    for code in resolve(earthquake_message(3))[:8]:
+        print(f"  {code.code_type} {code.code} {code.name} {code.parents}")
+
+    messages = {
+        "earthquake (30 stations)": earthquake_message(30, EPICENTER),
+        "earthquake (1000 near)": earthquake_message(1000, EPICENTER),
+        "earthquake (1000 random)": earthquake_message(1000),
+        "earthquake (all)": earthquake_message(len(all_points), EPICENTER),
+        "warning (50 cities)": warning_message(50),
+        "tsunami": tsunami_message(),
+    }
+    for label, message in messages.items():
+        assert all(code.found for code in resolve(message)), label
+        measure(label, message, resolve, n)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,96 @@
+"""名前・ふりがなの検索について、n-gram インデックスと全件走査とを比較する
+
+$ python -m tools.search_index
+$ python benchmarks/search_names.py [検索回数]
+
+コード表の名前・ふりがなから切り出した 1〜6 文字のクエリで検索し、
+クエリの長さごとに1回あたりの時間 (p50, p99) を出力する。結果は全件走査と一致することを確かめる。
+"""
+
+import random
+import sys
+import time
+
+from jma_codes.search import (
+    MATCHES,
+    SOURCES,
+    load_search_index,
+    load_sources,
+    normalize,
+)
+
+
+def scan_keys() -> list[tuple[str, str, str, str]]:
+    """(キー, 表, コード, フィールド) をインデックスと同じ順に"""
+
+    keys = []
+    for name, items in load_sources().items():
+        for code in sorted(items):
+            seen = set()
+            for field in SOURCES[name][1]:
+                value = items[code].get(field)
+                if not isinstance(value, str) or not (key := normalize(value)):
+                    continue
+                if key not in seen:
+                    seen.add(key)
+                    keys.append((key, name, code, field))
+    return keys
+
+
+def scan(
+    keys: list[tuple[str, str, str, str]], query: str, limit: int
+) -> list[tuple[str, str, str]]:
+    query = normalize(query)
+    found = []
+    for i, (key, name, code, _) in enumerate(keys):
+        if query in key:
+            rank = 0 if key == query else 1 if key.startswith(query) else 2
+            found.append((rank, len(key), i, name, code))
+    found.sort()
+    result, seen = [], set()
+    for rank, _, _, name, code in found:
+        if (name, code) not in seen:
+            seen.add((name, code))
+            result.append((name, code, MATCHES[rank]))
+    return result[:limit]
+
+
+def percentile(values: list[float], p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main(n: int) -> None:
+    rng = random.Random(0)
+    keys = scan_keys()
+    index = load_search_index()
+    print(f"entries={len(index)} keys={len(keys)}")
+
+    t = time.perf_counter()
+    scan(keys, "さっぽろ", 10)
+    print(f"{'linear scan':<12} {(time.perf_counter() - t) * 1e3:>8.2f} ms/query")
+
+    for length in range(1, 7):
+        queries = []
+        while len(queries) < n:
+            key = rng.choice(keys)[0]
+            if len(key) >= length:
+                start = rng.randrange(len(key) - length + 1)
+                queries.append(key[start : start + length])
+
+        times = []
+        for query in queries:
+            t = time.perf_counter()
+            hits = index.search(query, limit=10)
+            times.append(time.perf_counter() - t)
+            expected = scan(keys, query, 10)
+            assert [(h.table, h.code, h.match) for h in hits] == expected, query
+        print(
+            f"{length} chars{'':<6} "
+            f"p50 {percentile(times, 0.5) * 1e6:>7.1f} us"
+            f"  p99 {percentile(times, 0.99) * 1e6:>7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,90 @@
+"""すべてのコード表を各ワーカーで読み込む場合と、共有メモリ (jma_codes.shared) に
+アタッチする場合とで、ワーカーの起動時間とメモリ使用量を比較する
+
+$ python benchmarks/shared_tables.py [ワーカー数]
+
+共有メモリのブロックはこのプロセスが作る。各ワーカーは表を使えるようになるまでの時間を測り、
+すべての表のすべてのコードを1回ずつ引いてから、メモリ使用量の増加を報告する。
+RSS には共有ページも含まれるため、共有分を按分した PSS と、プロセス固有の Private も表示する。
+"""
+
+import multiprocessing as mp
+import sys
+import time
+
+
+def _memory_kb() -> dict[str, int]:
+    result = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+                result[key] = int(value.split()[0])
+    return {
+        "rss": result["Rss"],
+        "pss": result["Pss"],
+        "private": result["Private_Clean"] + result["Private_Dirty"],
+    }
+
+
+def _worker(mode: str, block: str, barrier, queue) -> None:
+    from jma_codes import table_names
+    from jma_codes._loader import read_table_file
+    from jma_codes.shared import attach
+
+    before = _memory_kb()
+    t = time.perf_counter()
+    if mode == "load":
+        tables = {name: read_table_file(name) for name in table_names()}
+    else:
+        tables = attach(block)
+    ready = time.perf_counter() - t
+
+    for table in tables.values():
+        for part in table.values():
+            for code in list(part):
+                part[code]
+
+    barrier.wait()  # 全ワーカーが読み込み終えた状態で計測する
+    after = _memory_kb()
+    queue.put({"ready_ms": ready * 1e3, **{k: after[k] - before[k] for k in after}})
+    barrier.wait()
+
+
+def run(mode: str, block: str, workers: int) -> dict[str, float]:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(mode, block, barrier, queue))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return {k: sum(r[k] for r in results) / workers for k in results[0]}
+
+
+def main(workers: int) -> None:
+    from jma_codes.shared import publish
+
+    t = time.perf_counter()
+    with publish(None) as tables:
+        print(
+            f"published {len(tables)} tables ({tables.size:,} bytes)"
+            f" in {time.perf_counter() - t:.2f} s"
+        )
+        print(f"{workers} workers, per-process (memory increase in KB)")
+        print(f"{'mode':<7} {'ready (ms)':>10} {'RSS':>8} {'PSS':>8} {'Private':>8}")
+        for mode in ["load", "shared"]:
+            r = run(mode, tables.name, workers)
+            print(
+                f"{mode:<7} {r['ready_ms']:>10.1f} {r['rss']:>8.0f}"
+                f" {r['pss']:>8.0f} {r['private']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
@@ -0,0 +1,42 @@
+"""`make update_json` の各変換スクリプトの実行時間を計測する
+
+$ python benchmarks/update_json.py [モジュール名 ...]
+
+seis_and_volc はネットワークに依存するため、明示的に指定した場合のみ実行する。
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MODULES = [
+    "amedas",
+    "area_flood_forecast",
+    "area_forecast",
+    "area_local_codes",
+    "area_marine_aj",
+    "area_river",
+    "jmaxml_info_codes",
+    "phenological_type",
+    "river_offce",
+    "water_level_station",
+    "wmo_observing_stations",
+]
+
+
+def main(modules: list[str]) -> None:
+    total = 0.0
+    for module in modules:
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-m", f"tools.{module}"], cwd=ROOT, check=True)
+        elapsed = time.perf_counter() - t
+        total += elapsed
+        print(f"{module:<26} {elapsed:>7.2f} s")
+    print(f"{'total':<26} {total:>7.2f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or MODULES)
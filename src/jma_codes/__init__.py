@@ -0,0 +1,27 @@
+"""気象庁防災情報XMLに関係する各種コード表
+
+各コード表は ``jma_codes.AreaForecast`` や ``jma_codes.forecast_area_tree`` のように
+モジュールの属性として参照できます。コード表は初回の参照時に読み込まれ、
+以降はプロセス内でキャッシュされます。
+"""
+
+from typing import Any
+
+from ._loader import data_dir, load_table, table_names
+
+__all__ = ["data_dir", "load_table", "table_names"]
+
+
+def __getattr__(name: str) -> Any:
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        table = load_table(name)
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = table  # 2回目以降は __getattr__ を経由しない
+    return table
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(table_names()))
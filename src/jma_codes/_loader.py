@@ -0,0 +1,97 @@
+"""コード表 (JSON) の読み込み"""
+
+import json
+import pickle
+import threading
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+_lock = threading.Lock()
+_tables: dict[str, Any] = {}
+
+
+@lru_cache(maxsize=None)
+def data_dir() -> Path:
+    """コード表のJSONファイルが置かれたディレクトリを返す
+
+    wheel に同梱されたものを優先し、なければソースツリーの ./json/ を使う
+    """
+
+    bundled = Path(__file__).parent / "json"
+    if bundled.is_dir():
+        return bundled
+    return Path(__file__).resolve().parents[2] / "json"
+
+
+def snapshot_dir() -> Path:
+    """スナップショット (tools/snapshot.py で生成) が置かれたディレクトリを返す"""
+
+    return Path(__file__).parent / "snapshot"
+
+
+@lru_cache(maxsize=None)
+def table_names() -> tuple[str, ...]:
+    """利用可能なコード表の名前の一覧"""
+
+    return tuple(sorted(p.stem for p in data_dir().glob("*.json")))
+
+
+def table_path(name: str) -> Path:
+    """コード表のJSONファイルのパスを返す
+
+    存在しない場合は KeyError を投げる
+    """
+
+    path = data_dir() / f"{name}.json"
+    if not path.is_file():
+        raise KeyError(name)
+    return path
+
+
+def load_table(name: str) -> Any:
+    """コード表を読み込む
+
+    初回の呼び出し時にのみファイルを読み、以降はプロセス内でキャッシュしたものを返す
+    """
+
+    if (table := _tables.get(name)) is not None:
+        return table
+
+    with _lock:
+        if (table := _tables.get(name)) is None:
+            table = read_table_file(name)
+            _tables[name] = table
+    return table
+
+
+def read_table_file(name: str) -> Any:
+    """コード表をファイル (スナップショットまたは JSON) から読む (キャッシュしない)"""
+
+    path = table_path(name)
+
+    # スナップショットがあればそちらを読む
+    snapshot = snapshot_dir() / f"{name}.pickle"
+    try:
+        if snapshot_is_current(snapshot, [name]):
+            with open(snapshot, "rb") as f:
+                return pickle.load(f)
+    except FileNotFoundError:
+        pass
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def snapshot_is_current(snapshot: Path, names: Iterable[str]) -> bool:
+    """スナップショット (インデックスを含む) を、元のコード表の代わりに使えるか
+
+    ソースツリーでは、いずれかのコード表のJSONより古いスナップショットは使わない。
+    スナップショットがなければ FileNotFoundError を投げる
+    """
+
+    mtime = snapshot.stat().st_mtime_ns
+    if data_dir() == Path(__file__).parent / "json":
+        return True
+    return all(mtime >= table_path(name).stat().st_mtime_ns for name in names)
@@ -0,0 +1,266 @@
+"""経度・緯度から区域 (市町村等・予報区・地震情報の細分区域など) を引く
+
+datasrc/shape_properties/*.json にある各区域の外接矩形 (bbox) から、
+次のようなバイナリ形式の R 木 (一括構築・ポインタなし) を作り、mmap したまま検索します。
+
+- ヘッダ: マジック (8 bytes), 件数 (uint32), キーの幅 (uint32), 節点の子の数 (uint32)
+- 矩形: 全節点数 × 4 × float64 (西, 南, 東, 北; 葉から根へ階層ごとに連結)
+- 面積: 件数 × float64 (葉の順)
+- キー: 件数 × キーの幅 (UTF-8, NUL埋め, 葉の順)
+
+階層 k の i 番目の節点の子は、階層 k-1 の i × 子の数 から始まる連続した節点です。
+
+外接矩形による判定は候補の絞り込みです。区域のポリゴンを持っている場合は、
+contains に厳密な判定を渡してください。
+"""
+
+import json
+import math
+import mmap
+import struct
+from collections.abc import Callable, Iterator, Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from ._loader import snapshot_dir
+from .area_tree import load_forecast_area_tree
+
+MAGIC = b"JMARTRE1"
+_HEADER = struct.Struct("<8sIII")
+NODE_SIZE = 16
+
+LAYERS: list[str] = [
+    "chihou",
+    "city",
+    "eew_chihou",
+    "eew_fuken",
+    "fuken",
+    "ichiji",
+    "maritime",
+    "matome",
+    "seis_prefecture",
+    "seis_saibun",
+    "tsunami",
+]
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
+# (区域コード, 経度, 緯度) -> 点が区域に含まれるか
+Contains = Callable[[str, float, float], bool]
+
+
+def _level_sizes(count: int, node_size: int) -> list[int]:
+    """葉から根までの、各階層の節点数"""
+
+    sizes = [count]
+    while sizes[-1] > 1:
+        sizes.append(math.ceil(sizes[-1] / node_size))
+    return sizes
+
+
+def build_index(areas: list[Mapping[str, Any]], node_size: int = NODE_SIZE) -> bytes:
+    """shape_properties の区域のリストからインデックスのバイト列を作る"""
+
+    # Sort-Tile-Recursive: 中心の経度で短冊に分け、短冊の中を緯度で並べる
+    def center(area: Mapping[str, Any], axis: int) -> float:
+        return (area["bbox"][axis] + area["bbox"][axis + 2]) / 2
+
+    leaves = sorted(areas, key=lambda a: center(a, 0))
+    n_strips = math.ceil(math.sqrt(math.ceil(len(leaves) / node_size)))
+    strip = n_strips * node_size
+    leaves = [
+        area
+        for i in range(0, len(leaves), strip)
+        for area in sorted(leaves[i : i + strip], key=lambda a: center(a, 1))
+    ]
+
+    boxes = [tuple(area["bbox"]) for area in leaves]
+    level = boxes
+    for _ in _level_sizes(len(leaves), node_size)[1:]:
+        level = [
+            (
+                min(b[0] for b in level[i : i + node_size]),
+                min(b[1] for b in level[i : i + node_size]),
+                max(b[2] for b in level[i : i + node_size]),
+                max(b[3] for b in level[i : i + node_size]),
+            )
+            for i in range(0, len(level), node_size)
+        ]
+        boxes.extend(level)
+
+    keys = [area["code"].encode("utf-8") for area in leaves]
+    width = max((len(k) for k in keys), default=0)
+    return b"".join(
+        [
+            _HEADER.pack(MAGIC, len(leaves), width, node_size),
+            struct.pack(f"<{len(boxes) * 4}d", *(v for b in boxes for v in b)),
+            struct.pack(f"<{len(leaves)}d", *(area["area"] for area in leaves)),
+            b"".join(k.ljust(width, b"\0") for k in keys),
+        ]
+    )
+
+
+class AreaIndex:
+    """インデックスのバイト列を経度・緯度で検索する"""
+
+    def __init__(self, buffer: Buffer, offset: int = 0) -> None:
+        magic, count, width, node_size = _HEADER.unpack_from(buffer, offset)
+        if magic != MAGIC:
+            raise ValueError("not an area index")
+        self._buf = buffer
+        self._count = count
+        self._width = width
+        self._node_size = node_size
+        sizes = _level_sizes(count, node_size) if count else []
+        self._level_starts = [sum(sizes[:k]) for k in range(len(sizes))]
+        boxes_start = offset + _HEADER.size
+        areas_start = boxes_start + sum(sizes) * 32
+        self._keys_start = areas_start + count * 8
+        view = memoryview(buffer)
+        self._boxes = view[boxes_start:areas_start].cast("d")
+        self._areas = view[areas_start : self._keys_start].cast("d")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, i: int) -> str:
+        pos = self._keys_start + i * self._width
+        return bytes(self._buf[pos : pos + self._width]).rstrip(b"\0").decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._key_at(i)
+
+    def _search(
+        self, west: float, south: float, east: float, north: float
+    ) -> list[int]:
+        """矩形と交わる外接矩形を持つ区域の (葉の) 位置"""
+
+        if not self._count:
+            return []
+        boxes, starts, node_size = self._boxes, self._level_starts, self._node_size
+        found = []
+        stack = [(len(starts) - 1, 0)]
+        while stack:
+            level, i = stack.pop()
+            p = (starts[level] + i) * 4
+            if (
+                boxes[p] > east
+                or boxes[p + 1] > north
+                or boxes[p + 2] < west
+                or boxes[p + 3] < south
+            ):
+                continue
+            if level == 0:
+                found.append(i)
+                continue
+            first = i * node_size
+            last = min(first + node_size, starts[level] - starts[level - 1])
+            stack.extend((level - 1, j) for j in range(first, last))
+        return found
+
+    def candidates(self, lng: float, lat: float) -> list[str]:
+        """外接矩形が点を含む区域のコード (面積の小さい順)"""
+
+        found = self._search(lng, lat, lng, lat)
+        found.sort(key=lambda i: (self._areas[i], i))
+        return [self._key_at(i) for i in found]
+
+    def intersecting(
+        self, west: float, south: float, east: float, north: float
+    ) -> list[str]:
+        """外接矩形が範囲と交わる区域のコード"""
+
+        return sorted(self._key_at(i) for i in self._search(west, south, east, north))
+
+
+@lru_cache(maxsize=None)
+def shape_properties_dir() -> Path:
+    """区域の外接矩形のJSONファイルが置かれたディレクトリを返す
+
+    wheel に同梱されたものを優先し、なければソースツリーの datasrc/shape_properties を使う
+    """
+
+    bundled = Path(__file__).parent / "shape_properties"
+    if bundled.is_dir():
+        return bundled
+    return Path(__file__).resolve().parents[2] / "datasrc" / "shape_properties"
+
+
+def index_path(layer: str) -> Path:
+    """インデックスファイル (tools/area_index.py で生成) のパスを返す"""
+
+    return snapshot_dir() / f"{layer}.rtree"
+
+
+def _index_is_current(index: Path, source: Path) -> bool:
+    """インデックスファイルを使えるか (ソースツリーでは、元のJSONより古いものは使わない)
+
+    インデックスファイルがなければ FileNotFoundError を投げる
+    """
+
+    mtime = index.stat().st_mtime_ns
+    if source.parent == Path(__file__).parent / "shape_properties":
+        return True
+    try:
+        return mtime >= source.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+@lru_cache(maxsize=None)
+def load_area_index(layer: str) -> AreaIndex:
+    """区域の種類 (LAYERS のいずれか) のインデックスを開く
+
+    インデックスファイルがあれば mmap して使い、なければ shape_properties から作る。
+    インデックスファイルが shape_properties のJSONより古ければ使わない
+    """
+
+    if layer not in LAYERS:
+        raise KeyError(layer)
+    path = shape_properties_dir() / f"{layer}.json"
+    try:
+        if _index_is_current(index_path(layer), path):
+            with open(index_path(layer), "rb") as f:
+                return AreaIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        pass
+    try:
+        with open(path, encoding="utf-8") as f:
+            return AreaIndex(build_index(json.load(f)))
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"area index for {layer!r} not found: neither {index_path(layer)} nor "
+            f"{path} exists (run `make update_snapshot` in the source tree)"
+        ) from None
+
+
+def lookup(
+    layer: str, lng: float, lat: float, contains: Optional[Contains] = None
+) -> list[str]:
+    """点を含む区域のコード (面積の小さい順)
+
+    contains を省略した場合は、外接矩形が点を含む区域 (候補) をすべて返す
+    """
+
+    codes = load_area_index(layer).candidates(lng, lat)
+    if contains is not None:
+        codes = [code for code in codes if contains(code, lng, lat)]
+    return codes
+
+
+def reverse_geocode(
+    lng: float, lat: float, contains: Optional[Contains] = None
+) -> list[dict[str, str]]:
+    """点を含む市町村等と、その上位の区域 (forecast_area_tree) のコード
+
+    市町村等の候補ごとに {"city": ..., "matome": ..., "ichiji": ..., ...} を返す。
+    上位の区域を持たない市町村等 (政令指定都市の区など) は city のみになる
+    """
+
+    tree = load_forecast_area_tree()
+    return [
+        {"city": code, **(tree.ancestors(code) if code in tree else {})}
+        for code in lookup("city", lng, lat, contains)
+    ]
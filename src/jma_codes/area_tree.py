@@ -0,0 +1,95 @@
+"""予報区の階層 (forecast_area_tree)
+
+府県予報区・一次細分区域・市町村等をまとめた地域・市町村等の包含関係を引きます。
+
+下位の区域の一覧は forecast_area_tree.json の children にあらかじめ用意されているため、
+結果の件数に比例する時間で得られます。また、区域の階層をたどった順に通し番号を振り、
+各区域にその配下の番号の範囲を持たせることで、ある区域が別の区域に含まれるかどうかを
+2回の整数比較で判定できます。
+"""
+
+from functools import lru_cache
+from typing import Any, Optional
+
+from ._loader import load_table
+
+LEVELS: list[str] = ["fuken", "saibun", "ichiji", "matome", "city"]
+
+# 区域の番号付けに使う階層 (府県予報区の系統と、発表細分の系統)
+_HIERARCHIES: list[str] = ["fuken", "saibun"]
+
+
+class ForecastAreaTree:
+    def __init__(self, items: dict[str, dict[str, Any]]) -> None:
+        self._items = items
+        self._intervals = {h: _number_areas(items, h) for h in _HIERARCHIES}
+
+    def __getitem__(self, code: str) -> dict[str, Any]:
+        return self._items[code]
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._items
+
+    def ancestors(self, code: str) -> dict[str, str]:
+        """上位の区域のコードを階層ごとに返す"""
+
+        area = self._items[code]
+        return {key: area[key] for key in LEVELS if area.get(key)}
+
+    def descendants(self, code: str, level: Optional[str] = None) -> list[str]:
+        """下位の区域のコードを返す
+
+        level を指定した場合は、その階層の区域のみを返す
+        """
+
+        children = self._items[code].get("children", {})
+        if level is not None:
+            return children.get(level, [])
+        return [c for level in LEVELS if level in children for c in children[level]]
+
+    def contains(self, area_code: str, code: str) -> bool:
+        """code の区域が area_code の区域に含まれるか (同じ区域の場合も含む)"""
+
+        if (area := self._items.get(area_code)) is None:
+            return False
+        intervals = self._intervals["saibun" if area["level"] == "saibun" else "fuken"]
+        if (outer := intervals.get(area_code)) is None or (
+            inner := intervals.get(code)
+        ) is None:
+            return False
+        return outer[0] <= inner[0] < outer[1]
+
+
+def _number_areas(
+    items: dict[str, dict[str, Any]], hierarchy: str
+) -> dict[str, tuple[int, int]]:
+    """区域を階層の深さ優先順に並べて通し番号を振り、各区域の配下の番号の範囲を求める
+
+    返り値は 区域コード -> (自身の番号, 配下の最後の番号 + 1)
+    """
+
+    paths: list[tuple[str, ...]] = []
+    for code, area in items.items():
+        path: list[str] = []
+        for c in [area.get(hierarchy), area.get("ichiji"), area.get("matome"), code]:
+            if c and (not path or path[-1] != c):
+                path.append(c)
+        paths.append(tuple(path))
+    paths.sort()
+
+    intervals: dict[str, tuple[int, int]] = {}
+    stack: list[tuple[tuple[str, ...], int]] = []
+    for i, path in enumerate(paths):
+        while stack and path[: len(stack[-1][0])] != stack[-1][0]:
+            parent, start = stack.pop()
+            intervals[parent[-1]] = (start, i)
+        stack.append((path, i))
+    while stack:
+        parent, start = stack.pop()
+        intervals[parent[-1]] = (start, len(paths))
+    return intervals
+
+
+@lru_cache(maxsize=None)
+def load_forecast_area_tree() -> ForecastAreaTree:
+    return ForecastAreaTree(load_table("forecast_area_tree")["items"])
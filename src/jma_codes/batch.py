@@ -0,0 +1,137 @@
+"""コード表の一括検索
+
+大量のコードをまとめて引くために、コード表を「昇順に並べたコードの配列」と
+「フィールドごとの配列」に変換し、numpy.searchsorted で位置を求めます。
+結果はフィールドごとの NumPy 配列 (または pandas.DataFrame) です。
+
+    table = load_columns("forecast_area_tree")
+    table.lookup(["0110000", "0120200"], ["name", "fuken", "ichiji"])
+"""
+
+from collections.abc import Iterable, Mapping, Sequence
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional
+
+import numpy as np
+
+from ._loader import load_table
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+MISSING_POLICIES = ("null", "raise")
+
+
+def _int_keys(codes: np.ndarray) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    """ASCII のコードの先頭8文字を、大小関係を保ったまま整数にする
+
+    文字列の比較より速く検索できる。(整数, 9文字以上か) を返し、
+    ASCII 以外の文字を含む場合は None を返す
+    """
+
+    width = codes.dtype.itemsize // 4
+    chars = np.ascontiguousarray(codes).view(np.uint32).reshape(len(codes), width)
+    if chars.size and chars.max() > 0x7F:
+        return None
+    keys = np.zeros(len(codes), dtype=np.uint64)
+    for i in range(8):
+        keys <<= np.uint64(8)
+        if i < width:
+            keys |= chars[:, i]
+    too_long = chars[:, 8] != 0 if width > 8 else np.zeros(len(codes), dtype=bool)
+    return keys, too_long
+
+
+class ColumnTable:
+    """コード -> レコード の辞書を、列ごとの配列にしたもの"""
+
+    def __init__(
+        self,
+        items: Mapping[str, Mapping[str, Any]],
+        columns: Optional[Iterable[str]] = None,
+    ) -> None:
+        codes = sorted(items)
+        if columns is None:
+            columns = sorted({key for item in items.values() for key in item})
+        self.codes = np.array(codes, dtype=str)
+        self._int_codes: Optional[np.ndarray] = None
+        if (int_keys := _int_keys(self.codes)) is not None and not int_keys[1].any():
+            self._int_codes = int_keys[0]
+        self.columns: dict[str, np.ndarray] = {}
+        for column in columns:
+            # 末尾の要素は、コードが見つからない場合の値 (None)
+            values = np.empty(len(codes) + 1, dtype=object)
+            for i, code in enumerate(codes):  # lnglat などのリストも1つの値として入れる
+                values[i] = items[code].get(column)
+            self.columns[column] = values
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def positions(self, codes: Any) -> np.ndarray:
+        """各コードの位置 (見つからないコードは -1)"""
+
+        query = np.asarray(codes).astype(str).reshape(-1)
+        if not len(self.codes):
+            return np.full(query.shape, -1, dtype=np.intp)
+
+        too_long = None
+        if self._int_codes is not None and (int_query := _int_keys(query)) is not None:
+            # 9文字以上のコードは、先頭8文字が一致しても見つからないものとする
+            keys, (query_keys, too_long) = self._int_codes, int_query
+        else:
+            keys, query_keys = self.codes, query
+
+        pos = np.searchsorted(keys, query_keys)
+        pos[pos == len(keys)] = 0
+        found = keys[pos] == query_keys
+        if too_long is not None:
+            found &= ~too_long
+        return np.where(found, pos, -1)
+
+    def lookup(
+        self,
+        codes: Any,
+        columns: Optional[Sequence[str]] = None,
+        missing: str = "null",
+    ) -> dict[str, np.ndarray]:
+        """各コードのフィールドの値を、フィールドごとの配列で返す
+
+        見つからないコードは、missing が "null" なら値を None とし、
+        "raise" なら KeyError を投げる。"found" に見つかったかどうかの配列が入る
+        """
+
+        if missing not in MISSING_POLICIES:
+            raise ValueError(f"missing must be one of {MISSING_POLICIES}")
+        pos = self.positions(codes)
+        found = pos >= 0
+        if missing == "raise" and not found.all():
+            not_found = np.asarray(codes).astype(str).reshape(-1)[~found]
+            raise KeyError(
+                f"{len(not_found)} codes not found: {not_found[:5].tolist()}"
+            )
+
+        result = {"found": found}
+        for column in self.columns if columns is None else columns:
+            result[column] = self.columns[column][pos]  # -1 は末尾の None を指す
+        return result
+
+    def lookup_frame(
+        self,
+        codes: Any,
+        columns: Optional[Sequence[str]] = None,
+        missing: str = "null",
+    ) -> "pd.DataFrame":
+        """lookup の結果を pandas.DataFrame で返す (インデックスはコード)"""
+
+        import pandas as pd
+
+        result = self.lookup(codes, columns, missing)
+        return pd.DataFrame(result, index=pd.Index(np.asarray(codes), name="code"))
+
+
+@lru_cache(maxsize=None)
+def load_columns(name: str, part: str = "items") -> ColumnTable:
+    """コード表の指定した部分 (items, pointToCity など) を列ごとの配列にする"""
+
+    return ColumnTable(load_table(name)[part])
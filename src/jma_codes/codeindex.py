@@ -0,0 +1,131 @@
+"""コードをキーにした読み取り専用のインデックス
+
+コード表の items 相当の辞書を、次のようなバイナリ形式に変換し、
+mmap したまま検索できるようにします。複数のプロセスで同じファイルを開けば、
+ページキャッシュ上の1つのコピーが共有されます。
+
+- ヘッダ: マジック (8 bytes), 件数 (uint32), キーの幅 (uint32)
+- キー: 件数 × キーの幅 (UTF-8, NUL埋め, 昇順)
+- オフセット: (件数 + 1) × uint32 (データ領域の先頭からの位置)
+- データ: 各レコードを JSON (UTF-8) にして連結したもの
+"""
+
+import json
+import mmap
+import struct
+from collections.abc import Iterator, Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Union
+
+from ._loader import load_table, snapshot_dir, snapshot_is_current
+
+MAGIC = b"JMACIDX1"
+_HEADER = struct.Struct("<8sII")
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
+
+def build_index(items: Mapping[str, Any]) -> bytes:
+    """辞書からインデックスのバイト列を作る"""
+
+    keys = sorted(code.encode("utf-8") for code in items)
+    width = max((len(k) for k in keys), default=0)
+
+    offsets = [0]
+    blobs = []
+    for key in keys:
+        blob = json.dumps(
+            items[key.decode("utf-8")], ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        blobs.append(blob)
+        offsets.append(offsets[-1] + len(blob))
+
+    return b"".join(
+        [
+            _HEADER.pack(MAGIC, len(keys), width),
+            b"".join(k.ljust(width, b"\0") for k in keys),
+            struct.pack(f"<{len(offsets)}I", *offsets),
+            *blobs,
+        ]
+    )
+
+
+class CodeIndex(Mapping[str, Any]):
+    """インデックスのバイト列をコードで検索する
+
+    バイト列はコピーせずにそのまま参照します。
+    """
+
+    def __init__(self, buffer: Buffer, offset: int = 0) -> None:
+        magic, count, width = _HEADER.unpack_from(buffer, offset)
+        if magic != MAGIC:
+            raise ValueError("not a code index")
+        self._buf = buffer
+        self._count = count
+        self._width = width
+        self._keys_start = offset + _HEADER.size
+        self._offsets_start = self._keys_start + count * width
+        self._data_start = self._offsets_start + (count + 1) * 4
+
+    def _key_at(self, i: int) -> bytes:
+        pos = self._keys_start + i * self._width
+        return bytes(self._buf[pos : pos + self._width])
+
+    def _find(self, code: str) -> int:
+        key = code.encode("utf-8")
+        if len(key) > self._width:
+            return -1
+        key = key.ljust(self._width, b"\0")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key_at(lo) == key:
+            return lo
+        return -1
+
+    def __getitem__(self, code: str) -> Any:
+        if not isinstance(code, str) or (i := self._find(code)) < 0:
+            raise KeyError(code)
+        start, end = struct.unpack_from("<II", self._buf, self._offsets_start + i * 4)
+        return json.loads(
+            bytes(self._buf[self._data_start + start : self._data_start + end])
+        )
+
+    def __contains__(self, code: object) -> bool:
+        return isinstance(code, str) and self._find(code) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._key_at(i).rstrip(b"\0").decode("utf-8")
+
+
+def index_path(name: str, part: str = "items") -> Path:
+    """インデックスファイル (tools/code_index.py で生成) のパスを返す"""
+
+    return snapshot_dir() / f"{name}.{part}.idx"
+
+
+@lru_cache(maxsize=None)
+def load_index(name: str, part: str = "items") -> CodeIndex:
+    """コード表の指定した部分 (items, pointToCity など) のインデックスを開く
+
+    インデックスファイルがあれば mmap して使い、なければコード表から作る。
+    インデックスファイルがコード表のJSONより古ければ使わない
+    """
+
+    path = index_path(name, part)
+    try:
+        if snapshot_is_current(path, [name]):
+            with open(path, "rb") as f:
+                return CodeIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        pass
+    return CodeIndex(build_index(load_table(name)[part]))
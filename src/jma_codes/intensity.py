@@ -0,0 +1,152 @@
+"""震度観測点の表の正規化した形式
+
+PointSeismicIntensity, PointRealtimeSeismicIntensity の pointToCity, cityToSaibun は、
+地震情報／細分区域と市町村等の名前・ふりがなを、それを参照するすべての項目に複製しています。
+正規化した形式 (./json/normalized/{表の名前}.json) では、これらを次の3つの表に分け、
+コードで参照します。
+
+- seisSaibun: 地震情報／細分区域のコード -> {name, kana}
+- city: 市町村等のコード -> {name, kana, seisSaibunCode}
+- point: 観測点のコード -> {name, kana, cityCode, lnglat}
+
+load_intensity_table が返す IntensityTable の point_to_city, city_to_saibun は、
+従来の形の項目を、引かれたときにその都度組み立てる読み取り専用の Mapping です。
+
+```python
+from jma_codes.intensity import load_intensity_table
+
+table = load_intensity_table("PointSeismicIntensity")
+table.point_to_city["0110100"]["seisSaibunName"]  # "石狩地方中部"
+table.city_to_saibun["0110100"]  # {"cityCode": "0110100", "cityName": "札幌中央区", ...}
+table.seis_saibun["101"]  # {"kana": "いしかりちほうちゅうぶ", "name": "石狩地方中部"}
+```
+"""
+
+import json
+from collections.abc import Callable, Iterator, Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from ._loader import data_dir, load_table, snapshot_is_current
+
+TABLES = ["PointSeismicIntensity", "PointRealtimeSeismicIntensity"]
+
+# 従来の形のフィールド -> 正規化した表のフィールド
+SAIBUN_FIELDS = {"seisSaibunName": "name", "seisSaibunKana": "kana"}
+CITY_FIELDS = {
+    "cityName": "name",
+    "cityKana": "kana",
+    "seisSaibunCode": "seisSaibunCode",
+}
+
+
+def _pick(item: Mapping[str, Any], fields: Mapping[str, str]) -> dict[str, Any]:
+    return {new: item[old] for old, new in fields.items() if old in item}
+
+
+def _put(table: dict[str, dict[str, Any]], code: str, record: dict[str, Any]) -> None:
+    if table.setdefault(code, record) != record:
+        raise ValueError(f"inconsistent records for {code}: {table[code]}, {record}")
+
+
+def normalize(table: Mapping[str, Any]) -> dict[str, dict[str, dict[str, Any]]]:
+    """従来の形 (pointToCity, cityToSaibun) の表を正規化する
+
+    同じ細分区域・市町村等の名前などが項目ごとに異なる場合は ValueError を投げる
+    """
+
+    saibun: dict[str, dict[str, Any]] = {}
+    city: dict[str, dict[str, Any]] = {}
+    point: dict[str, dict[str, Any]] = {}
+    for code, item in table["cityToSaibun"].items():
+        _put(saibun, item["seisSaibunCode"], _pick(item, SAIBUN_FIELDS))
+        _put(city, code, _pick(item, CITY_FIELDS))
+    for code, item in table["pointToCity"].items():
+        _put(saibun, item["seisSaibunCode"], _pick(item, SAIBUN_FIELDS))
+        _put(city, item["cityCode"], _pick(item, CITY_FIELDS))
+        point[code] = {
+            k: v
+            for k, v in item.items()
+            if k not in SAIBUN_FIELDS and k not in CITY_FIELDS and k != "code"
+        }
+    return {"seisSaibun": saibun, "city": city, "point": point}
+
+
+class _View(Mapping[str, dict[str, Any]]):
+    """正規化した表から、従来の形の項目を引かれるたびに組み立てる"""
+
+    def __init__(
+        self, keys: Mapping[str, Any], build: Callable[[str], dict[str, Any]]
+    ) -> None:
+        self._keys = keys
+        self._build = build
+
+    def __getitem__(self, code: str) -> dict[str, Any]:
+        if code not in self._keys:
+            raise KeyError(code)
+        return self._build(code)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+class IntensityTable:
+    def __init__(self, normalized: Mapping[str, Mapping[str, Any]]) -> None:
+        self.seis_saibun: Mapping[str, dict[str, Any]] = normalized["seisSaibun"]
+        self.city: Mapping[str, dict[str, Any]] = normalized["city"]
+        self.point: Mapping[str, dict[str, Any]] = normalized["point"]
+        self.point_to_city = _View(self.point, self._point_item)
+        self.city_to_saibun = _View(self.city, self._city_item)
+
+    def _city_item(self, code: str) -> dict[str, Any]:
+        city = self.city[code]
+        saibun = self.seis_saibun[city["seisSaibunCode"]]
+        item = {"cityCode": code}
+        item.update((old, city[new]) for old, new in CITY_FIELDS.items() if new in city)
+        item.update(
+            (old, saibun[new]) for old, new in SAIBUN_FIELDS.items() if new in saibun
+        )
+        return item
+
+    def _point_item(self, code: str) -> dict[str, Any]:
+        point = self.point[code]
+        item = {"code": code, **point}
+        item.update(self._city_item(point["cityCode"]))
+        return item
+
+    def to_dict(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """従来の形の表 (load_table で読むものと同じ内容)"""
+
+        return {
+            "pointToCity": dict(self.point_to_city.items()),
+            "cityToSaibun": dict(self.city_to_saibun.items()),
+        }
+
+
+def normalized_path(name: str) -> Path:
+    """正規化した表 (tools/seis_and_volc.py で生成) のパスを返す"""
+
+    return data_dir() / "normalized" / f"{name}.json"
+
+
+@lru_cache(maxsize=None)
+def load_intensity_table(name: str = "PointSeismicIntensity") -> IntensityTable:
+    """震度観測点の表 (TABLES のいずれか) を正規化した形式で読み込む
+
+    正規化した表のファイルがないか、従来の形の表のJSONより古ければ、従来の形の表から作る
+    """
+
+    if name not in TABLES:
+        raise KeyError(name)
+    path = normalized_path(name)
+    try:
+        if snapshot_is_current(path, [name]):
+            with open(path, encoding="utf-8") as f:
+                return IntensityTable(json.load(f))
+    except FileNotFoundError:
+        pass
+    return IntensityTable(normalize(load_table(name)))
@@ -0,0 +1,259 @@
+"""気象庁防災情報XMLの電文に含まれるコードの解決
+
+電文を lxml の iterparse で読みながら、コードを持つ要素が閉じるたびに、その種別
+(codeType) のコード表をレジストリ (jma_codes.registry) で引き、名前・ふりがな・
+上位の区域を付けて返します。コード表は、その種別のコードが初めて現れたときに読み込まれます。
+
+コードの種別は、次の順に求めます。
+
+- Code 要素自身の type 属性 (地震・津波・火山の電文の Hypocenter/Area/Code など)
+- 祖先の要素の CodeDefine/Type に、その要素からの相対パスで宣言された種別
+- 祖先の要素 (Areas, Area, Item, TargetArea など) の codeType 属性
+- Kind, LastKind の Code は、祖先の要素 (Information, Warning など) の type 属性の値に
+  対応する警報等情報要素の種別 (codeType 属性は引き継がない)
+
+PrefectureCode, PrefectureCodeList のように、要素自身が codeType 属性を持つ場合は、
+その内容 (空白区切りで複数のこともある) をコードとして扱います。
+"""
+
+import io
+from collections.abc import Iterator
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Optional, Union
+
+from lxml import etree
+
+from .registry import CodeTypeRegistry, ResolvedCode, load_registry
+
+# 要素自身の内容がコードである要素 (codeType 属性を持つ場合)
+_CODE_ELEMENTS = {"PrefectureCode", "PrefectureCodeList"}
+_KIND_ELEMENTS = {"Kind", "LastKind"}
+_TAGS = ["{*}Code", "{*}Type", *(f"{{*}}{tag}" for tag in _CODE_ELEMENTS)]
+
+Source = Union[bytes, str, Path, IO[bytes]]
+
+_local_names: dict[str, str] = {}
+
+
+def _local_name(tag: str) -> str:
+    """名前空間を除いた要素名"""
+
+    if (name := _local_names.get(tag)) is None:
+        name = _local_names[tag] = tag.rpartition("}")[2]
+    return name
+
+
+# 読み終えた兄弟要素を木から取り除くまでに溜める数 (1つずつ取り除くと遅いため)
+_DROP_AFTER = 64
+
+_MISSING = object()  # 種別が None の結果と区別する
+
+
+def _drop_previous(parent: Any, elem: Any) -> None:
+    """読み終えた、elem の前の兄弟要素を木から取り除く"""
+
+    del parent[: parent.index(elem)]
+
+
+class _Scope:
+    """ある要素と祖先の、種別を求めるのに使う情報 (要素名、codeType・type 属性、CodeDefine)
+
+    これらが同じ祖先の並びは同じ _Scope になるため、別の観測点・市町村等の下のコードでも、
+    種別を求めた結果を共有できる
+    """
+
+    __slots__ = ("code_type", "defines", "info_type", "name", "parent")
+
+    def __init__(
+        self,
+        parent: Optional["_Scope"],
+        name: str,
+        code_type: Optional[str],
+        info_type: Optional[str],
+        defines: Optional[dict[str, str]],
+    ) -> None:
+        self.parent = parent
+        self.name = name
+        self.code_type = code_type
+        self.info_type = info_type
+        self.defines = defines
+
+
+class _Context:
+    """電文の1回の解決の状態
+
+    処理中のコードの要素の親より上の祖先の並び (外側から) と、それぞれの _Scope を持つ。
+    続くコードの要素は祖先の大部分を共有するため、直前のコードと異なる祖先だけを
+    たどり直す。新たにたどった要素の前にある兄弟要素は読み終えたものなので、
+    ある程度溜まったら木から取り除く
+    """
+
+    def __init__(self, registry: CodeTypeRegistry) -> None:
+        self._registry = registry
+        # CodeDefine を持つ要素 -> (相対パス -> 種別)
+        self._defines: dict[Any, dict[str, str]] = {}
+        self._nodes: list[Any] = []
+        self._scopes: dict[Any, _Scope] = {}
+        # (親の _Scope, 要素名, codeType, type, CodeDefine) -> _Scope
+        self._interned: dict[tuple[Any, ...], _Scope] = {}
+        # (親の親の _Scope, 親のタグ, codeType, type, CodeDefine, タグ) -> 種別
+        self._results: dict[tuple[Any, ...], Optional[str]] = {}
+        # 直前のコードの要素の親と、その種別
+        self._parent: Any = None
+        self._code_type: Optional[str] = None
+
+    def define(self, scope: Any, xpath: str, code_type: str) -> None:
+        self._defines.setdefault(scope, {})[xpath] = code_type
+        # 祖先の並びと _Scope を作り直す
+        self._nodes.clear()
+        self._scopes.clear()
+        self._interned.clear()
+        self._results.clear()
+        self._parent = None
+
+    def code_type_of(self, elem: Any) -> Optional[str]:
+        """Code 要素の種別 (祖先の要素から求める)"""
+
+        parent = elem.getparent()
+        if parent is self._parent:
+            return self._code_type
+        if parent is None:
+            return None
+        up = parent.getparent()
+        scope = self._scopes.get(up) or self._enter(up)
+        if up is not None and len(up) > _DROP_AFTER:
+            _drop_previous(up, parent)
+        defines = self._defines.get(parent) if self._defines else None
+        key = (
+            scope,
+            parent.tag,
+            parent.get("codeType"),
+            parent.get("type"),
+            id(defines),
+            elem.tag,
+        )
+        if (code_type := self._results.get(key, _MISSING)) is _MISSING:
+            parent_scope = self._interned.get(key[:5]) or self._scope(key[:5], defines)
+            code_type = self._search(parent_scope, _local_name(elem.tag))
+            self._results[key] = code_type
+        self._parent, self._code_type = parent, code_type
+        return code_type
+
+    def _scope(self, key: tuple[Any, ...], defines: Any) -> _Scope:
+        """(親の _Scope, タグ, codeType, type, CodeDefine) の _Scope"""
+
+        scope = self._interned[key] = _Scope(
+            key[0], _local_name(key[1]), key[2], key[3], defines
+        )
+        return scope
+
+    def _enter(self, node: Any) -> Optional[_Scope]:
+        """祖先の並びを node までにし、node の _Scope を返す"""
+
+        nodes, scopes = self._nodes, self._scopes
+        if node is None:
+            while nodes:
+                del scopes[nodes.pop()]
+            return None
+        up = node.getparent()
+        if up is None or (scope := scopes.get(up)) is None:
+            scope = self._enter(up)
+        else:
+            while nodes[-1] is not up:
+                del scopes[nodes.pop()]
+        if up is not None and len(up) > _DROP_AFTER:
+            _drop_previous(up, node)
+
+        defines = self._defines.get(node) if self._defines else None
+        key = (scope, node.tag, node.get("codeType"), node.get("type"), id(defines))
+        child = self._interned.get(key) or self._scope(key, defines)
+        nodes.append(node)
+        scopes[node] = child
+        return child
+
+    def _search(self, scope: Optional[_Scope], name: str) -> Optional[str]:
+        """要素名 name の要素の種別を、内側の祖先から順に調べて求める"""
+
+        path, in_kind = name, False
+        while scope is not None:
+            if scope.defines and (code_type := scope.defines.get(path)):
+                return code_type
+            if scope.name in _KIND_ELEMENTS:
+                in_kind = True
+            elif in_kind:
+                if scope.info_type and (
+                    code_type := self._registry.kind_code_type(scope.info_type)
+                ):
+                    return code_type
+            elif scope.code_type:
+                return scope.code_type
+            path = f"{scope.name}/{path}"
+            scope = scope.parent
+        return None
+
+
+class Resolver:
+    """電文のコードを、種別ごとのコード表で引く
+
+    registry を省略した場合は、code_type_registry.json のレジストリを使う。
+    引いた結果は (種別, コード) ごとに保持する
+    """
+
+    def __init__(self, registry: Optional[CodeTypeRegistry] = None) -> None:
+        self._registry = load_registry() if registry is None else registry
+        self._resolved: dict[tuple[str, str], ResolvedCode] = {}
+
+    def lookup(self, code_type: str, code: str) -> ResolvedCode:
+        """種別とコードから、名前などを引く (見つからなくても ResolvedCode を返す)"""
+
+        key = (code_type, code)
+        if (resolved := self._resolved.get(key)) is None:
+            resolved = self._registry.lookup(code_type, code) or ResolvedCode(
+                code_type, code
+            )
+            self._resolved[key] = resolved
+        return resolved
+
+    def resolve(self, source: Source) -> Iterator[ResolvedCode]:
+        """電文 (バイト列、ファイル名またはファイルオブジェクト) のコードを文書順に返す
+
+        種別のわからないコードは返さない。読み終えた要素は順に木から取り除くため、
+        電文全体の木をメモリに保持しない
+        """
+
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        context = _Context(self._registry)
+        resolved, lookup = self._resolved, self.lookup
+        for _, elem in etree.iterparse(source, events=("end",), tag=_TAGS):
+            tag = elem.tag
+            name = _local_names.get(tag) or _local_name(tag)
+            if name == "Type":
+                parent = elem.getparent()
+                if parent is not None and _local_name(parent.tag) == "CodeDefine":
+                    xpath = elem.get("xpath", "")
+                    context.define(parent.getparent(), xpath, (elem.text or "").strip())
+                continue
+
+            text = elem.text
+            if name in _CODE_ELEMENTS:
+                code_type = elem.get("codeType")
+            else:
+                code_type = elem.get("type") or context.code_type_of(elem)
+            elem.clear(keep_tail=True)
+            if code_type and text:
+                for code in text.split():
+                    yield resolved.get((code_type, code)) or lookup(code_type, code)
+
+
+@lru_cache(maxsize=None)
+def _default_resolver() -> Resolver:
+    return Resolver()
+
+
+def resolve(source: Source) -> list[ResolvedCode]:
+    """電文のコードを文書順に解決する"""
+
+    return list(_default_resolver().resolve(source))
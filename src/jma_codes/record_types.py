@@ -0,0 +1,283 @@
+"""コード表のレコードの型
+
+tools/record_types.py で ./json/ のコード表から生成しています。直接編集しないでください。
+jma_codes.records.load_records でレコードをこれらの型に変換して読み込めます。
+"""
+
+from typing import NamedTuple, Optional
+
+
+class AdditionalCommentEarthquake(NamedTuple):
+    code: str
+    text: str
+
+
+class AreaEpicenter(NamedTuple):
+    code: str
+    name: str
+
+
+class AreaEpicenterAbbreviation(NamedTuple):
+    code: str
+    name: str
+    note: Optional[str] = None
+
+
+class AreaEpicenterDetail(NamedTuple):
+    code: str
+    name: str
+
+
+class AreaEpicenterSuppliment(NamedTuple):
+    code: str
+    name: str
+
+
+class AreaFloodForecast(NamedTuple):
+    kana: str
+    name: str
+
+
+class AreaForecast(NamedTuple):
+    name: str
+    note: str
+    type: str
+
+
+class AreaForecastEEW(NamedTuple):
+    code: str
+    kana: str
+    name: str
+    note: Optional[str] = None
+
+
+class AreaForecastLocalEEW(NamedTuple):
+    code: str
+    kana: str
+    name: str
+    note: Optional[str] = None
+
+
+class AreaInformationPrefectureEarthquake(NamedTuple):
+    code: str
+    name: str
+
+
+class AreaMarineA(NamedTuple):
+    kana: str
+    name: str
+
+
+class AreaMarineJ(NamedTuple):
+    kana: str
+    name: str
+
+
+class AreaRiver(NamedTuple):
+    kana: str
+    name: str
+    alias1_kana: Optional[str] = None
+    alias1_name: Optional[str] = None
+    alias2_kana: Optional[str] = None
+
+
+class AreaTsunami(NamedTuple):
+    code: str
+    kana: str
+    name: str
+
+
+class CoastTsunami(NamedTuple):
+    code: str
+    kana: str
+    name: str
+
+
+class EarthquakeForecast(NamedTuple):
+    code: str
+    name: str
+    note: str
+
+
+class EarthquakeInformation(NamedTuple):
+    code: str
+    name: str
+    note: str
+
+
+class EarthquakeWarning(NamedTuple):
+    code: str
+    name: str
+
+
+class PhenologicalType(NamedTuple):
+    classNames: tuple[str, ...]
+    name: str
+
+
+class PointRealtimeSeismicIntensityCityToSaibun(NamedTuple):
+    cityCode: str
+    cityName: str
+    seisSaibunCode: str
+    seisSaibunName: str
+
+
+class PointRealtimeSeismicIntensityPointToCity(NamedTuple):
+    cityCode: str
+    cityName: str
+    code: str
+    name: str
+    seisSaibunCode: str
+    seisSaibunName: str
+
+
+class PointSeismicIntensityCityToSaibun(NamedTuple):
+    cityCode: str
+    cityKana: str
+    cityName: str
+    seisSaibunCode: str
+    seisSaibunKana: str
+    seisSaibunName: str
+
+
+class PointSeismicIntensityPointToCity(NamedTuple):
+    cityCode: str
+    cityKana: str
+    cityName: str
+    code: str
+    kana: str
+    lnglat: tuple[float, ...]
+    name: str
+    seisSaibunCode: str
+    seisSaibunKana: str
+    seisSaibunName: str
+
+
+class PointSeismicLgIntensity(NamedTuple):
+    code: str
+    code2: str
+    kana: str
+    name: str
+    name2: str
+
+
+class PointTsunami(NamedTuple):
+    code: str
+    kana: str
+    name: str
+    code2: Optional[str] = None
+    lnglat: Optional[tuple[float, ...]] = None
+    name2: Optional[str] = None
+    owner: Optional[str] = None
+
+
+class PointVolcano(NamedTuple):
+    code: str
+    kana: str
+    name: str
+    lnglat: Optional[tuple[float, ...]] = None
+    note: Optional[str] = None
+
+
+class TokaiInformation(NamedTuple):
+    code: str
+    name: str
+
+
+class TsunamiWarning(NamedTuple):
+    code: str
+    name: str
+    note: Optional[str] = None
+
+
+class VolcanicWarning(NamedTuple):
+    code: str
+    name: str
+    note: Optional[str] = None
+
+
+class WaterLevelStation(NamedTuple):
+    name: str
+    river: str
+
+
+class WmoObservingStations(NamedTuple):
+    lnglat: tuple[float, ...]
+    point: str
+    kana: Optional[str] = None
+
+
+class AmedasAme(NamedTuple):
+    address: str
+    elevation: int
+    kana: str
+    kind: str
+    lnglat: tuple[float, ...]
+    name: str
+    regionalBreau: str
+    startDate: str
+    anemometerHeight: Optional[float] = None
+    note1: Optional[float] = None
+    note2: Optional[str] = None
+    thermometerHeight: Optional[float] = None
+
+
+class AmedasSnow(NamedTuple):
+    address: str
+    elevation: int
+    kana: str
+    kind: str
+    lnglat: tuple[float, ...]
+    name: str
+    regionalBreau: str
+    startDate: str
+
+
+class ForecastAreaTree(NamedTuple):
+    kana: str
+    level: str
+    name: str
+    children: Optional[dict[str, tuple[str, ...]]] = None
+    fuken: Optional[str] = None
+    ichiji: Optional[str] = None
+    matome: Optional[str] = None
+    saibun: Optional[str] = None
+
+
+# 「表の名前.部分」 -> レコードの型
+RECORD_TYPES: dict[str, type] = {
+    "AdditionalCommentEarthquake.items": AdditionalCommentEarthquake,
+    "AreaEpicenter.items": AreaEpicenter,
+    "AreaEpicenterAbbreviation.items": AreaEpicenterAbbreviation,
+    "AreaEpicenterDetail.items": AreaEpicenterDetail,
+    "AreaEpicenterSuppliment.items": AreaEpicenterSuppliment,
+    "AreaFloodForecast.items": AreaFloodForecast,
+    "AreaForecast.items": AreaForecast,
+    "AreaForecastEEW.items": AreaForecastEEW,
+    "AreaForecastLocalEEW.items": AreaForecastLocalEEW,
+    "AreaInformationPrefectureEarthquake.items": AreaInformationPrefectureEarthquake,
+    "AreaMarineA.items": AreaMarineA,
+    "AreaMarineJ.items": AreaMarineJ,
+    "AreaRiver.items": AreaRiver,
+    "AreaTsunami.items": AreaTsunami,
+    "CoastTsunami.items": CoastTsunami,
+    "EarthquakeForecast.items": EarthquakeForecast,
+    "EarthquakeInformation.items": EarthquakeInformation,
+    "EarthquakeWarning.items": EarthquakeWarning,
+    "PhenologicalType.items": PhenologicalType,
+    "PointRealtimeSeismicIntensity.cityToSaibun": PointRealtimeSeismicIntensityCityToSaibun,
+    "PointRealtimeSeismicIntensity.pointToCity": PointRealtimeSeismicIntensityPointToCity,
+    "PointSeismicIntensity.cityToSaibun": PointSeismicIntensityCityToSaibun,
+    "PointSeismicIntensity.pointToCity": PointSeismicIntensityPointToCity,
+    "PointSeismicLgIntensity.items": PointSeismicLgIntensity,
+    "PointTsunami.items": PointTsunami,
+    "PointVolcano.items": PointVolcano,
+    "TokaiInformation.items": TokaiInformation,
+    "TsunamiWarning.items": TsunamiWarning,
+    "VolcanicWarning.items": VolcanicWarning,
+    "WaterLevelStation.items": WaterLevelStation,
+    "WmoObservingStations.items": WmoObservingStations,
+    "amedas_ame.items": AmedasAme,
+    "amedas_snow.items": AmedasSnow,
+    "forecast_area_tree.items": ForecastAreaTree,
+}
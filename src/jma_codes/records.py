@@ -0,0 +1,114 @@
+"""コード表を型付きのレコードとして読み込む
+
+レコードを jma_codes.record_types (tools/record_types.py で生成) の NamedTuple に変換します。
+json.load の「辞書の辞書」と比べて、レコードごとのフィールド名の文字列とハッシュ表を持たず、
+文字列は sys.intern で共有するため (cityName, seisSaibunName, level など、同じ値が
+多くのレコードに現れる)、メモリ使用量が小さくなります。リストはタプルにします。
+
+```python
+from jma_codes.records import load_records
+
+points = load_records("PointSeismicIntensity", "pointToCity")
+points["0110100"].seisSaibunName  # "石狩地方中部"
+```
+"""
+
+import json
+import sys
+from functools import lru_cache
+from typing import Any
+
+from ._loader import _tables, table_path
+from .record_types import RECORD_TYPES
+
+
+def _freeze(value: Any) -> Any:
+    """文字列を intern し、リストをタプルにする"""
+
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return {sys.intern(k): _freeze(v) for k, v in value.items()}
+    return value
+
+
+def record_type(name: str, part: str = "items") -> type:
+    """コード表のレコードの型 (レコードが辞書でない表は KeyError)"""
+
+    return RECORD_TYPES[f"{name}.{part}"]
+
+
+def _record_types_of(name: str) -> dict[str, Any]:
+    """表の部分 -> レコードの型"""
+
+    prefix = f"{name}."
+    return {
+        key.removeprefix(prefix): cls
+        for key, cls in RECORD_TYPES.items()
+        if key.startswith(prefix)
+    }
+
+
+def _convert(cls: Any, record: Any) -> Any:
+    if type(record) is cls:
+        return record
+    if not isinstance(record, dict):
+        record = record._asdict()  # 別の部分の型にしていたもの
+    return cls(**{k: _freeze(v) for k, v in record.items()})
+
+
+def _decode(name: str) -> dict[str, dict[str, Any]]:
+    """JSONを読みながら、各部分のレコードを順に NamedTuple に変換する
+
+    読み終えてから変換すると、辞書の辞書全体がいったんメモリに載るため、
+    いずれかの部分の型のフィールドがそろった辞書は、デコードの途中
+    (object_pairs_hook) で変換する
+    """
+
+    classes = _record_types_of(name)
+    specs = [
+        (cls, set(cls._fields), set(cls._fields) - set(cls._field_defaults))
+        for cls in classes.values()
+    ]
+
+    def hook(pairs: list[tuple[str, Any]]) -> Any:
+        record = {sys.intern(k): v for k, v in pairs}
+        for cls, fields, required in specs:
+            if required <= record.keys() <= fields:
+                return _convert(cls, record)
+        return record
+
+    with open(table_path(name), encoding="utf-8") as f:
+        data = json.load(f, object_pairs_hook=hook)
+
+    # フィールドの名前だけでは部分を決められず、別の部分の型にしたものは変換し直す
+    return {
+        part: {code: _convert(cls, record) for code, record in data[part].items()}
+        for part, cls in classes.items()
+    }
+
+
+@lru_cache(maxsize=None)
+def _load(name: str) -> dict[str, dict[str, Any]]:
+    if (table := _tables.get(name)) is None:
+        return _decode(name)
+    return {
+        part: {
+            sys.intern(code): _convert(cls, record)
+            for code, record in table[part].items()
+        }
+        for part, cls in _record_types_of(name).items()
+    }
+
+
+def load_records(name: str, part: str = "items") -> dict[str, Any]:
+    """コード表を、コード -> レコード (NamedTuple) の辞書として読み込む
+
+    表のすべての部分をまとめて変換する。load_table で読み込み済みであればそれを変換し、
+    そうでなければJSONから直接読む (辞書の辞書をプロセス内に残さない)
+    """
+
+    record_type(name, part)  # レコードが辞書でない表は KeyError
+    return _load(name)[part]
@@ -0,0 +1,172 @@
+"""コードの種別 (codeType) からコード表を引く
+
+tools/code_type_registry.py で生成した code_type_registry.json をもとに、種別ごとに
+「コード -> 名前・ふりがな・上位の区域」の辞書を、その種別が初めて引かれたときに作ります。
+以降、種別とコードからの解決は辞書を2回引くだけで済みます。
+
+```python
+from jma_codes.registry import load_registry
+
+registry = load_registry()
+registry.lookup("震度観測点", "0110100").name  # "札幌中央区北２条"
+registry.lookup("潮位観測点", "305").code  # "00305" (ゼロ埋めを補う)
+registry.kind_code_type("気象警報・注意報（市町村等）")  # "警報等情報要素／気象警報・注意報"
+```
+"""
+
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Optional
+
+from ._loader import load_table
+from .area_tree import load_forecast_area_tree
+
+# レコードのフィールドのうち、上位の区域を表すもの (フィールド名 -> 階層名)
+PARENT_FIELDS: dict[str, str] = {
+    "cityCode": "city",
+    "seisSaibunCode": "seisSaibun",
+}
+
+
+@dataclass(frozen=True)
+class ResolvedCode:
+    code_type: str
+    code: str
+    table: Optional[str] = None  # コードが見つかったコード表 (見つからなければ None)
+    name: Optional[str] = None
+    kana: Optional[str] = None
+    parents: dict[str, str] = field(default_factory=dict)  # 階層名 -> コード
+    record: Any = None  # コード表のレコード
+
+    @property
+    def found(self) -> bool:
+        return self.table is not None
+
+
+def _resolve_source(
+    code_type: str, source: Mapping[str, Any]
+) -> dict[str, ResolvedCode]:
+    table = source["table"]
+    items: Mapping[str, Any] = load_table(table)[source["part"]]
+    name_field, kana_field = source["name"], source["kana"]
+
+    if (key := source["key"]) is not None:
+        # コード以外のフィールドをキーにする表は、キーごとに最初のレコードの名前・
+        # ふりがなを使う (レコード自体は、そのコードのものではないため持たない)
+        result: dict[str, ResolvedCode] = {}
+        for record in items.values():
+            if (code := record[key]) not in result:
+                result[code] = ResolvedCode(
+                    code_type,
+                    code,
+                    table,
+                    record.get(name_field),
+                    record.get(kana_field) if kana_field else None,
+                )
+        return result
+
+    tree = load_forecast_area_tree() if table == "forecast_area_tree" else None
+    result = {}
+    for code, record in items.items():
+        if isinstance(record, str):
+            result[code] = ResolvedCode(code_type, code, table, record, record=record)
+            continue
+        if tree is not None:
+            parents = tree.ancestors(code)
+        else:
+            parents = {
+                level: record[key]
+                for key, level in PARENT_FIELDS.items()
+                if record.get(key)
+            }
+        result[code] = ResolvedCode(
+            code_type,
+            code,
+            table,
+            record.get(name_field) if name_field else None,
+            record.get(kana_field) if kana_field else None,
+            parents,
+            record,
+        )
+    return result
+
+
+class CodeTypeRegistry:
+    def __init__(self, registry: Mapping[str, Any]) -> None:
+        self._code_types: Mapping[str, Any] = registry["codeTypes"]
+        self._info_kinds: Mapping[str, list[str]] = registry["infoKinds"]
+        self._info_types: Mapping[str, Any] = registry["infoTypes"]
+        self._codes: dict[str, dict[str, ResolvedCode]] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, code_type: object) -> bool:
+        return code_type in self._code_types
+
+    def code_types(self) -> list[str]:
+        return list(self._code_types)
+
+    def code_name(self, code_type: str) -> str:
+        """種別に対応するコード名 (例: "震度観測点" -> "PointSeismicIntensity")"""
+
+        return self._code_types[code_type]["codeName"]
+
+    def codes(self, code_type: str) -> dict[str, ResolvedCode]:
+        """種別のすべてのコード (コード -> 解決結果)
+
+        複数のコード表を引く種別では、前にあるコード表のものを優先する
+        """
+
+        if (codes := self._codes.get(code_type)) is not None:
+            return codes
+        with self._lock:
+            if (codes := self._codes.get(code_type)) is None:
+                codes = {}
+                for source in reversed(self._code_types[code_type]["sources"]):
+                    codes.update(_resolve_source(code_type, source))
+                self._codes[code_type] = codes
+        return codes
+
+    def lookup(self, code_type: str, code: str) -> Optional[ResolvedCode]:
+        """種別とコードから引く (未知の種別やコードの場合は None)
+
+        桁数の決まった種別では、ゼロ埋めを省いたコードも引ける
+        """
+
+        codes = self._codes.get(code_type)
+        if codes is None:
+            if code_type not in self._code_types:
+                return None
+            codes = self.codes(code_type)
+        if (resolved := codes.get(code)) is not None:
+            return resolved
+
+        width = self._code_types[code_type]["width"]
+        if width is not None and len(code) < width and code.isdigit():
+            return codes.get(code.zfill(width))
+        return None
+
+    def kind_code_type(self, info_type: str) -> Optional[str]:
+        """Information/@type などの値から、その Kind/Code の種別を返す"""
+
+        if (entry := self._info_types.get(info_type)) is None:
+            return None
+        return entry["kind"]
+
+    def area_code_types(self, info_type: str) -> list[str]:
+        """Information/@type などの値から、区域・地点のコードの種別を返す"""
+
+        if (entry := self._info_types.get(info_type)) is None:
+            return []
+        return entry["areas"]
+
+    def info_kind_code_types(self, info_kind: str) -> list[str]:
+        """出現電文 (InfoKind) から、その電文に現れる種別を返す"""
+
+        return self._info_kinds.get(info_kind, [])
+
+
+@lru_cache(maxsize=None)
+def load_registry() -> CodeTypeRegistry:
+    return CodeTypeRegistry(load_table("code_type_registry"))
@@ -0,0 +1,370 @@
+"""地域・地点の名前とふりがなによる検索
+
+区域・観測点の表の名前とふりがなを正規化し (NFKC、カタカナをひらがなに、英字を小文字に、
+空白を除く)、その文字 (1-gram)・2文字 (2-gram) ごとのポスティングリストを持つ次のような
+バイナリ形式に変換して、mmap したまま検索できるようにします。
+
+- ヘッダ: マジック (8 bytes), メタデータの長さ, エントリ数, キー数, n-gram 数 (uint32 ×4)
+- n-gram: n-gram 数 × uint64 (昇順)
+- ポスティングの位置: (n-gram 数 + 1) × uint32
+- ポスティング: キー番号 (uint32, n-gram ごとに昇順)
+- キーのエントリ番号: キー数 × uint32
+- キーの位置: (キー数 + 1) × uint32
+- エントリの位置: (エントリ数 + 1) × uint32
+- キーの長さ (文字数): キー数 × uint16
+- キーの表・フィールド: キー数 × uint8 ×2
+- メタデータ: 表とフィールドの名前の一覧 (JSON)
+- キー: 正規化した文字列 (UTF-8)
+- エントリ: [表, コード, 名前, ふりがな] (JSON)
+
+n-gram は「文字コード << 32 | 次の文字コード」で、キーの先頭のものは最上位ビットを立てて
+別にも登録し、前方一致の判定に使います。検索結果は、完全一致・前方一致・部分一致の順、
+同じ順位ではキーの短い順、表 (SOURCES の順)・コードの順に並びます。
+
+```python
+from jma_codes.search import load_search_index
+
+index = load_search_index()
+index.search("さっぽろ", limit=5)
+index.search("ｻｯﾎﾟﾛ", tables=["amedas_ame"])
+```
+"""
+
+import heapq
+import json
+import mmap
+import struct
+import unicodedata
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from ._loader import load_table, snapshot_dir, snapshot_is_current
+
+MAGIC = b"JMANGRM1"
+_HEADER = struct.Struct("<8sIIII")
+_START = 1 << 63  # キーの先頭の n-gram
+
+# 表の名前 -> (部分, 検索するフィールド)
+# 最初のフィールドを名前として返す
+SOURCES: dict[str, tuple[str, list[str]]] = {
+    "forecast_area_tree": ("items", ["name", "kana"]),
+    "AreaInformationPrefectureEarthquake": ("items", ["name"]),
+    "AreaForecastLocalEEW": ("items", ["name", "kana"]),
+    "AreaEpicenter": ("items", ["name"]),
+    "AreaTsunami": ("items", ["name", "kana"]),
+    "AreaMarineA": ("items", ["name", "kana"]),
+    "AreaMarineJ": ("items", ["name", "kana"]),
+    "AreaRiver": (
+        "items",
+        ["name", "kana", "alias1_name", "alias1_kana", "alias2_kana"],
+    ),
+    "AreaFloodForecast": ("items", ["name", "kana"]),
+    "WaterLevelStation": ("items", ["name"]),
+    "PointVolcano": ("items", ["name", "kana"]),
+    "PointTsunami": ("items", ["name", "kana"]),
+    "PointSeismicIntensity": ("pointToCity", ["name", "kana"]),
+    "amedas_ame": ("items", ["name", "kana"]),
+    "amedas_snow": ("items", ["name", "kana"]),
+    "WmoObservingStations": ("items", ["point"]),
+}
+
+MATCHES = ("exact", "prefix", "substring")
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
+# カタカナ (ァ-ヶ, ヽ, ヾ) -> ひらがな
+_KANA_FOLD = {c: c - 0x60 for c in [*range(0x30A1, 0x30F7), 0x30FD, 0x30FE]}
+
+
+def normalize(text: str) -> str:
+    """検索用の正規化 (NFKC、カタカナをひらがなに、英字を小文字に、空白を除く)"""
+
+    text = unicodedata.normalize("NFKC", text).lower().translate(_KANA_FOLD)
+    return "".join(text.split())
+
+
+def _key_grams(key: str) -> set[int]:
+    chars = [ord(c) for c in key]
+    grams = {c << 32 for c in chars}
+    grams.update(a << 32 | b for a, b in zip(chars, chars[1:]))
+    grams.add(_START | chars[0] << 32)
+    if len(chars) > 1:
+        grams.add(_START | chars[0] << 32 | chars[1])
+    return grams
+
+
+def _query_grams(query: str) -> tuple[list[int], int]:
+    """クエリを含むキーがすべて持つ n-gram と、前方一致の判定に使う n-gram"""
+
+    chars = [ord(c) for c in query]
+    if len(chars) == 1:
+        return [chars[0] << 32], _START | chars[0] << 32
+    grams = sorted({a << 32 | b for a, b in zip(chars, chars[1:])})
+    return grams, _START | chars[0] << 32 | chars[1]
+
+
+def _contains(sorted_array: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """values の各要素が、昇順の配列 sorted_array に含まれるか"""
+
+    if not len(sorted_array):
+        return np.zeros(len(values), dtype=bool)
+    i = np.searchsorted(sorted_array, values)
+    return sorted_array[np.minimum(i, len(sorted_array) - 1)] == values
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    table: str
+    code: str
+    name: Optional[str]
+    kana: Optional[str]
+    field: str  # 一致したフィールド
+    match: str  # "exact", "prefix", "substring" のいずれか
+
+
+def build_index(tables: Mapping[str, Mapping[str, Any]]) -> bytes:
+    """表の名前 -> items 相当の辞書 からインデックスのバイト列を作る
+
+    SOURCES にない表は無視する
+    """
+
+    names = [name for name in SOURCES if name in tables]
+    fields = list(dict.fromkeys(f for name in names for f in SOURCES[name][1]))
+
+    entries: list[bytes] = []
+    keys: list[tuple[str, int, int, int]] = []  # (キー, エントリ番号, 表, フィールド)
+    for table_id, name in enumerate(names):
+        items = tables[name]
+        name_fields = SOURCES[name][1]
+        for code in sorted(items):
+            record = items[code]
+            seen: set[str] = set()
+            for field in name_fields:
+                value = record.get(field)
+                if not isinstance(value, str) or not (key := normalize(value)):
+                    continue
+                if key not in seen:
+                    seen.add(key)
+                    keys.append((key, len(entries), table_id, fields.index(field)))
+            if seen:
+                entry = [name, code, record.get(name_fields[0]), record.get("kana")]
+                entries.append(json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+    postings: dict[int, list[int]] = {}
+    for key_id, (key, *_) in enumerate(keys):
+        for gram in _key_grams(key):
+            postings.setdefault(gram, []).append(key_id)
+    grams = sorted(postings)
+
+    encoded_keys = [k[0].encode("utf-8") for k in keys]
+    meta = json.dumps({"tables": names, "fields": fields}).encode("utf-8")
+    return b"".join(
+        [
+            _HEADER.pack(MAGIC, len(meta), len(entries), len(keys), len(grams)),
+            np.array(grams, dtype="<u8").tobytes(),
+            np.cumsum([0, *(len(postings[g]) for g in grams)], dtype="<u4").tobytes(),
+            np.array([i for g in grams for i in postings[g]], dtype="<u4").tobytes(),
+            np.array([k[1] for k in keys], dtype="<u4").tobytes(),
+            np.cumsum([0, *map(len, encoded_keys)], dtype="<u4").tobytes(),
+            np.cumsum([0, *map(len, entries)], dtype="<u4").tobytes(),
+            np.array([len(k[0]) for k in keys], dtype="<u2").tobytes(),
+            np.array([k[2] for k in keys], dtype="u1").tobytes(),
+            np.array([k[3] for k in keys], dtype="u1").tobytes(),
+            meta,
+            b"".join(encoded_keys),
+            b"".join(entries),
+        ]
+    )
+
+
+class SearchIndex:
+    """インデックスのバイト列を名前・ふりがなで検索する"""
+
+    def __init__(self, buffer: Buffer, offset: int = 0) -> None:
+        magic, meta_size, n_entries, n_keys, n_grams = _HEADER.unpack_from(
+            buffer, offset
+        )
+        if magic != MAGIC:
+            raise ValueError("not a search index")
+        pos = offset + _HEADER.size
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal pos
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=pos)
+            pos += array.nbytes
+            return array
+
+        self._grams = take("<u8", n_grams)
+        self._posting_offsets = take("<u4", n_grams + 1)
+        self._postings = take("<u4", int(self._posting_offsets[-1]))
+        self._key_entry = take("<u4", n_keys)
+        self._key_offsets = take("<u4", n_keys + 1)
+        self._entry_offsets = take("<u4", n_entries + 1)
+        self._key_length = take("<u2", n_keys)
+        self._key_table = take("u1", n_keys)
+        self._key_field = take("u1", n_keys)
+        meta = json.loads(bytes(buffer[pos : pos + meta_size]))
+        self._tables: list[str] = meta["tables"]
+        self._fields: list[str] = meta["fields"]
+        self._keys_start = pos + meta_size
+        self._entries_start = self._keys_start + int(self._key_offsets[-1])
+        self._buf = buffer
+        self._entries: dict[int, list[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entry_offsets) - 1
+
+    @property
+    def tables(self) -> list[str]:
+        return list(self._tables)
+
+    def _postings_of(self, grams: list[int]) -> list[Optional[np.ndarray]]:
+        """各 n-gram のポスティング (なければ None)"""
+
+        query = np.array(grams, dtype="<u8")
+        positions = np.searchsorted(self._grams, query).tolist()
+        result: list[Optional[np.ndarray]] = []
+        for gram, i in zip(grams, positions):
+            if i == len(self._grams) or int(self._grams[i]) != gram:
+                result.append(None)
+            else:
+                start, end = self._posting_offsets[i : i + 2].tolist()
+                result.append(self._postings[start:end])
+        return result
+
+    def _key(self, key_id: int) -> str:
+        start, end = self._key_offsets[key_id : key_id + 2].tolist()
+        return bytes(
+            self._buf[self._keys_start + start : self._keys_start + end]
+        ).decode("utf-8")
+
+    def _entry(self, entry_id: int) -> list[Any]:
+        if (entry := self._entries.get(entry_id)) is None:
+            start, end = self._entry_offsets[entry_id : entry_id + 2].tolist()
+            entry = self._entries[entry_id] = json.loads(
+                bytes(
+                    self._buf[self._entries_start + start : self._entries_start + end]
+                )
+            )
+        return entry
+
+    def _candidates(
+        self, query: str, tables: Optional[Iterable[str]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """クエリの n-gram をすべて持つキーと、その仮の順位"""
+
+        grams, start = _query_grams(query)
+        *postings, start_posting = self._postings_of([*grams, start])
+        if any(p is None for p in postings):
+            return np.empty(0, "<u4"), np.empty(0, "u1")
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = candidates[_contains(posting, candidates)]
+
+        if tables is not None:
+            tables = set(tables)
+            table_ids = [i for i, t in enumerate(self._tables) if t in tables]
+            candidates = candidates[np.isin(self._key_table[candidates], table_ids)]
+
+        # 先頭の n-gram が一致するものを前方一致、さらに長さも同じものを完全一致とする
+        # (3文字以上のクエリでは、キーの文字列で確かめるまで仮の順位)
+        if start_posting is not None:
+            prefix = _contains(start_posting, candidates)
+        else:
+            prefix = np.zeros(len(candidates), dtype=bool)
+        exact = self._key_length[candidates] == len(query)
+        rank = np.where(prefix, np.where(exact, 0, 1), 2).astype("u1")
+        return candidates, rank
+
+    def _ranked(
+        self, query: str, candidates: np.ndarray, rank: np.ndarray
+    ) -> Iterator[tuple[int, int]]:
+        """(キー番号, 順位) を順位・キーの長さ・キー番号の順に返す"""
+
+        lengths = self._key_length[candidates]
+        order = np.lexsort((candidates, lengths, rank))
+        if len(query) <= 2:
+            # 1-gram・2-gram の一致だけでクエリを含むことがわかる
+            for i in order:
+                yield int(candidates[i]), int(rank[i])
+            return
+
+        # 先頭の2文字だけが一致していたキーは、部分一致に降格して並べ直す
+        demoted: list[tuple[int, int]] = []  # (キーの長さ, キー番号)
+        for i in order:
+            key_id, r, length = int(candidates[i]), int(rank[i]), int(lengths[i])
+            if r == 2:
+                while demoted and demoted[0] < (length, key_id):
+                    yield heapq.heappop(demoted)[1], 2
+            key = self._key(key_id)
+            if query not in key:
+                continue
+            if r < 2 and not key.startswith(query):
+                heapq.heappush(demoted, (length, key_id))
+                continue
+            yield key_id, r
+        while demoted:
+            yield heapq.heappop(demoted)[1], 2
+
+    def search(
+        self, query: str, limit: int = 10, tables: Optional[Iterable[str]] = None
+    ) -> list[SearchHit]:
+        """名前・ふりがなにクエリを含む地域・地点を、一致の度合いの高い順に最大 limit 件
+
+        同じ地域・地点は、最もよく一致したフィールドで1件だけ返す
+        """
+
+        query = normalize(query)
+        if not query or limit <= 0:
+            return []
+        candidates, rank = self._candidates(query, tables)
+
+        hits: list[SearchHit] = []
+        seen: set[int] = set()
+        for key_id, r in self._ranked(query, candidates, rank):
+            entry_id = int(self._key_entry[key_id])
+            if entry_id in seen:
+                continue
+            seen.add(entry_id)
+            table, code, name, kana = self._entry(entry_id)
+            field = self._fields[self._key_field[key_id]]
+            hits.append(SearchHit(table, code, name, kana, field, MATCHES[r]))
+            if len(hits) == limit:
+                break
+        return hits
+
+
+def index_path() -> Path:
+    """インデックスファイル (tools/search_index.py で生成) のパスを返す"""
+
+    return snapshot_dir() / "names.ngram"
+
+
+def load_sources() -> dict[str, Mapping[str, Any]]:
+    """SOURCES の各表の items 相当の辞書"""
+
+    return {name: load_table(name)[part] for name, (part, _) in SOURCES.items()}
+
+
+@lru_cache(maxsize=None)
+def load_search_index() -> SearchIndex:
+    """インデックスを開く
+
+    インデックスファイルがあれば mmap して使い、なければコード表から作る。
+    インデックスファイルが SOURCES の表のJSONより古ければ使わない
+    """
+
+    path = index_path()
+    try:
+        if snapshot_is_current(path, SOURCES):
+            with open(path, "rb") as f:
+                return SearchIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        pass
+    return SearchIndex(build_index(load_sources()))
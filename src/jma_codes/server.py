@@ -0,0 +1,381 @@
+"""コード表を引く HTTP サーバ
+
+標準ライブラリの asyncio だけで動く、HTTP/1.1 のサーバです。接続は既定で持続し
+(keep-alive; HTTP/1.0 では Connection: keep-alive を付けた場合のみ)、1つの接続で
+続けてリクエストを送れます。表は load_table で読みます。
+
+$ python -m jma_codes.server [--host 127.0.0.1] [--port 8080]
+
+- GET /tables: 表の名前と ETag の一覧
+- GET /tables/{表}: 表全体
+- GET /tables/{表}/{部分}/{コード}: 1つのレコード
+- GET /tables/{表}/{部分}?codes=a,b,c: 複数のレコード ({コード: レコードまたは null})
+- POST /lookup: 複数のレコードをまとめて引く。本文は次のいずれか (JSON)
+    - {"table": 表, "part": 部分 (省略時は items), "codes": [コード, ...]}
+    - {"codeType": 種別, "codes": [コード, ...]} (jma_codes.registry で解決する)
+
+GET の応答には、表のJSONファイルの内容から求めた ETag を付け、If-None-Match が
+一致すれば (W/ の付いた弱い ETag も同じものとみなす) 304 を返します。
+
+複数のレコードを引くリクエストと表全体の取得は、イベントループを止めないよう
+別のスレッド (既定では1つ) で処理し、1つのレコードを引くリクエストや 304 の応答を
+その後ろで待たせません。処理はGILを取り合うため、スレッドを増やしてもスループットは
+ほとんど上がりません。大きなリクエストが多い場合は、サーバをポートを分けて
+複数起動し、単発のリクエストと振り分けてください。
+"""
+
+import argparse
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+from collections.abc import Mapping
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ._loader import load_table, table_names, table_path
+from .registry import load_registry
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 16 * 1024 * 1024
+IDLE_TIMEOUT = 60.0  # 次のリクエストを待つ時間 (秒)
+
+_REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: Optional[str] = None) -> None:
+        super().__init__(message or _REASONS[status])
+        self.status = status
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def table_etag(name: str) -> str:
+    """表のJSONファイルの内容から求めた ETag"""
+
+    with open(table_path(name), "rb") as f:
+        return '"' + hashlib.sha256(f.read()).hexdigest()[:16] + '"'
+
+
+@lru_cache(maxsize=None)
+def _table_body(name: str) -> bytes:
+    table = load_table(name)
+    return _dumps({part: dict(items.items()) for part, items in table.items()})
+
+
+def _records(name: str, part: str, codes: list[str]) -> dict[str, Any]:
+    if name not in table_names():
+        raise HTTPError(404, f"unknown table: {name}")
+    items: Optional[Mapping[str, Any]] = load_table(name).get(part)
+    if items is None:
+        raise HTTPError(404, f"unknown part: {name}/{part}")
+    return {code: items.get(code) for code in codes}
+
+
+def _resolve(code_type: str, codes: list[str]) -> dict[str, Any]:
+    registry = load_registry()
+    if code_type not in registry:
+        raise HTTPError(404, f"unknown codeType: {code_type}")
+    result = {}
+    for code in codes:
+        resolved = registry.lookup(code_type, code)
+        result[code] = resolved and {
+            "code": resolved.code,
+            "table": resolved.table,
+            "name": resolved.name,
+            "kana": resolved.kana,
+            "parents": resolved.parents,
+        }
+    return result
+
+
+def _string(value: Any, key: str) -> str:
+    if not isinstance(value, str):
+        raise HTTPError(400, f"{key} must be a string")
+    return value
+
+
+def _codes(value: Any) -> list[str]:
+    if not isinstance(value, list) or not all(isinstance(c, str) for c in value):
+        raise HTTPError(400, "codes must be a list of strings")
+    return value
+
+
+class Request:
+    def __init__(
+        self,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        body: bytes,
+        version: str = "HTTP/1.1",
+    ) -> None:
+        self.method = method
+        self.version = version
+        url = urlsplit(target)
+        self.path = [unquote(p) for p in url.path.split("/") if p]
+        self.query = parse_qs(url.query)
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        """接続を持続するか (HTTP/1.0 では Connection: keep-alive がある場合のみ)"""
+
+        options = {
+            o.strip() for o in self.headers.get("connection", "").lower().split(",")
+        }
+        if "close" in options:
+            return False
+        return self.version != "HTTP/1.0" or "keep-alive" in options
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match が ETag に一致するか (弱い比較: W/ の有無を問わない)"""
+
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+def handle(request: Request) -> tuple[int, bytes, Optional[str]]:
+    """リクエストを処理し、(ステータス, 本文, ETag) を返す"""
+
+    path = request.path
+    if path == ["lookup"]:
+        if request.method != "POST":
+            raise HTTPError(405)
+        try:
+            query = json.loads(request.body)
+        except ValueError:
+            raise HTTPError(400, "invalid JSON") from None
+        if not isinstance(query, dict):
+            raise HTTPError(400, "request body must be an object")
+        codes = _codes(query.get("codes"))
+        if "codeType" in query:
+            code_type = _string(query["codeType"], "codeType")
+            return 200, _dumps(_resolve(code_type, codes)), None
+        if "table" not in query:
+            raise HTTPError(400, "table or codeType is required")
+        name = _string(query["table"], "table")
+        part = _string(query.get("part", "items"), "part")
+        return 200, _dumps(_records(name, part, codes)), None
+
+    if request.method not in ("GET", "HEAD") or not path or path[0] != "tables":
+        raise HTTPError(405 if path and path[0] == "tables" else 404)
+    if len(path) == 1:
+        names = table_names()
+        return 200, _dumps({name: table_etag(name) for name in names}), None
+
+    name = path[1]
+    if name not in table_names():
+        raise HTTPError(404, f"unknown table: {name}")
+    etag = table_etag(name)
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return 304, b"", etag
+
+    if len(path) == 2:
+        return 200, _table_body(name), etag
+    if len(path) == 3 and "codes" in request.query:
+        codes = [c for v in request.query["codes"] for c in v.split(",") if c]
+        return 200, _dumps(_records(name, path[2], codes)), etag
+    if len(path) == 4:
+        record = _records(name, path[2], [path[3]])[path[3]]
+        if record is None:
+            raise HTTPError(404, f"unknown code: {path[3]}")
+        return 200, _dumps(record), etag
+    raise HTTPError(404)
+
+
+def _is_batch(request: Request) -> bool:
+    """スレッドプールで処理するリクエストか (複数のレコードを引く・表全体を返す)"""
+
+    path = request.path
+    return (
+        path == ["lookup"]
+        or (len(path) == 2 and path[0] == "tables")
+        or (len(path) == 3 and "codes" in request.query)
+    )
+
+
+def _handle_safely(request: Request) -> tuple[int, bytes, Optional[str]]:
+    try:
+        return handle(request)
+    except HTTPError as e:
+        return e.status, _dumps({"error": str(e)}), None
+    except Exception:
+        logger.exception("error while handling %s %s", request.method, request.path)
+        return 500, _dumps({"error": _REASONS[500]}), None
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+    """リクエストを1つ読む (接続が閉じられていれば None)"""
+
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise HTTPError(400) from None
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(431) from None
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400) from None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+    if "transfer-encoding" in headers:
+        raise HTTPError(411)
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length") from None
+    if length < 0:
+        raise HTTPError(400, "invalid Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413)
+    try:
+        body = await reader.readexactly(length) if length else b""
+    except asyncio.IncompleteReadError:
+        # 本文の途中で接続が閉じられた
+        return None
+    return Request(method, target, headers, body, version)
+
+
+def _response(
+    status: int,
+    body: bytes,
+    etag: Optional[str] = None,
+    keep_alive: bool = True,
+    head: bool = False,
+) -> bytes:
+    headers = [
+        f"HTTP/1.1 {status} {_REASONS[status]}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    if status != 304:
+        headers.append("Content-Type: application/json; charset=utf-8")
+    if etag is not None:
+        headers.append(f"ETag: {etag}")
+        headers.append("Cache-Control: no-cache")
+    return (
+        "\r\n".join(headers).encode("latin-1") + b"\r\n\r\n" + (b"" if head else body)
+    )
+
+
+async def _serve_connection(
+    executor: Executor, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(_read_request(reader), IDLE_TIMEOUT)
+            except HTTPError as e:
+                writer.write(
+                    _response(e.status, _dumps({"error": str(e)}), None, False)
+                )
+                break
+            if request is None:
+                break
+            if _is_batch(request):
+                loop = asyncio.get_running_loop()
+                status, body, etag = await loop.run_in_executor(
+                    executor, _handle_safely, request
+                )
+            else:
+                status, body, etag = _handle_safely(request)
+            writer.write(
+                _response(
+                    status, body, etag, request.keep_alive, request.method == "HEAD"
+                )
+            )
+            await writer.drain()
+            if not request.keep_alive:
+                break
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(
+    host: str = "127.0.0.1", port: int = 8080, batch_workers: int = 1
+) -> asyncio.Server:
+    """サーバを起動する (呼び出し側で serve_forever などを呼ぶ)
+
+    最初のリクエストを待たせないよう、すべての表を読み込み、ETag を求めておく。
+    batch_workers は、複数のレコードを引くリクエストを処理するスレッドの数
+    """
+
+    for name in table_names():
+        load_table(name)
+        table_etag(name)
+    executor = ThreadPoolExecutor(batch_workers, thread_name_prefix="jma_codes")
+    return await asyncio.start_server(
+        functools.partial(_serve_connection, executor),
+        host,
+        port,
+        limit=MAX_HEADER_SIZE,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m jma_codes.server", description="コード表を引く HTTP サーバ"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=1,
+        help="複数のレコードを引くリクエストを処理するスレッドの数",
+    )
+    args = parser.parse_args()
+
+    async def run() -> None:
+        server = await serve(args.host, args.port, args.batch_workers)
+        for sock in server.sockets:
+            print(f"listening on {sock.getsockname()}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
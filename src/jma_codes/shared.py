@@ -0,0 +1,203 @@
+"""共有メモリ上のコード表
+
+1つのプロセス (サーバ) がすべてのコード表を読み込み、各部分 (items, pointToCity など) を
+jma_codes.codeindex の形式にして、multiprocessing.shared_memory の1つのブロックに並べます。
+ワーカーはブロックの名前を指定して読み取り専用でアタッチし、JSONの解析なしに
+コードで引けます。ブロックのページは全プロセスで共有されるため、ワーカーを増やしても
+コード表の分のメモリは増えません。ブロックの形式は次のとおりです。
+
+- ヘッダ: マジック (8 bytes), 目次の位置 (uint64), 目次の長さ (uint64)
+- 各部分のインデックス (8 バイト境界にそろえる)
+- 目次: {表の名前: {部分: [位置, 長さ]}} (JSON)
+
+サーバは ``python -m jma_codes.shared`` で起動し、ワーカーは attach (または、環境変数
+JMA_CODES_SHARED_MEMORY でブロックの名前を指定して attach_default) でアタッチします。
+load_table は共有メモリを使わず、常にファイルから読みます。
+
+アタッチして得られる表は「部分 -> CodeIndex」の辞書で、CodeIndex は読み取り専用の
+Mapping です。load_table の辞書とは次の点が異なります。
+
+- 反復の順序は、ファイル内の順序ではなくコード (UTF-8 のバイト列) の順
+- dict ではないため、json.dumps などには dict(...) に変換して渡す
+
+```python
+from jma_codes.shared import attach
+
+tables = attach("jma_codes")
+tables["PointSeismicIntensity"]["pointToCity"]["0110100"]["name"]  # "札幌中央区北２条"
+```
+"""
+
+import argparse
+import atexit
+import json
+import os
+import signal
+import struct
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Optional
+
+from ._loader import read_table_file, table_names
+from .codeindex import CodeIndex, build_index
+
+MAGIC = b"JMASHM01"
+_HEADER = struct.Struct("<8sQQ")
+_ALIGN = 8
+DEFAULT_NAME = "jma_codes"
+
+# ワーカーがアタッチするブロックの名前を指定する環境変数 (attach_default)
+SHARED_MEMORY_ENV = "JMA_CODES_SHARED_MEMORY"
+
+
+def build_image(names: Optional[Iterable[str]] = None) -> bytes:
+    """コード表 (省略時はすべて) を並べたブロックの内容を作る
+
+    共有メモリからではなく、常にファイル (JSON またはスナップショット) から読む
+    """
+
+    chunks = [b"\0" * _HEADER.size]
+    pos = _HEADER.size
+    toc: dict[str, dict[str, list[int]]] = {}
+    for name in table_names() if names is None else names:
+        for part, items in read_table_file(name).items():
+            blob = build_index(items)
+            toc.setdefault(name, {})[part] = [pos, len(blob)]
+            padding = -len(blob) % _ALIGN
+            chunks.append(blob + b"\0" * padding)
+            pos += len(blob) + padding
+
+    encoded = json.dumps(toc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    chunks[0] = _HEADER.pack(MAGIC, pos, len(encoded))
+    chunks.append(encoded)
+    return b"".join(chunks)
+
+
+class SharedTables(Mapping[str, dict[str, CodeIndex]]):
+    """共有メモリ上のコード表 (表の名前 -> 部分 -> CodeIndex)
+
+    各部分はコード順に反復する読み取り専用の Mapping (dict ではない)
+
+    owner が True のもの (publish で作ったもの) は、unlink でブロックを削除できる
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False) -> None:
+        self._shm = shm
+        self._owner = owner
+        self._buf: Optional[memoryview] = shm.buf.toreadonly()
+        magic, toc_start, toc_size = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a table block: {shm.name}")
+        self._toc: dict[str, dict[str, list[int]]] = json.loads(
+            bytes(self._buf[toc_start : toc_start + toc_size])
+        )
+        self._tables: dict[str, dict[str, CodeIndex]] = {}
+        # 表への参照が残ったまま終了すると、SharedMemory の後始末が失敗するため
+        atexit.register(self.close)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def size(self) -> int:
+        return self._shm.size
+
+    def __getitem__(self, name: str) -> dict[str, CodeIndex]:
+        if (table := self._tables.get(name)) is None:
+            if self._buf is None:
+                raise ValueError("shared memory is closed")
+            table = {
+                part: CodeIndex(self._buf, start)
+                for part, (start, _) in self._toc[name].items()
+            }
+            self._tables[name] = table
+        return table
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._toc)
+
+    def __len__(self) -> int:
+        return len(self._toc)
+
+    def close(self) -> None:
+        """アタッチを解除する (以降、このオブジェクトから得た表は使えない)"""
+
+        atexit.unregister(self.close)
+        self._tables.clear()
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """ブロックを削除する (アタッチ中のプロセスは、解除するまで使い続けられる)"""
+
+        if not self._owner:
+            raise ValueError("only the publishing process can unlink the block")
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedTables":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+
+def publish(
+    name: Optional[str] = DEFAULT_NAME, names: Optional[Iterable[str]] = None
+) -> SharedTables:
+    """コード表を共有メモリのブロック name (None なら自動で決める) に書き込む"""
+
+    image = build_image(names)
+    shm = shared_memory.SharedMemory(name, create=True, size=len(image))
+    shm.buf[: len(image)] = image
+    return SharedTables(shm, owner=True)
+
+
+def attach(name: str = DEFAULT_NAME) -> SharedTables:
+    """publish で作られたブロックに読み取り専用でアタッチする"""
+
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name)
+        # 3.12 以前では、アタッチしたプロセスの終了時にブロックが削除されてしまう
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return SharedTables(shm)
+
+
+@lru_cache(maxsize=None)
+def attach_default() -> SharedTables:
+    """環境変数 JMA_CODES_SHARED_MEMORY で指定されたブロックにアタッチする"""
+
+    return attach(os.environ[SHARED_MEMORY_ENV])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m jma_codes.shared",
+        description="コード表を共有メモリに展開し、終了するまで保持する",
+    )
+    parser.add_argument("--name", default=DEFAULT_NAME, help="ブロックの名前")
+    args = parser.parse_args()
+
+    with publish(args.name) as tables:
+        print(
+            f"{SHARED_MEMORY_ENV}={tables.name}"
+            f"  ({len(tables)} tables, {tables.size:,} bytes)",
+            flush=True,
+        )
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            signal.pause()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
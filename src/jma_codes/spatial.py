@@ -0,0 +1,283 @@
+"""地点の座標による検索 (最近傍・半径・範囲)
+
+地点のコードと座標 (lnglat) を、単位球面上の3次元ベクトルの KD 木として
+次のようなバイナリ形式に変換し、mmap したまま検索できるようにします。
+木は配列の並び順で表し (区間の中央の要素が節点)、ポインタは持ちません。
+
+- ヘッダ: マジック (8 bytes), 件数 (uint32), キーの幅 (uint32)
+- 座標: 件数 × 5 × float64 (x, y, z, 経度, 緯度; 木の順)
+- 分割軸: 件数 × uint8 (0: x, 1: y, 2: z)
+- キー: 件数 × キーの幅 (UTF-8, NUL埋め, 木の順)
+
+距離は大円距離 (メートル) です。
+"""
+
+import heapq
+import math
+import mmap
+import struct
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from ._loader import load_table, snapshot_dir, snapshot_is_current
+
+MAGIC = b"JMASPIX1"
+_HEADER = struct.Struct("<8sII")
+_POINT = struct.Struct("<5d")
+
+EARTH_RADIUS = 6371008.8  # 平均半径 (m)
+
+# レイヤ名 -> (コード表, 部分)
+LAYERS: dict[str, tuple[str, str]] = {
+    "amedas_ame": ("amedas_ame", "items"),
+    "amedas_snow": ("amedas_snow", "items"),
+    "WmoObservingStations": ("WmoObservingStations", "items"),
+    "PointSeismicIntensity": ("PointSeismicIntensity", "pointToCity"),
+    "PointTsunami": ("PointTsunami", "items"),
+    "PointVolcano": ("PointVolcano", "items"),
+}
+
+Buffer = Union[bytes, memoryview, mmap.mmap]
+
+
+def _to_xyz(lng: float, lat: float) -> tuple[float, float, float]:
+    lng, lat = math.radians(lng), math.radians(lat)
+    c = math.cos(lat)
+    return (c * math.cos(lng), c * math.sin(lng), math.sin(lat))
+
+
+def _chord_to_distance(chord: float) -> float:
+    return 2 * EARTH_RADIUS * math.asin(min(chord / 2, 1.0))
+
+
+def _distance_to_chord(distance: float) -> float:
+    return 2 * math.sin(min(distance / EARTH_RADIUS, math.pi) / 2)
+
+
+def distance(lng1: float, lat1: float, lng2: float, lat2: float) -> float:
+    """2点間の大円距離 (m)"""
+
+    a, b = _to_xyz(lng1, lat1), _to_xyz(lng2, lat2)
+    return _chord_to_distance(math.dist(a, b))
+
+
+def points_of(items: Mapping[str, Any]) -> dict[str, tuple[float, float]]:
+    """コード表の items 相当の辞書から、座標を持つ地点を取り出す (lnglat が null のものを除く)"""
+
+    return {
+        code: (item["lnglat"][0], item["lnglat"][1])
+        for code, item in items.items()
+        if item.get("lnglat") is not None
+    }
+
+
+def build_index(points: Mapping[str, tuple[float, float]]) -> bytes:
+    """コード -> (経度, 緯度) の辞書からインデックスのバイト列を作る"""
+
+    nodes = [(_to_xyz(lng, lat), lng, lat, code) for code, (lng, lat) in points.items()]
+    nodes.sort(key=lambda n: n[3])
+    axes = bytearray(len(nodes))
+
+    # 区間ごとに、広がりの最も大きい軸の中央値で分割する
+    stack = [(0, len(nodes))]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo <= 1:
+            continue
+        part = nodes[lo:hi]
+        axis = max(
+            range(3),
+            key=lambda a: max(n[0][a] for n in part) - min(n[0][a] for n in part),
+        )
+        part.sort(key=lambda n: n[0][axis])
+        nodes[lo:hi] = part
+        mid = (lo + hi) // 2
+        axes[mid] = axis
+        stack.append((lo, mid))
+        stack.append((mid + 1, hi))
+
+    keys = [n[3].encode("utf-8") for n in nodes]
+    width = max((len(k) for k in keys), default=0)
+    return b"".join(
+        [
+            _HEADER.pack(MAGIC, len(nodes), width),
+            b"".join(_POINT.pack(*xyz, lng, lat) for xyz, lng, lat, _ in nodes),
+            bytes(axes),
+            b"".join(k.ljust(width, b"\0") for k in keys),
+        ]
+    )
+
+
+class SpatialIndex:
+    """インデックスのバイト列を座標で検索する
+
+    検索結果は (コード, 距離 [m]) のリストで、距離の近い順に並びます。
+    """
+
+    def __init__(self, buffer: Buffer, offset: int = 0) -> None:
+        magic, count, width = _HEADER.unpack_from(buffer, offset)
+        if magic != MAGIC:
+            raise ValueError("not a spatial index")
+        self._count = count
+        self._width = width
+        points_start = offset + _HEADER.size
+        axes_start = points_start + count * _POINT.size
+        self._keys_start = axes_start + count
+        self._buf = buffer
+        self._coords = memoryview(buffer)[
+            points_start : points_start + count * _POINT.size
+        ].cast("d")
+        self._axes = bytes(buffer[axes_start : axes_start + count])
+        self._positions: Optional[dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_at(self, i: int) -> str:
+        pos = self._keys_start + i * self._width
+        return bytes(self._buf[pos : pos + self._width]).rstrip(b"\0").decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._key_at(i)
+
+    def __contains__(self, code: object) -> bool:
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self)}
+        return code in self._positions
+
+    def lnglat(self, code: str) -> tuple[float, float]:
+        """地点の座標 (経度, 緯度)"""
+
+        if code not in self:
+            raise KeyError(code)
+        assert self._positions is not None
+        return self._lnglat_at(self._positions[code])
+
+    def _lnglat_at(self, i: int) -> tuple[float, float]:
+        return (self._coords[i * 5 + 3], self._coords[i * 5 + 4])
+
+    def _search(
+        self, q: tuple[float, float, float], k: Optional[int], max_chord: float
+    ) -> list[tuple[int, float]]:
+        """q から弦の長さ max_chord 以内の地点の (位置, 距離) を近い順に最大 k 件"""
+
+        coords, axes = self._coords, self._axes
+        qx, qy, qz = q
+        heap: list[tuple[float, int]] = []  # (-弦の長さ, 位置)
+        bound = max_chord
+
+        def visit(lo: int, hi: int) -> None:
+            nonlocal bound
+            while lo < hi:
+                mid = (lo + hi) // 2
+                p = mid * 5
+                d = math.sqrt(
+                    (coords[p] - qx) ** 2
+                    + (coords[p + 1] - qy) ** 2
+                    + (coords[p + 2] - qz) ** 2
+                )
+                if d <= bound:
+                    heapq.heappush(heap, (-d, mid))
+                    if k is not None and len(heap) > k:
+                        heapq.heappop(heap)
+                    if k is not None and len(heap) == k:
+                        bound = -heap[0][0]
+                if hi - lo == 1:
+                    return
+                axis = axes[mid]
+                diff = q[axis] - coords[p + axis]
+                near, far = (
+                    ((lo, mid), (mid + 1, hi))
+                    if diff < 0
+                    else ((mid + 1, hi), (lo, mid))
+                )
+                visit(*near)
+                if abs(diff) > bound:
+                    return
+                lo, hi = far
+
+        visit(0, self._count)
+        return [
+            (i, _chord_to_distance(-neg))
+            for neg, i in sorted(heap, key=lambda x: (-x[0], x[1]))
+        ]
+
+    def nearest(
+        self, lng: float, lat: float, k: int = 1, max_distance: Optional[float] = None
+    ) -> list[tuple[str, float]]:
+        """最も近い k 地点"""
+
+        if k <= 0:
+            return []
+        max_chord = (
+            math.inf if max_distance is None else _distance_to_chord(max_distance)
+        )
+        found = self._search(_to_xyz(lng, lat), k, max_chord)
+        return [(self._key_at(i), d) for i, d in found]
+
+    def within(self, lng: float, lat: float, radius: float) -> list[tuple[str, float]]:
+        """半径 radius (m) 以内の地点"""
+
+        found = self._search(_to_xyz(lng, lat), None, _distance_to_chord(radius))
+        return [(self._key_at(i), d) for i, d in found]
+
+    def in_bbox(
+        self, west: float, south: float, east: float, north: float
+    ) -> list[str]:
+        """経度・緯度の範囲に含まれる地点 (west > east なら経度180度をまたぐ範囲)"""
+
+        if east < west:
+            east += 360
+        if east - west >= 180:
+            # 4隅が中心より近くなることがあるため、半径では絞り込めない
+            candidates: Iterable[int] = range(self._count)
+        else:
+            # 経度の幅が180度未満なら、中心から最も遠い点は4隅のいずれか
+            center_lng, center_lat = (west + east) / 2, (south + north) / 2
+            radius = max(
+                distance(center_lng, center_lat, lng, lat)
+                for lng in (west, east)
+                for lat in (south, north)
+            )
+            q = _to_xyz(center_lng, center_lat)
+            candidates = (
+                i for i, _ in self._search(q, None, _distance_to_chord(radius))
+            )
+        result = []
+        for i in candidates:
+            lng, lat = self._lnglat_at(i)
+            if south <= lat <= north and (
+                west <= lng <= east or west <= lng + 360 <= east
+            ):
+                result.append(self._key_at(i))
+        return sorted(result)
+
+
+def index_path(layer: str) -> Path:
+    """インデックスファイル (tools/spatial_index.py で生成) のパスを返す"""
+
+    return snapshot_dir() / f"{layer}.kdtree"
+
+
+@lru_cache(maxsize=None)
+def load_spatial_index(layer: str) -> SpatialIndex:
+    """レイヤ (LAYERS のいずれか) のインデックスを開く
+
+    インデックスファイルがあれば mmap して使い、なければコード表から作る。
+    インデックスファイルがコード表のJSONより古ければ使わない
+    """
+
+    if layer not in LAYERS:
+        raise KeyError(layer)
+    name, part = LAYERS[layer]
+    path = index_path(layer)
+    try:
+        if snapshot_is_current(path, [name]):
+            with open(path, "rb") as f:
+                return SpatialIndex(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    except FileNotFoundError:
+        pass
+    return SpatialIndex(build_index(points_of(load_table(name)[part])))
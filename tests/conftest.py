@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parents[1]
+
+
+@pytest.fixture
+def build_dir(tmp_path, monkeypatch):
+    """変換結果を書き出す一時ディレクトリ (./datasrc はリポジトリのものを使う)
+
+    変換は ./json/ などへの相対パスで書き出すため、このディレクトリに移動する
+    """
+
+    (tmp_path / "datasrc").symlink_to(ROOT / "datasrc")
+    (tmp_path / "json").mkdir()
+    monkeypatch.chdir(tmp_path)
+    for env in ("JMA_CODES_SHEET_CACHE", "JMA_CODES_OFFLINE", "JMA_CODES_REMOTE_CACHE"):
+        monkeypatch.delenv(env, raising=False)
+    return tmp_path
+
+
+def assert_same_files(output: Path, expected: Path) -> None:
+    """output 以下のファイルがすべて expected 以下の同名のファイルと同じ内容か"""
+
+    files = sorted(p.relative_to(output) for p in output.rglob("*") if p.is_file())
+    assert files
+    for path in files:
+        assert (output / path).read_bytes() == (expected / path).read_bytes(), path
@@ -0,0 +1,120 @@
+"""seis_and_volc のリモートのソースの代わりに使うフィクスチャを作る
+
+$ python tests/fixtures/make_remote_cache.py
+
+コミット済みの ./json/ の座標から、5つのソースと同じ形式の応答を作り、
+tests/fixtures/remote_cache/ に tools.utils.http_cache のキャッシュと同じ配置で書き出します。
+環境変数 JMA_CODES_REMOTE_CACHE にこのディレクトリを指定してオフラインで変換すると、
+ネットワークに接続せずにコミット済みのものと同じJSONが得られます。
+
+- stations.json: すべての震度観測点 (名前で引く最後の手段として使われ、座標がそのまま入る)
+- jma-shindo.html, K-net の CSV: 観測点を含めない (名前の照合で先に見つからないように)
+- volcano_list.json: 座標のある火山
+- stat_j.txt: 座標のある津波観測点のうち、datasrc/manual_input にないもの
+"""
+
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[2]))
+
+from tools.utils import http_cache, seisvolc_point  # noqa: E402
+
+ROOT = Path(__file__).parents[2]
+OUTPUT = Path(__file__).parent / "remote_cache"
+
+
+def _load(name: str) -> dict:
+    with open(ROOT / "json" / f"{name}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _degree_minute(value: float) -> tuple[int, str]:
+    """度と分 (文字列) の組のうち、degree_minute で value に戻るもの"""
+
+    degree = math.floor(value)
+    for digits in range(12):
+        minute = f"{(value - degree) * 60:.{digits}f}"
+        if degree + float(minute) / 60.0 == value:
+            return degree, minute
+    raise ValueError(f"cannot represent {value} in degrees and minutes")
+
+
+def stations() -> bytes:
+    items = _load("PointSeismicIntensity")["pointToCity"].values()
+    data = [
+        {"name": item["name"], "lon": item["lnglat"][0], "lat": item["lnglat"][1]}
+        for item in items
+        if item.get("lnglat")
+    ]
+    return json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8") + b"\n"
+
+
+def jma_shindo() -> bytes:
+    return (
+        '<html><head><meta charset="utf-8"></head><body><table>\n'
+        "<tr><td>地域名称</td><td>観測点名称</td><td>所在地</td>"
+        "<td>緯度(度)</td><td>緯度(分)</td><td>経度(度)</td><td>経度(分)</td></tr>\n"
+        "</table></body></html>\n"
+    ).encode("utf-8")
+
+
+def knet() -> bytes:
+    # 空の CSV は読めないため、どの観測点名にも含まれない名前の行を1つだけ置く
+    return "XXX000,（フィクスチャ）,FIXTURE,0.0,0.0,0,0,東京都\n".encode("cp932")
+
+
+def volcano_list() -> bytes:
+    data = [
+        {"code": code, "name": item["name"], "latlon": item["lnglat"][::-1]}
+        for code, item in _load("PointVolcano")["items"].items()
+        if "lnglat" in item
+    ]
+    return json.dumps(data, ensure_ascii=False, indent=1).encode("utf-8") + b"\n"
+
+
+def tsunami_stations() -> bytes:
+    with open(ROOT / "datasrc/manual_input/point_tsunami.json", encoding="utf-8") as f:
+        manual = json.load(f)
+    lines = [
+        "津波観測点一覧 (フィクスチャ)",
+        "",
+        "",
+        "コード 観測点名 度 分  度 分",
+    ]
+    for code, item in _load("PointTsunami")["items"].items():
+        if "lnglat" not in item or code in manual:
+            continue
+        lng, lat = item["lnglat"]
+        name = "".join(item["name"].split())
+        lines.append(
+            " ".join(
+                [code, name, *map(str, _degree_minute(lat)), " "]
+                + [*map(str, _degree_minute(lng)), item["owner"]]
+            )
+        )
+    # コードの列を文字列として読ませるため、数値でない行を置く (変換時に除かれる)
+    lines.append("以下は参考")
+    return ("\n".join(lines) + "\n").encode("cp932")
+
+
+def main() -> None:
+    os.environ[http_cache.CACHE_DIR_ENV] = str(OUTPUT)
+    contents = {
+        seisvolc_point.JMA_STATIONS_URL: stations(),
+        seisvolc_point.JMA_SHINDO_URL: jma_shindo(),
+        seisvolc_point.NIED_KNET_URL: knet(),
+        seisvolc_point.VOLCANO_LIST_URL: volcano_list(),
+        seisvolc_point.TSUNAMI_STATIONS_URL: tsunami_stations(),
+    }
+    for url, content in contents.items():
+        path = http_cache.cache_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import json
+import os
+
+import pytest
+
+from jma_codes import area_index
+
+
+@pytest.fixture
+def no_snapshot(monkeypatch, tmp_path):
+    """インデックスファイルのない環境 (wheel からのインストールなど)"""
+
+    monkeypatch.setattr(area_index, "index_path", lambda layer: tmp_path / layer)
+    area_index.load_area_index.cache_clear()
+    yield
+    area_index.load_area_index.cache_clear()
+
+
+def test_load_area_index_builds_from_shape_properties(no_snapshot):
+    index = area_index.load_area_index("city")
+    assert "1310100" in index.candidates(139.75, 35.69)
+
+
+def test_load_area_index_without_data(no_snapshot, monkeypatch, tmp_path):
+    monkeypatch.setattr(area_index, "shape_properties_dir", lambda: tmp_path)
+    with pytest.raises(FileNotFoundError, match="make update_snapshot"):
+        area_index.load_area_index("city")
+
+
+@pytest.mark.parametrize("delta, current", [(10**9, True), (-(10**9), False)])
+def test_stale_index_is_rebuilt(monkeypatch, tmp_path, delta, current):
+    source = area_index.shape_properties_dir() / "city.json"
+    with open(source, encoding="utf-8") as f:
+        areas = json.load(f)
+    # 元のJSONにない区域 (1つ目の区域と同じ外接矩形) を含むインデックスファイル
+    path = tmp_path / "city.rtree"
+    path.write_bytes(area_index.build_index([*areas, {**areas[0], "code": "9999999"}]))
+    mtime = source.stat().st_mtime_ns + delta
+    os.utime(path, ns=(mtime, mtime))
+    monkeypatch.setattr(area_index, "index_path", lambda layer: path)
+    area_index.load_area_index.cache_clear()
+    try:
+        index = area_index.load_area_index("city")
+    finally:
+        area_index.load_area_index.cache_clear()
+    lng, lat = areas[0]["centroid"]
+    assert ("9999999" in index.candidates(lng, lat)) == current
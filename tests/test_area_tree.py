@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from jma_codes import load_table
+from jma_codes.area_tree import LEVELS, load_forecast_area_tree
+
+ITEMS = load_table("forecast_area_tree")["items"]
+
+
+def _walk(code: str) -> set[str]:
+    """children をたどって、下位の区域をすべて集める"""
+
+    result: set[str] = set()
+    for children in ITEMS[code].get("children", {}).values():
+        for child in children:
+            result.add(child)
+            result |= _walk(child)
+    return result
+
+
+WALKS = {code: _walk(code) for code in ITEMS}
+
+
+def test_descendants_match_walk():
+    tree = load_forecast_area_tree()
+    for code, expected in WALKS.items():
+        descendants = tree.descendants(code)
+        assert len(descendants) == len(expected)
+        assert set(descendants) == expected, code
+        for level in LEVELS:
+            assert set(tree.descendants(code, level)) == {
+                c for c in expected if ITEMS[c]["level"] == level
+            }
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_contains_matches_walk(seed):
+    tree = load_forecast_area_tree()
+    for code in random.Random(seed).sample(sorted(ITEMS), 50):
+        for area_code, walk in WALKS.items():
+            expected = area_code == code or code in walk
+            assert tree.contains(area_code, code) == expected, (area_code, code)
+
+
+def test_contains_unknown_code():
+    tree = load_forecast_area_tree()
+    assert not tree.contains("9999999", "1310100")
+    assert not tree.contains("130000", "9999999")
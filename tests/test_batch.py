@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from jma_codes import load_table
+from jma_codes.batch import ColumnTable, load_columns
+
+TABLES = [
+    ("forecast_area_tree", "items"),
+    ("PointSeismicIntensity", "pointToCity"),
+    ("amedas_ame", "items"),
+]
+
+# 8文字のコード (整数に変換して検索する) と、それより長い・ASCII 以外のクエリ
+ITEMS = {
+    "12345678": {"name": "a"},
+    "12345679": {"name": "b"},
+    "abc": {"name": "c", "lnglat": [139.0, 35.0]},
+}
+
+
+def _assert_matches(items, codes, result):
+    assert result["found"].tolist() == [code in items for code in codes]
+    for column, values in result.items():
+        if column != "found":
+            expected = [items.get(code, {}).get(column) for code in codes]
+            assert values.tolist() == expected, column
+
+
+@pytest.mark.parametrize("name, part", TABLES)
+def test_lookup_matches_dict(name, part):
+    items = load_table(name)[part]
+    rng = random.Random(0)
+    codes = rng.sample(sorted(items), 200)
+    codes += ["", "0", "9999999", codes[0] + "0", codes[0][:-1], "札幌"]
+    rng.shuffle(codes)
+    _assert_matches(items, codes, load_columns(name, part).lookup(codes))
+
+
+@pytest.mark.parametrize(
+    "codes",
+    [
+        ["12345678", "123456789", "1234567", "abc", "abcd"],
+        ["123456789", "12345678é", "abc"],
+        ["アイウ", "12345679"],
+    ],
+)
+def test_lookup_long_and_non_ascii(codes):
+    table = ColumnTable(ITEMS)
+    assert table._int_codes is not None
+    _assert_matches(ITEMS, codes, table.lookup(codes))
+
+
+def test_lookup_non_ascii_table():
+    items = {**ITEMS, "東京": {"name": "d"}}
+    table = ColumnTable(items)
+    assert table._int_codes is None
+    codes = ["東京", "abc", "12345678", "123456789"]
+    _assert_matches(items, codes, table.lookup(codes))
+
+
+def test_lookup_missing_policy():
+    table = ColumnTable(ITEMS)
+    assert table.lookup(["abc", "zzz"], ["name"])["name"].tolist() == ["c", None]
+    assert table.lookup(["abc"], ["name"], missing="raise")["found"].all()
+    with pytest.raises(KeyError, match="zzz"):
+        table.lookup(["abc", "zzz"], missing="raise")
+    with pytest.raises(ValueError):
+        table.lookup(["abc"], missing="ignore")
+
+
+def test_lookup_empty():
+    result = ColumnTable(ITEMS).lookup([])
+    assert all(len(values) == 0 for values in result.values())
+    assert set(result) == {"found", "name", "lnglat"}
+
+    empty = ColumnTable({}, ["name"]).lookup(["abc"])
+    assert empty["found"].tolist() == [False]
+    assert empty["name"].tolist() == [None]
+    assert isinstance(empty["found"], np.ndarray)
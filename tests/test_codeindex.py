@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from jma_codes import codeindex, load_table
+from jma_codes._loader import table_path
+
+NAME, PART = "PointSeismicIntensity", "pointToCity"
+
+
+@pytest.fixture
+def snapshot(monkeypatch, tmp_path):
+    """コード表にない観測点 (9999999) を含むインデックスファイル"""
+
+    items = {**load_table(NAME)[PART], "9999999": {"name": "-"}}
+    path = tmp_path / f"{NAME}.{PART}.idx"
+    path.write_bytes(codeindex.build_index(items))
+    monkeypatch.setattr(codeindex, "index_path", lambda name, part: path)
+    codeindex.load_index.cache_clear()
+    yield path
+    codeindex.load_index.cache_clear()
+
+
+def _set_mtime(path, delta: int) -> None:
+    mtime = table_path(NAME).stat().st_mtime_ns + delta
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_current_index_is_used(snapshot):
+    _set_mtime(snapshot, 10**9)
+    assert "9999999" in codeindex.load_index(NAME, PART)
+
+
+def test_stale_index_is_rebuilt(snapshot):
+    _set_mtime(snapshot, -(10**9))
+    index = codeindex.load_index(NAME, PART)
+    assert "9999999" not in index
+    assert index["0110100"] == load_table(NAME)[PART]["0110100"]
@@ -0,0 +1,40 @@
+import importlib
+import shutil
+
+import pytest
+
+from tools.build import CONVERTERS
+from tools.utils.manifest import expand
+
+from .conftest import ROOT, assert_same_files
+
+# リモートのデータを使うもの (test_remote_cache.py) と、他の変換結果を読むもの以外
+OFFLINE = [
+    name for name, step in CONVERTERS.items() if not step.remote and not step.deps
+]
+
+
+def _committed(patterns: list[str]) -> list[str]:
+    return sorted(
+        p.relative_to(ROOT).as_posix()
+        for pattern in patterns
+        for p in ROOT.glob(pattern)
+        if p.is_file()
+    )
+
+
+@pytest.mark.parametrize("name", OFFLINE)
+def test_converter_output(build_dir, name):
+    step = CONVERTERS[name]
+    importlib.import_module(f"tools.{step.module}").process()
+    assert expand(step.outputs) == _committed(step.outputs)
+    assert_same_files(build_dir / "json", ROOT / "json")
+
+
+def test_code_type_registry(build_dir):
+    for path in (ROOT / "json").glob("*.json"):
+        if path.name != "code_type_registry.json":
+            shutil.copy(path, build_dir / "json")
+    importlib.import_module("tools.code_type_registry").process()
+    output = build_dir / "json/code_type_registry.json"
+    assert output.read_bytes() == (ROOT / "json/code_type_registry.json").read_bytes()
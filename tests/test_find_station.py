@@ -0,0 +1,96 @@
+import random
+from typing import Optional
+
+from jma_codes import load_table
+from tools.utils.seisvolc_point import (
+    _REMOVE_CITY_PAT,
+    PREFECTURE_MAP,
+    IntensityPoints,
+    PointInfo,
+)
+
+
+def find_station_linear(
+    self: IntensityPoints, jma_name: str, jma_city_code: str
+) -> Optional[PointInfo]:
+    """索引を使う前の照合 (K-net の全観測点を走査する)"""
+
+    if point := self._jma_points.get(jma_name):
+        return point
+
+    prefecture = PREFECTURE_MAP[jma_city_code[:2]]
+    found: list[PointInfo] = []
+    stripped_jma_name = _REMOVE_CITY_PAT.sub("", jma_name)
+    for (_, name), info in self._nied_points.items():
+        if info.prefecture != prefecture:
+            continue
+        if name in stripped_jma_name:
+            found.append(info)
+    if not found:
+        pass
+    elif len(found) == 1:
+        return found[0]
+    else:
+        for info in found:
+            if stripped_jma_name.endswith(info.name):
+                return info
+        found.sort(key=lambda x: len(stripped_jma_name) - len(x.name))
+        return found[0]
+
+    if station := self._jma_json_points.get(jma_name):
+        return station
+    return None
+
+
+def _points(stations: list[tuple[str, str, list[float]]]) -> IntensityPoints:
+    """震度観測点の名前の一部を名前とする K-net 観測点
+
+    実際の K-net の一覧はネットワークから取得するため、震度観測点の名前
+    (市町村名を除いたもの) の先頭・末尾・全体を使い、1つの名前に複数の観測点が
+    含まれる場合も作る
+    """
+
+    rng = random.Random(0)
+    points = IntensityPoints.__new__(IntensityPoints)
+    points._jma_points = {}
+    points._jma_json_points = {}
+    points._nied_points = {}
+    for name, city_code, (lng, lat) in rng.sample(stations, len(stations) // 3):
+        stripped = _REMOVE_CITY_PAT.sub("", name)
+        prefecture = PREFECTURE_MAP[city_code[:2]]
+        for site in {stripped[:2], stripped[-2:], stripped[: rng.randint(1, 4)]}:
+            points._nied_points[(prefecture, site)] = PointInfo(
+                kind="k-net",
+                name=site,
+                lat=lat + rng.random(),
+                lng=lng + rng.random(),
+                prefecture=prefecture,
+            )
+    points._index_nied()
+    return points
+
+
+def _lnglat(info: Optional[PointInfo]) -> Optional[tuple[float, float]]:
+    return None if info is None else (info.lng, info.lat)
+
+
+def test_find_station_matches_linear_scan():
+    stations = [
+        (item["name"], item["cityCode"], item["lnglat"])
+        for item in load_table("PointSeismicIntensity")["pointToCity"].values()
+    ]
+    points = _points(stations)
+
+    matched = ambiguous = 0
+    for name, city_code, _ in stations:
+        expected = find_station_linear(points, name, city_code)
+        assert _lnglat(points.find_station(name, city_code)) == _lnglat(expected)
+        matched += expected is not None
+        index = points._nied_index.get(PREFECTURE_MAP[city_code[:2]])
+        ambiguous += (
+            index is not None and len(index.find_in(_REMOVE_CITY_PAT.sub("", name))) > 1
+        )
+
+    # 見つからないもの・複数の候補から選ぶものも含まれていること
+    assert 0 < matched < len(stations)
+    assert ambiguous > 100
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import pytest
+import requests
+from urllib3.util.retry import Retry
+
+from tools.utils import REMOTE_INPUTS, http_cache
+
+
+class StandIn(ThreadingHTTPServer):
+    """リモートのソースの代わりのサーバ
+
+    - /data: ETag 付きで返し、If-None-Match が一致すれば 304
+    - /flaky: 最初の2回は 503
+    - /slow: 最初の1回は応答を遅らせる
+    - /hang: 常に応答を遅らせる
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.hits: dict[str, int] = {}
+        self.body = b'{"version": 1}'
+        self.etag = '"v1"'
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    server: StandIn
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        hits = self.server.hits
+        hits[self.path] = n = hits.get(self.path, 0) + 1
+        if self.path == "/data":
+            if self.headers.get("If-None-Match") == self.server.etag:
+                self._send(304)
+            else:
+                self._send(200, self.server.body, {"ETag": self.server.etag})
+        elif self.path == "/flaky":
+            self._send(503 if n <= 2 else 200, b"ok")
+        elif self.path in ("/slow", "/hang"):
+            if self.path == "/hang" or n == 1:
+                time.sleep(1.0)
+            self._send(200, b"ok")
+        else:
+            self._send(404)
+
+    def _send(
+        self, status: int, body: bytes = b"", headers: Optional[dict] = None
+    ) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv(http_cache.CACHE_DIR_ENV, str(tmp_path / "cache"))
+    monkeypatch.delenv(http_cache.OFFLINE_ENV, raising=False)
+    monkeypatch.setattr(http_cache, "_fetched", {})
+    monkeypatch.setattr(http_cache, "_session", None)
+    monkeypatch.setattr(http_cache, "TIMEOUT", (1, 0.3))
+    monkeypatch.setattr(http_cache, "RETRY", http_cache.RETRY.new(backoff_factor=0))
+    REMOTE_INPUTS.clear()
+
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _fetch_fresh(url: str) -> bytes:
+    """同じプロセス内で取得済みのものを使わずに取得する"""
+
+    http_cache._fetched.clear()
+    return http_cache.fetch(url)
+
+
+def test_etag_revalidation(server):
+    url = server.url + "/data"
+    assert _fetch_fresh(url) == b'{"version": 1}'
+    meta = http_cache._meta_path(http_cache.cache_path(url))
+    assert json.loads(meta.read_text())["etag"] == '"v1"'
+
+    # 更新されていなければ 304 で、キャッシュの内容を返す
+    assert _fetch_fresh(url) == b'{"version": 1}'
+    assert server.hits["/data"] == 2
+
+    # 更新されていれば取得し直す
+    server.body, server.etag = b'{"version": 2}', '"v2"'
+    assert _fetch_fresh(url) == b'{"version": 2}'
+    assert json.loads(meta.read_text())["etag"] == '"v2"'
+
+
+def test_fetched_in_process_is_recorded(server):
+    url = server.url + "/data"
+    content = http_cache.fetch(url)
+    REMOTE_INPUTS.clear()
+    assert http_cache.fetch(url) == content
+    assert server.hits["/data"] == 1
+    assert url in REMOTE_INPUTS
+
+
+def test_retry(server):
+    assert _fetch_fresh(server.url + "/flaky") == b"ok"
+    assert server.hits["/flaky"] == 3
+
+
+def test_retry_after_timeout(server):
+    assert _fetch_fresh(server.url + "/slow") == b"ok"
+    assert server.hits["/slow"] == 2
+
+
+def test_timeout(server, monkeypatch):
+    monkeypatch.setattr(http_cache, "RETRY", Retry(total=1, backoff_factor=0))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        _fetch_fresh(server.url + "/hang")
+    assert server.hits["/hang"] == 2
+
+
+def test_not_found(server):
+    with pytest.raises(RuntimeError, match="404"):
+        _fetch_fresh(server.url + "/missing")
+
+
+def test_offline_uses_cache(server, monkeypatch):
+    url = server.url + "/data"
+    _fetch_fresh(url)
+    monkeypatch.setenv(http_cache.OFFLINE_ENV, "1")
+    assert _fetch_fresh(url) == b'{"version": 1}'
+    assert server.hits["/data"] == 1
@@ -0,0 +1,41 @@
+import json
+import os
+
+import pytest
+
+from jma_codes import intensity, load_table
+from jma_codes._loader import table_path
+
+
+@pytest.fixture
+def fresh_cache():
+    intensity.load_intensity_table.cache_clear()
+    yield
+    intensity.load_intensity_table.cache_clear()
+
+
+@pytest.mark.parametrize("name", intensity.TABLES)
+def test_normalize_reproduces_normalized_json(name):
+    with open(intensity.normalized_path(name), encoding="utf-8") as f:
+        assert intensity.normalize(load_table(name)) == json.load(f)
+
+
+@pytest.mark.parametrize("name", intensity.TABLES)
+def test_to_dict_reproduces_table(name, fresh_cache):
+    table = intensity.load_intensity_table(name)
+    assert table.to_dict() == load_table(name)
+
+
+@pytest.mark.parametrize("delta, current", [(10**9, True), (-(10**9), False)])
+def test_stale_normalized_json(monkeypatch, tmp_path, fresh_cache, delta, current):
+    name = "PointSeismicIntensity"
+    normalized = intensity.normalize(load_table(name))
+    normalized["seisSaibun"]["101"] = {**normalized["seisSaibun"]["101"], "name": "-"}
+    path = tmp_path / f"{name}.json"
+    path.write_text(json.dumps(normalized, ensure_ascii=False), encoding="utf-8")
+    mtime = table_path(name).stat().st_mtime_ns + delta
+    os.utime(path, ns=(mtime, mtime))
+    monkeypatch.setattr(intensity, "normalized_path", lambda name: path)
+
+    table = intensity.load_intensity_table(name)
+    assert (table.seis_saibun["101"]["name"] == "-") == current
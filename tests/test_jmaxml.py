@@ -0,0 +1,111 @@
+from lxml import etree
+
+from jma_codes import load_table, registry
+from jma_codes.jmaxml import Resolver
+
+NS = (
+    'xmlns="http://xml.kishou.go.jp/jmaxml1/" '
+    'xmlns:jmx_ib="http://xml.kishou.go.jp/jmaxml1/informationBasis1/"'
+)
+
+MESSAGE = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Report {NS}>
+<jmx_ib:Head><jmx_ib:Headline><jmx_ib:Information type="気象警報・注意報（市町村等）">
+<jmx_ib:Item>
+<jmx_ib:Kind><jmx_ib:Code>10</jmx_ib:Code></jmx_ib:Kind>
+<jmx_ib:Areas codeType="気象・地震・火山情報／市町村等">
+<jmx_ib:Area><jmx_ib:Code>1310100</jmx_ib:Code></jmx_ib:Area>
+<jmx_ib:Area><jmx_ib:Code>1310200</jmx_ib:Code></jmx_ib:Area>
+</jmx_ib:Areas>
+</jmx_ib:Item>
+</jmx_ib:Information></jmx_ib:Headline></jmx_ib:Head>
+<Body>
+<Earthquake><Hypocenter><Area><Code type="震央地名">390</Code></Area></Hypocenter>
+</Earthquake>
+<Observation>
+<CodeDefine>
+<Type xpath="Pref/Code">地震情報／都道府県等</Type>
+<Type xpath="Pref/Area/Code">地震情報／細分区域</Type>
+</CodeDefine>
+<Pref><Code>17</Code><Area><Code>390</Code></Area></Pref>
+</Observation>
+<PrefectureCodeList codeType="地震情報／都道府県等">17 16</PrefectureCodeList>
+<Unknown><Code>1</Code></Unknown>
+</Body>
+</Report>
+""".encode()
+
+
+def _codes(resolved):
+    return [(c.code_type, c.code) for c in resolved]
+
+
+def test_resolve_code_types():
+    assert _codes(Resolver().resolve(MESSAGE)) == [
+        (registry.load_registry().kind_code_type("気象警報・注意報（市町村等）"), "10"),
+        ("気象・地震・火山情報／市町村等", "1310100"),
+        ("気象・地震・火山情報／市町村等", "1310200"),
+        ("震央地名", "390"),
+        ("地震情報／都道府県等", "17"),
+        ("地震情報／細分区域", "390"),
+        ("地震情報／都道府県等", "17"),
+        ("地震情報／都道府県等", "16"),
+    ]
+
+
+def test_resolve_reuses_lookups():
+    resolver = Resolver()
+    first = list(resolver.resolve(MESSAGE))
+    assert all(a is b for a, b in zip(first, resolver.resolve(MESSAGE)))
+
+
+def _station_message(cities: dict[str, list[str]]) -> bytes:
+    body = "".join(
+        f"<City><Name>-</Name><Code>{city}</Code>"
+        + "".join(
+            f"<IntensityStation><Name>-</Name><Code>{code}</Code><Int>1</Int>"
+            "</IntensityStation>"
+            for code in codes
+        )
+        + "</City>"
+        for city, codes in cities.items()
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<Report {NS}><Body><Intensity><Observation>
+<CodeDefine>
+<Type xpath="City/Code">気象・地震・火山情報／市町村等</Type>
+<Type xpath="City/IntensityStation/Code">震度観測点</Type>
+</CodeDefine>
+{body}
+</Observation></Intensity></Body></Report>
+""".encode()
+
+
+def test_resolve_drops_finished_elements(monkeypatch):
+    cities: dict[str, list[str]] = {}
+    for code, point in load_table("PointSeismicIntensity")["pointToCity"].items():
+        cities.setdefault(point["cityCode"], []).append(code)
+    message = _station_message(cities)
+
+    parsers = []
+    original = etree.iterparse
+
+    def iterparse(*args, **kwargs):
+        parsers.append(original(*args, **kwargs))
+        return parsers[-1]
+
+    monkeypatch.setattr(etree, "iterparse", iterparse)
+    expected = [
+        (code_type, code)
+        for city, codes in cities.items()
+        for code_type, code in [
+            ("気象・地震・火山情報／市町村等", city),
+            *(("震度観測点", c) for c in codes),
+        ]
+    ]
+    assert _codes(Resolver().resolve(message)) == expected
+
+    # 読み終えた市町村等・観測点は木から取り除かれている
+    total = etree.fromstring(message).iter()
+    remaining = parsers[0].root.iter()
+    assert len(list(remaining)) < len(list(total)) // 20
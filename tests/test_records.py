@@ -0,0 +1,40 @@
+from typing import Any
+
+import pytest
+
+from jma_codes import load_table, records
+from jma_codes.record_types import RECORD_TYPES
+
+
+def _thaw(value: Any) -> Any:
+    """レコードを load_table と同じ形 (辞書・リスト) に戻す
+
+    省略可能なフィールドの None は、元のJSONでキーがないものとして扱う
+    """
+
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        defaults = value._field_defaults
+        return {
+            k: _thaw(v)
+            for k, v in value._asdict().items()
+            if not (k in defaults and v is None)
+        }
+    if isinstance(value, (tuple, list)):
+        return [_thaw(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+
+@pytest.mark.parametrize("key", sorted(RECORD_TYPES))
+def test_records_match_table(key):
+    name, part = key.split(".")
+    optional = RECORD_TYPES[key]._field_defaults
+    expected = {
+        code: {k: v for k, v in item.items() if not (k in optional and v is None)}
+        for code, item in load_table(name)[part].items()
+    }
+    # JSONから直接読んだものと、load_table で読み込み済みのものから変換したもの
+    for decoded in (records._decode(name)[part], records.load_records(name, part)):
+        assert {code: _thaw(r) for code, r in decoded.items()} == expected
+        assert all(type(r) is RECORD_TYPES[key] for r in decoded.values())
@@ -0,0 +1,54 @@
+import pytest
+
+from tools import build, seis_and_volc
+from tools.utils import OFFLINE_ENV, REMOTE_INPUTS, http_cache, seisvolc_point
+
+from .conftest import ROOT, assert_same_files
+
+FIXTURES = ROOT / "tests/fixtures/remote_cache"
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setenv(OFFLINE_ENV, "1")
+    monkeypatch.setenv(http_cache.CACHE_DIR_ENV, str(FIXTURES))
+    monkeypatch.setattr(http_cache, "_fetched", {})
+    REMOTE_INPUTS.clear()
+
+
+def test_offline_seis_and_volc(build_dir, offline):
+    seis_and_volc.process()
+    assert_same_files(build_dir / "json", ROOT / "json")
+    assert set(REMOTE_INPUTS) == set(seisvolc_point.SOURCES)
+
+
+def test_offline_missing(tmp_path, offline, monkeypatch):
+    monkeypatch.setenv(http_cache.CACHE_DIR_ENV, str(tmp_path))
+    with pytest.raises(RuntimeError, match="offline mode"):
+        http_cache.fetch("https://example.com/missing.json")
+
+
+def test_write_atomic_interrupted(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    path.write_bytes(b"old")
+
+    def fail(src, dst):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(http_cache.os, "replace", fail)
+    with pytest.raises(KeyboardInterrupt):
+        http_cache._write_atomic(path, b"new")
+    assert path.read_bytes() == b"old"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_remote_step_inputs_follow_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    step = build.STEPS["seis_and_volc"]
+    fixtures = {p.as_posix() for p in FIXTURES.rglob("*") if p.is_file()}
+
+    monkeypatch.setenv(http_cache.CACHE_DIR_ENV, str(FIXTURES))
+    assert fixtures <= set(step.input_paths())
+    # 別のキャッシュを使う場合は、入力が変わったとみなされる
+    monkeypatch.setenv(http_cache.CACHE_DIR_ENV, str(tmp_path))
+    assert not fixtures & set(step.input_paths())
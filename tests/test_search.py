@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from jma_codes import search
+from jma_codes._loader import table_path
+
+
+@pytest.fixture
+def snapshot(monkeypatch, tmp_path):
+    """コード表にない地域 (ゲンコウニナイ村) を含むインデックスファイル"""
+
+    sources = search.load_sources()
+    items = dict(sources["forecast_area_tree"])
+    items["9999999"] = {"name": "ゲンコウニナイ村", "kana": "げんこうにないむら"}
+    path = tmp_path / "names.ngram"
+    path.write_bytes(search.build_index({**sources, "forecast_area_tree": items}))
+    monkeypatch.setattr(search, "index_path", lambda: path)
+    search.load_search_index.cache_clear()
+    yield path
+    search.load_search_index.cache_clear()
+
+
+def _newest_source() -> int:
+    return max(table_path(name).stat().st_mtime_ns for name in search.SOURCES)
+
+
+def test_current_index_is_used(snapshot):
+    mtime = _newest_source() + 10**9
+    os.utime(snapshot, ns=(mtime, mtime))
+    hits = search.load_search_index().search("ゲンコウニナイ")
+    assert [hit.code for hit in hits] == ["9999999"]
+
+
+def test_stale_index_is_rebuilt(snapshot):
+    mtime = _newest_source() - 10**9
+    os.utime(snapshot, ns=(mtime, mtime))
+    index = search.load_search_index()
+    assert index.search("ゲンコウニナイ") == []
+    assert index.search("宗谷地方")[0].code == "011000"
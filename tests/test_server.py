@@ -0,0 +1,181 @@
+import asyncio
+import json
+from typing import Optional
+
+import pytest
+
+from jma_codes import load_table, server
+
+
+def _post(body: dict) -> server.Request:
+    return server.Request("POST", "/lookup", {}, json.dumps(body).encode())
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"table": "AreaRiver", "part": [], "codes": ["1"]},
+        {"table": ["AreaRiver"], "codes": ["1"]},
+        {"codeType": {}, "codes": ["1"]},
+        {"table": "AreaRiver", "codes": "1"},
+    ],
+)
+def test_lookup_bad_request(body):
+    with pytest.raises(server.HTTPError) as e:
+        server.handle(_post(body))
+    assert e.value.status == 400
+
+
+def test_internal_error(monkeypatch):
+    def fail(request):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(server, "handle", fail)
+    status, body, _ = server._handle_safely(_post({}))
+    assert status == 500
+    assert json.loads(body) == {"error": "Internal Server Error"}
+
+
+async def _exchange(port: int, requests: list[bytes]) -> list[int]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    statuses = []
+    for request in requests:
+        writer.write(request)
+        head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        statuses.append(int(head.split(" ", 2)[1]))
+        length = next(
+            int(line.split(":", 1)[1])
+            for line in head.split("\r\n")
+            if line.lower().startswith("content-length:")
+        )
+        await reader.readexactly(length)
+    writer.close()
+    return statuses
+
+
+def test_keep_alive_after_errors():
+    bad = json.dumps({"table": "AreaRiver", "part": [], "codes": ["1"]}).encode()
+    good = json.dumps(
+        {"table": "PointSeismicIntensity", "part": "pointToCity", "codes": ["0110100"]}
+    ).encode()
+
+    def post(body: bytes) -> bytes:
+        return b"POST /lookup HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (
+            len(body),
+            body,
+        )
+
+    async def run() -> list[int]:
+        srv = await server.serve("127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        async with srv:
+            return await _exchange(
+                port,
+                [
+                    post(bad),
+                    post(good),
+                    b"GET /tables/PointSeismicIntensity/pointToCity/0110100 HTTP/1.1\r\n\r\n",
+                ],
+            )
+
+    assert asyncio.run(run()) == [400, 200, 200]
+
+
+def _get(target: str, headers: Optional[dict[str, str]] = None) -> server.Request:
+    return server.Request("GET", target, headers or {}, b"")
+
+
+def test_etag_not_modified():
+    status, _, etag = server.handle(_get("/tables/PointTsunami"))
+    assert status == 200 and etag
+    for if_none_match, expected in [
+        (etag, 304),
+        (f"W/{etag}", 304),
+        (f'"other", W/{etag}', 304),
+        ("*", 304),
+        ('"other"', 200),
+    ]:
+        request = _get(
+            "/tables/PointTsunami/items/00305", {"if-none-match": if_none_match}
+        )
+        assert server.handle(request)[0] == expected, if_none_match
+
+
+def test_get_codes():
+    status, body, etag = server.handle(
+        _get("/tables/PointSeismicIntensity/pointToCity?codes=0110100,zzz")
+    )
+    items = load_table("PointSeismicIntensity")["pointToCity"]
+    assert status == 200 and etag
+    assert json.loads(body) == {"0110100": items["0110100"], "zzz": None}
+
+
+def test_lookup_code_type():
+    status, body, _ = server.handle(
+        _post({"codeType": "震度観測点", "codes": ["0110100", "zzz"]})
+    )
+    record = load_table("PointSeismicIntensity")["pointToCity"]["0110100"]
+    assert status == 200
+    assert json.loads(body) == {
+        "0110100": {
+            "code": "0110100",
+            "table": "PointSeismicIntensity",
+            "name": record["name"],
+            "kana": record["kana"],
+            "parents": {"city": record["cityCode"], "seisSaibun": "101"},
+        },
+        "zzz": None,
+    }
+
+
+async def _raw(request: bytes, close_write: bool = False) -> tuple[bytes, list]:
+    """サーバに request を送り、接続が閉じられるまでの応答と、ループの例外を返す"""
+
+    errors: list = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, c: errors.append(c))
+    srv = await server.serve("127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    async with srv:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            writer.write(request)
+            if close_write:
+                writer.write_eof()
+            response = await asyncio.wait_for(reader.read(), 5)
+        finally:
+            writer.close()
+        await asyncio.sleep(0.05)
+    return response, errors
+
+
+def test_head_and_http10():
+    response, errors = asyncio.run(
+        _raw(
+            b"HEAD /tables/PointTsunami HTTP/1.1\r\n\r\n"
+            b"GET /tables/PointTsunami/items/00305 HTTP/1.0\r\n\r\n"
+        )
+    )
+    head, rest = response.split(b"\r\n\r\n", 1)
+    # HEAD には本文がなく、HTTP/1.0 の応答の後で接続が閉じられる
+    assert head.startswith(b"HTTP/1.1 200 ") and b"Content-Length: " in head
+    assert rest.startswith(b"HTTP/1.1 200 ")
+    assert b"Connection: close" in rest
+    body = json.loads(rest.split(b"\r\n\r\n", 1)[1])
+    assert body == load_table("PointTsunami")["items"]["00305"]
+    assert not errors
+
+
+def test_http10_keep_alive():
+    request = _get("/tables", {"connection": "keep-alive"})
+    request.version = "HTTP/1.0"
+    assert request.keep_alive
+    request.headers = {}
+    assert not request.keep_alive
+
+
+def test_incomplete_body():
+    response, errors = asyncio.run(
+        _raw(b"POST /lookup HTTP/1.1\r\nContent-Length: 100\r\n\r\n{}", True)
+    )
+    assert response == b""
+    assert not errors
@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import jma_codes
+from jma_codes import _loader, load_table
+from jma_codes.shared import SHARED_MEMORY_ENV, attach, publish
+
+NAMES = ["AreaRiver", "PointSeismicIntensity", "forecast_area_tree"]
+
+
+@pytest.fixture
+def block():
+    with publish(f"jma_codes_test_{os.getpid()}", NAMES) as tables:
+        yield tables
+
+
+def test_same_contents(block):
+    tables = attach(block.name)
+    try:
+        assert sorted(tables) == sorted(NAMES)
+        for name in NAMES:
+            table = load_table(name)
+            assert tables[name].keys() == table.keys()
+            for part, items in tables[name].items():
+                assert dict(items) == table[part]
+                assert list(items) == sorted(table[part], key=str.encode)
+    finally:
+        tables.close()
+
+
+def test_load_table_ignores_shared_memory(block, monkeypatch):
+    monkeypatch.setenv(SHARED_MEMORY_ENV, block.name)
+    monkeypatch.setattr(_loader, "_tables", {})
+    items = load_table("AreaRiver")["items"]
+    assert type(items) is dict
+    json.dumps(items)
+
+
+# 別のプロセス (ワーカー) でアタッチし、レコードを1件読んで終了する
+WORKER = """
+import json, sys
+from jma_codes.shared import attach
+
+tables = attach(sys.argv[1])
+print(json.dumps(tables["PointSeismicIntensity"]["pointToCity"]["0110100"]))
+tables.close()
+"""
+
+
+def test_attach_from_another_process(block):
+    env = {**os.environ, "PYTHONPATH": str(Path(jma_codes.__file__).parents[1])}
+    for _ in range(2):
+        result = subprocess.run(
+            [sys.executable, "-c", WORKER, block.name],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=60,
+        )
+        record = load_table("PointSeismicIntensity")["pointToCity"]["0110100"]
+        assert json.loads(result.stdout) == record
+
+    # ワーカーの終了後も、ブロックは削除されずに残っている
+    assert dict(block["AreaRiver"]["items"]) == load_table("AreaRiver")["items"]
+    tables = attach(block.name)
+    try:
+        assert tables["PointSeismicIntensity"]["pointToCity"]["0110100"] == record
+    finally:
+        tables.close()
@@ -0,0 +1,117 @@
+import itertools
+import math
+import os
+
+import pytest
+
+from jma_codes import spatial
+from jma_codes._loader import table_path
+from jma_codes.spatial import SpatialIndex, build_index, load_spatial_index
+
+
+def _brute_force(points, west, south, east, north):
+    if east < west:
+        east += 360
+    return sorted(
+        code
+        for code, (lng, lat) in points.items()
+        if south <= lat <= north and (west <= lng <= east or west <= lng + 360 <= east)
+    )
+
+
+# 全球の格子点 (経度180度をまたぐ範囲を試すため)
+GRID = {
+    f"{lng}_{lat}": (lng, lat)
+    for lng, lat in itertools.product(range(-180, 180, 7), range(-88, 89, 8))
+}
+
+BOXES = [
+    (-180, -90, 180, 90),  # 全球
+    (-10, -60, 175, 60),  # 経度の幅が180度以上
+    (100, -90, -60, 90),  # 経度180度をまたぎ、幅が180度以上
+    (170, -30, -170, 30),  # 経度180度をまたぐ
+    (-179, 10, 179, 20),
+    (120, 20, 150, 46),
+    (139, 35, 140, 36),
+]
+
+
+@pytest.mark.parametrize("box", BOXES)
+def test_in_bbox_grid(box):
+    index = SpatialIndex(build_index(GRID))
+    assert index.in_bbox(*box) == _brute_force(GRID, *box)
+
+
+@pytest.mark.parametrize("box", BOXES)
+def test_in_bbox_amedas(box):
+    index = load_spatial_index("amedas_ame")
+    points = {code: index.lnglat(code) for code in index}
+    expected = _brute_force(points, *box)
+    assert index.in_bbox(*box) == expected
+    if box == (-180, -90, 180, 90):
+        assert len(expected) == len(index)
+
+
+@pytest.mark.parametrize("delta, current", [(10**9, True), (-(10**9), False)])
+def test_stale_index_is_rebuilt(monkeypatch, tmp_path, delta, current):
+    path = tmp_path / "PointVolcano.kdtree"
+    path.write_bytes(build_index(GRID))
+    mtime = table_path("PointVolcano").stat().st_mtime_ns + delta
+    os.utime(path, ns=(mtime, mtime))
+    monkeypatch.setattr(spatial, "index_path", lambda layer: path)
+    load_spatial_index.cache_clear()
+    try:
+        codes = set(load_spatial_index("PointVolcano"))
+    finally:
+        load_spatial_index.cache_clear()
+    assert (codes == set(GRID)) == current
+
+
+def test_points_of_skips_missing_lnglat():
+    items = {
+        "a": {"lnglat": [139.7, 35.7]},
+        "b": {"lnglat": None},
+        "c": {"name": "-"},
+    }
+    assert spatial.points_of(items) == {"a": (139.7, 35.7)}
+
+
+def _haversine(lng1, lat1, lng2, lat2):
+    lng1, lat1, lng2, lat2 = map(math.radians, (lng1, lat1, lng2, lat2))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * spatial.EARTH_RADIUS * math.asin(math.sqrt(h))
+
+
+QUERIES = [(139.76, 35.68), (141.35, 43.06), (127.68, 26.21), (153.98, 24.28), (0, 0)]
+
+
+def _scan(index, lng, lat):
+    return sorted((_haversine(lng, lat, *index.lnglat(code)), code) for code in index)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_nearest_matches_scan(query):
+    index = load_spatial_index("amedas_ame")
+    expected = _scan(index, *query)[:10]
+    found = index.nearest(*query, k=10)
+    assert [d for _, d in found] == pytest.approx([d for d, _ in expected], abs=0.01)
+    for code, d in found:
+        assert _haversine(*query, *index.lnglat(code)) == pytest.approx(d, abs=0.01)
+    limit = expected[3][0] + 1
+    assert len(index.nearest(*query, k=10, max_distance=limit)) == 4
+
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("radius", [1_000, 30_000, 300_000])
+def test_within_matches_scan(query, radius):
+    index = load_spatial_index("amedas_ame")
+    scanned = _scan(index, *query)
+    found = dict(index.within(*query, radius))
+    # 境界付近 (誤差の範囲) の地点は問わない
+    assert {c for d, c in scanned if d < radius - 0.01} <= set(found)
+    assert set(found) <= {c for d, c in scanned if d <= radius + 0.01}
+    for code, d in found.items():
+        assert _haversine(*query, *index.lnglat(code)) == pytest.approx(d, abs=0.01)
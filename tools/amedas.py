@@ -1,12 +1,14 @@
 """アメダス"""
 
-import json
-import unicodedata
-from typing import Any, cast
+from typing import Any
 
 import pandas as pd
 
 from .utils import get_filename_for
+from .utils.dataframe import degree_minute, normalize_nfkc, records
+from .utils.json_writer import point_features, write_feature_collection, write_items
+from .utils.prefecture import prefecture_of_bureau
+from .utils.shards import group_by_prefecture, shard_path, write_shard_index
 
 COLUMN_MAP_AME = {
     "都府県振興局": "regionalBreau",
@@ -34,56 +36,49 @@ COLUMN_MAP_SNOW = {
 
 
 def convert(column_map: dict[str, Any], df: pd.DataFrame, output_name: str) -> None:
+    props = pd.DataFrame({v: normalize_nfkc(df[k]) for k, v in column_map.items()})
+    start_date = props["startDate"].str.lstrip("#")
+    props["startDate"] = start_date.where(start_date.notnull(), props["startDate"])
+
+    lat = degree_minute(df["緯度(度)"], df["緯度(分)"])
+    lng = degree_minute(df["経度(度)"], df["経度(分)"])
+
     result = {}
-    for _, row in df.iterrows():
-        r: dict[str, Any] = {}
-        for k, v in column_map.items():
-            value = row[k]
-            if pd.isnull(value):
-                continue
-            elif isinstance(value, str):
-                r[v] = unicodedata.normalize("NFKC", value)
-                if v == "startDate":
-                    r[v] = r[v].lstrip("#")
-            else:
-                r[v] = row[k]
-
-        lat = cast(float, row["緯度(度)"]) + cast(float, row["緯度(分)"]) / 60.0
-        lng = cast(float, row["経度(度)"]) + cast(float, row["経度(分)"]) / 60.0
-        r["lnglat"] = [lng, lat]
-        code = row["観測所番号"]
+    for code, r, lnglat in zip(
+        df["観測所番号"].tolist(), records(props), zip(lng.tolist(), lat.tolist())
+    ):
+        r["lnglat"] = list(lnglat)
         result[code] = r
 
     with open(f"./json/{output_name}.json", "w") as f:
-        json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
-        f.write("\n")
-
-    result_geojson = []
-    for item in result.values():
-        lnglat = item.pop("lnglat")
-        result_geojson.append(
-            {
-                "type": "Feature",
-                "properties": item,
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": lnglat,
-                },
-            }
-        )
+        write_items(f, ((code, result[code]) for code in sorted(result)))
 
     with open(f"./json/{output_name}.geojson", "w") as f:
-        json.dump(
-            {"type": "FeatureCollection", "features": result_geojson},
-            f,
-            ensure_ascii=False,
-            indent=2,
-        )
+        write_feature_collection(f, point_features(result.values()))
 
+    # 都道府県ごとのシャード
+    shards = group_by_prefecture(
+        result.items(), lambda item: prefecture_of_bureau(item["regionalBreau"])
+    )
+    for prefecture, items in shards.items():
+        with open(shard_path(output_name, prefecture, ".json"), "w") as f:
+            write_items(f, sorted(items))
+        with open(shard_path(output_name, prefecture, ".geojson"), "w") as f:
+            write_feature_collection(f, point_features(item for _, item in items))
+    write_shard_index(
+        output_name,
+        {p: len(items) for p, items in shards.items()},
+        [".json", ".geojson"],
+    )
 
-if __name__ == "__main__":
+
+def process() -> None:
     df_ame = pd.read_csv(get_filename_for("ame_master"), na_values=["－", "-"])
     df_snow = pd.read_csv(get_filename_for("snow_master"), na_values=["－", "-"])
 
     convert(COLUMN_MAP_AME, df_ame, "amedas_ame")
     convert(COLUMN_MAP_SNOW, df_snow, "amedas_snow")
+
+
+if __name__ == "__main__":
+    process()
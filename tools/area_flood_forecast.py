@@ -5,18 +5,24 @@
 
 import json
 
-import pandas
-
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
 
-if __name__ == "__main__":
-    df = pandas.read_excel(get_filename_for("AreaFloodForecast"), skiprows=2)
 
-    result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        result[code] = {"name": row["@name"], "kana": row["Unnamed: 2"]}
+def process() -> None:
+    df = read_sheet(get_filename_for("AreaFloodForecast"), skiprows=2)
+
+    result = {
+        code: {"name": name, "kana": kana}
+        for code, name, kana in zip(
+            df["@code"].tolist(), df["@name"].tolist(), df["Unnamed: 2"].tolist()
+        )
+    }
 
     with open("./json/AreaFloodForecast.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
         f.write("\n")
+
+
+if __name__ == "__main__":
+    process()
@@ -2,25 +2,27 @@
 
 import json
 
-import pandas
-
 from .utils import get_filename_for
-
-df = pandas.read_excel(get_filename_for("AreaForecast"), skiprows=1)
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    result = {}
-    for _, row in df.iterrows():
-        _type = row["コードタイプ"]
-        name = row["XML名称"]
-        note = row["備考"] if isinstance(row["備考"], str) else ""
-        code = row["新コード値"]
-        result[code] = {
+    df = read_sheet(get_filename_for("AreaForecast"), skiprows=1)
+    notes = df["備考"].where(df["備考"].apply(isinstance, args=(str,)), "")
+
+    result = {
+        code: {
             "type": _type,
             "name": name,
             "note": note,
         }
+        for code, _type, name, note in zip(
+            df["新コード値"].tolist(),
+            df["コードタイプ"].tolist(),
+            df["XML名称"].tolist(),
+            notes.tolist(),
+        )
+    }
 
     with open("./json/AreaForecast.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
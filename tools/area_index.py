@@ -0,0 +1,26 @@
+"""区域の外接矩形 (datasrc/shape_properties) から、経度・緯度で区域を引くための
+R 木のインデックスを作る
+
+jma_codes.area_index.LAYERS の各種類を、jma_codes.area_index の形式で書き出します。
+"""
+
+import json
+
+from jma_codes.area_index import LAYERS, build_index, index_path
+
+SHAPE_PROPERTIES_DIR = "./datasrc/shape_properties"
+
+
+def process() -> None:
+    for layer in LAYERS:
+        with open(f"{SHAPE_PROPERTIES_DIR}/{layer}.json", encoding="utf-8") as f:
+            areas = json.load(f)
+
+        path = index_path(layer)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(build_index(areas))
+
+
+if __name__ == "__main__":
+    process()
@@ -2,14 +2,16 @@
 
 AreaInformationCity-AreaForecastLocalM をもとに、区域の名前や上位の区域を引くテーブルを作ります"""
 
-import itertools
 import json
+from collections.abc import Iterator
 from dataclasses import dataclass
-from typing import Optional, cast
+from typing import Optional
 
 import pandas as pd
 
 from .utils import get_filename_for
+from .utils.dataframe import is_missing
+from .utils.workbook import read_sheet
 
 
 @dataclass
@@ -30,7 +32,7 @@ def make_matome_code_map() -> dict[str, MatomeProps]:
         str, MatomeProps
     ] = {}  # 予報区コードとその情報を対応づけるマップ
 
-    df_city_m_ww = pd.read_excel(
+    df_city_m_ww = read_sheet(
         get_filename_for("AreaInformationCity-AreaForecastLocalM.xls"),
         sheet_name="AreaForecastLocalM（関係表　警報・注意報",
         skiprows=2,
@@ -40,7 +42,7 @@ def make_matome_code_map() -> dict[str, MatomeProps]:
             "コード\n(@code).2": str,
         },
     )
-    df_city_m_tornado = pd.read_excel(
+    df_city_m_tornado = read_sheet(
         get_filename_for("AreaInformationCity-AreaForecastLocalM.xls"),
         sheet_name="AreaForecastLocalM（関係表　竜巻注意情報",
         skiprows=2,
@@ -52,25 +54,17 @@ def make_matome_code_map() -> dict[str, MatomeProps]:
     )
 
     # 気象警報の関係表から、まとめた地域 -> 一次細分区域 -> 府県予報区 の関係を取得
-    for _, row in itertools.chain(df_city_m_ww.iterrows()):
-        matome_code = str(row["コード\n(@code)"])
-        ichiji_code = str(row["コード\n(@code).1"])
-        fuken_code = str(row["コード\n(@code).2"])
+    for matome_code, ichiji_code, fuken_code in _relation_codes(df_city_m_ww):
         if matome_code not in matome_code_map:
             matome_code_map[matome_code] = MatomeProps(
                 ichiji_code=ichiji_code, fuken_code=fuken_code, saibun_code=None
             )
         else:
-            assert matome_code_map[matome_code].ichiji_code == str(
-                row["コード\n(@code).1"]
-            )
-            matome_code_map[matome_code].fuken_code = str(row["コード\n(@code).2"])
+            assert matome_code_map[matome_code].ichiji_code == ichiji_code
+            matome_code_map[matome_code].fuken_code = fuken_code
 
     # 竜巻注意情報の関係表から、まとめた地域 -> 一次細分区域 -> 発表細分 の関係を取得
-    for _, row in itertools.chain(df_city_m_tornado.iterrows()):
-        matome_code = str(row["コード\n(@code)"])
-        ichiji_code = str(row["コード\n(@code).1"])
-        saibun_code = str(row["コード\n(@code).2"])
+    for matome_code, ichiji_code, saibun_code in _relation_codes(df_city_m_tornado):
         if matome_code not in matome_code_map:
             matome_code_map[matome_code] = MatomeProps(
                 ichiji_code=ichiji_code,
@@ -78,18 +72,40 @@ def make_matome_code_map() -> dict[str, MatomeProps]:
                 saibun_code=saibun_code,
             )
         else:
-            assert matome_code_map[matome_code].ichiji_code == str(
-                row["コード\n(@code).1"]
-            )
-            matome_code_map[matome_code].saibun_code = str(row["コード\n(@code).2"])
+            assert matome_code_map[matome_code].ichiji_code == ichiji_code
+            matome_code_map[matome_code].saibun_code = saibun_code
 
     return matome_code_map
 
 
+def _relation_codes(df: pd.DataFrame) -> Iterator[tuple[str, str, str]]:
+    """関係表の各行の (まとめた地域, 一次細分区域, 上位の区域) のコードを返す"""
+
+    return zip(
+        df["コード\n(@code)"].astype(str).tolist(),
+        df["コード\n(@code).1"].astype(str).tolist(),
+        df["コード\n(@code).2"].astype(str).tolist(),
+    )
+
+
+def _first_valid(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    """columns のうち、値のある最初のカラムの値を行ごとに返す
+
+    どのカラムにも値がない場合は、最後のカラムの値を返す
+    """
+
+    result = df[columns[-1]]
+    for column in reversed(columns[1:-1]):
+        s = df[column]
+        result = s.where(~is_missing(s) & (s != ""), result)
+    s = df[columns[0]]
+    return s.where(~is_missing(s), result)
+
+
 def make_code_name_map(df_city) -> dict[str, AreaName]:
     code_name_map: dict[str, AreaName] = {}  # 予報区コードとその名称を対応づけるマップ
 
-    df_city_m = pd.read_excel(
+    df_city_m = read_sheet(
         get_filename_for("AreaInformationCity-AreaForecastLocalM.xls"),
         sheet_name="AreaForecastLocalM（コード表）",
         skiprows=3,
@@ -98,42 +114,32 @@ def make_code_name_map(df_city) -> dict[str, AreaName]:
         },
     )
 
-    for _, row in df_city_m.iterrows():
-        code = cast(str, row["@code"])
-        name = cast(str, row["@name"])
-        kana = cast(str, row["Unnamed: 2"])
+    for code, name, kana in zip(
+        df_city_m["@code"].tolist(),
+        df_city_m["@name"].tolist(),
+        df_city_m["Unnamed: 2"].tolist(),
+    ):
         code_name_map[code] = AreaName(name, kana)
 
-    for _, row in df_city.iterrows():
-        code = str(row["@code"])
-        if code == "nan":
-            continue
-
-        name = row["@name"]
-        if name == "nan" or pd.isnull(name):
-            if not (name := row["@name.4"]) or (name == "nan" or pd.isnull(name)):
-                if not (name := row["@name.2"]) or (name == "nan" or pd.isnull(name)):
-                    name = row["@name.1"]
-
-        kana = row["ふりがな"]
-        if kana == "nan" or pd.isnull(kana):
-            if not (kana := row["ふりがな.4"]) or (kana == "nan" or pd.isnull(kana)):
-                if not (kana := row["ふりがな.2"]) or (
-                    kana == "nan" or pd.isnull(kana)
-                ):
-                    kana = row["ふりがな.1"]
-
-        if name != "nan":
-            if kana == "nan":
-                kana = ""
-            assert isinstance(code, str)
-            code_name_map[code] = AreaName(name, kana)
+    # 名前・ふりがなが空の場合は、別名のカラムの値を使う
+    names = _first_valid(df_city, ["@name", "@name.4", "@name.2", "@name.1"])
+    kanas = _first_valid(
+        df_city, ["ふりがな", "ふりがな.4", "ふりがな.2", "ふりがな.1"]
+    )
+    kanas = kanas.mask(kanas == "nan", "")
+
+    codes = df_city["@code"].astype(str)
+    valid = (codes != "nan") & (names != "nan")
+    for code, name, kana in zip(
+        codes[valid].tolist(), names[valid].tolist(), kanas[valid].tolist()
+    ):
+        code_name_map[code] = AreaName(name, kana)
 
     return code_name_map
 
 
 def process() -> None:
-    df_city = pd.read_excel(
+    df_city = read_sheet(
         get_filename_for("AreaInformationCity-AreaForecastLocalM.xls"),
         skiprows=2,
         dtype={
@@ -156,12 +162,13 @@ def process() -> None:
     matome_code_map = make_matome_code_map()
 
     result = {}
-    for _, row in df_city.iterrows():
-        code = str(row["@code"])
-        name = str(row["@name"])
-        matome_code = str(
-            row["属する「市町村等をまとめた地域等」\n(AreaForecastLocalMの@code値)"]
-        )
+    for code, name, matome_code in zip(
+        df_city["@code"].astype(str).tolist(),
+        df_city["@name"].astype(str).tolist(),
+        df_city["属する「市町村等をまとめた地域等」\n(AreaForecastLocalMの@code値)"]
+        .astype(str)
+        .tolist(),
+    ):
         if matome_code and matome_code != "nan":
             spec = matome_code_map[matome_code]
             result[code] = {
@@ -216,6 +223,7 @@ def process() -> None:
                 "kana": name.kana,
             }
 
+    add_children(result)
     verify_result(result, code_name_map, matome_code_map)
 
     with open("./json/forecast_area_tree.json", "w", encoding="utf-8") as f:
@@ -223,6 +231,23 @@ def process() -> None:
         f.write("\n")
 
 
+def add_children(result) -> None:
+    """各区域に、その下位にある区域のコードを階層 (level) ごとに与える"""
+
+    children: dict[str, dict[str, set[str]]] = {}
+    for code, area in result.items():
+        for key in ["fuken", "saibun", "ichiji", "matome"]:
+            if (parent := area.get(key)) and parent != code:
+                children.setdefault(parent, {}).setdefault(area["level"], set()).add(
+                    code
+                )
+
+    for code, levels in children.items():
+        result[code]["children"] = {
+            level: sorted(codes) for level, codes in levels.items()
+        }
+
+
 def verify_result(result, code_name_map, matome_code_map):
     # verify
     for area in result.values():
@@ -234,6 +259,9 @@ def verify_result(result, code_name_map, matome_code_map):
             assert ichiji in result
         if matome := area.get("matome"):
             assert matome in result
+        for codes in area.get("children", {}).values():
+            for code in codes:
+                assert code in result
 
     for code in code_name_map:
         assert code in result
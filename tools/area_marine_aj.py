@@ -22,30 +22,34 @@ import json
 import pandas
 
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
+
+
+def code_name_kana(df: pandas.DataFrame) -> dict:
+    return {
+        code: {"name": name, "kana": kana}
+        for code, name, kana in zip(
+            df["@code"].tolist(), df["@name"].tolist(), df["Unnamed: 2"].tolist()
+        )
+    }
 
 
 def process() -> None:
-    df = pandas.read_excel(
+    df = read_sheet(
         get_filename_for("AreaMarineAJ"), skiprows=2, sheet_name="AreaMarineA"
     )
 
-    result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        result[code] = {"name": row["@name"], "kana": row["Unnamed: 2"]}
+    result = code_name_kana(df)
 
     with open("./json/AreaMarineA.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
         f.write("\n")
 
-    df = pandas.read_excel(
+    df = read_sheet(
         get_filename_for("AreaMarineAJ"), skiprows=3, sheet_name="AreaMarineJ"
     )
 
-    result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        result[code] = {"name": row["@name"], "kana": row["Unnamed: 2"]}
+    result = code_name_kana(df)
 
     with open("./json/AreaMarineJ.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
@@ -7,23 +7,33 @@
 
 import json
 
-import pandas
-
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    df = pandas.read_excel(get_filename_for("AreaRiver"), skiprows=2)
+    df = read_sheet(get_filename_for("AreaRiver"), skiprows=2)
+
+    has_alias1 = df["@name.1"].apply(isinstance, args=(str,)).tolist()
+    has_alias2 = df["@name.2"].apply(isinstance, args=(str,)).tolist()
 
     result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        result[code] = {"name": row["@name"], "kana": row["Unnamed: 2"]}
-        if isinstance(row["@name.1"], str):
-            result[code]["alias1_name"] = row["@name.1"]
-            result[code]["alias1_kana"] = row["Unnamed: 4"]
-        if isinstance(row["@name.2"], str):
-            result[code]["alias2_kana"] = row["Unnamed: 6"]
+    for code, name, kana, alias1_name, alias1_kana, alias2_kana, a1, a2 in zip(
+        df["@code"].tolist(),
+        df["@name"].tolist(),
+        df["Unnamed: 2"].tolist(),
+        df["@name.1"].tolist(),
+        df["Unnamed: 4"].tolist(),
+        df["Unnamed: 6"].tolist(),
+        has_alias1,
+        has_alias2,
+    ):
+        result[code] = {"name": name, "kana": kana}
+        if a1:
+            result[code]["alias1_name"] = alias1_name
+            result[code]["alias1_kana"] = alias1_kana
+        if a2:
+            result[code]["alias2_kana"] = alias2_kana
 
     with open("./json/AreaRiver.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
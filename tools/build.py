@@ -0,0 +1,424 @@
+"""JSONファイル等の生成を、依存関係に従って並列に実行する
+
+$ python -m tools.build [ステップ名 ...] [-j 並列数] [--no-deps] [--force]
+    [--refresh-remote] [--offline] [--sheet-cache DIR]
+
+ステップ名を省略した場合は、すべての変換スクリプトを実行します。
+--sheet-cache を指定すると、読み込んだシートをワーカープロセス間で共有します
+(tools/utils/workbook.py)。
+
+各ステップの入力・出力のハッシュ値をマニフェスト (.cache/build_manifest.json) に
+記録し、前回から変化のないステップは実行しません。
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .utils import (
+    OFFLINE_ENV,
+    REMOTE_INPUTS,
+    SHEET_CACHE_ENV,
+    get_filename_for,
+    http_cache,
+)
+from .utils.manifest import (
+    Fingerprints,
+    expand,
+    fingerprint,
+    load_manifest,
+    same_contents,
+    save_manifest,
+)
+
+
+@dataclass
+class Step:
+    module: str  # tools 配下の、process() を持つモジュール
+    sources: list[str] = field(default_factory=list)  # get_filename_for に渡す名前
+    inputs: list[str] = field(default_factory=list)  # その他の入力ファイル (glob)
+    outputs: list[str] = field(default_factory=list)  # 出力ファイル (glob)
+    deps: list[str] = field(default_factory=list)  # 先に実行しておくべきステップ
+    remote: bool = False  # インターネット上のデータを取得するか
+
+    def input_paths(self) -> list[str]:
+        """入力ファイルのパス (スクリプト自身と、リモートのデータのキャッシュも含む)"""
+
+        paths = {Path(get_filename_for(s)).as_posix() for s in self.sources}
+        if self.remote:
+            cache = http_cache.cache_dir()
+            paths.update(p.as_posix() for p in cache.glob("**/*") if p.is_file())
+        return sorted(
+            paths
+            | set(expand([f"tools/{self.module}.py", "tools/utils/*.py", *self.inputs]))
+        )
+
+
+CONVERTERS: dict[str, Step] = {
+    "amedas": Step(
+        "amedas",
+        sources=["ame_master", "snow_master"],
+        outputs=[
+            "json/amedas_ame.*",
+            "json/amedas_snow.*",
+            "json/shards/amedas_ame/*",
+            "json/shards/amedas_snow/*",
+        ],
+    ),
+    "area_flood_forecast": Step(
+        "area_flood_forecast",
+        sources=["AreaFloodForecast"],
+        outputs=["json/AreaFloodForecast.json"],
+    ),
+    "area_forecast": Step(
+        "area_forecast",
+        sources=["AreaForecast"],
+        outputs=["json/AreaForecast.json"],
+    ),
+    "area_local_codes": Step(
+        "area_local_codes",
+        sources=["AreaInformationCity-AreaForecastLocalM.xls"],
+        outputs=["json/forecast_area_tree.json"],
+    ),
+    "area_marine_aj": Step(
+        "area_marine_aj",
+        sources=["AreaMarineAJ"],
+        outputs=["json/AreaMarineA.json", "json/AreaMarineJ.json"],
+    ),
+    "area_river": Step(
+        "area_river",
+        sources=["AreaRiver"],
+        outputs=["json/AreaRiver.json"],
+    ),
+    "jmaxml_info_codes": Step(
+        "jmaxml_info_codes",
+        sources=["jmaxml_"],
+        outputs=[
+            "json/HazardousRain.json",
+            "json/HazardousWindWatch.json",
+            "json/MarineWarning.json",
+            "json/Significancy.json",
+            "json/SoilWarning.json",
+            "json/WeatherWarning.json",
+        ],
+    ),
+    "phenological_type": Step(
+        "phenological_type",
+        sources=["PhenologicalType"],
+        outputs=["json/PhenologicalType.json"],
+    ),
+    "river_offce": Step(
+        "river_offce",
+        sources=["RiverOffice"],
+        outputs=["json/RiverOffice.json"],
+    ),
+    "seis_and_volc": Step(
+        "seis_and_volc",
+        sources=["地震火山関連"],
+        inputs=[
+            "datasrc/manual_input/point_tsunami.json",
+            "src/jma_codes/intensity.py",
+        ],
+        outputs=[
+            "json/AdditionalCommentEarthquake.json",
+            "json/AreaEpicenter*.json",
+            "json/AreaForecastEEW.json",
+            "json/AreaForecastLocalEEW.json",
+            "json/AreaInformationPrefectureEarthquake.json",
+            "json/AreaTsunami.json",
+            "json/CoastTsunami.json",
+            "json/Earthquake*.json",
+            "json/Point*Intensity.json",
+            "json/normalized/Point*Intensity.json",
+            "json/PointTsunami.json",
+            "json/PointVolcano.*",
+            "json/shards/PointSeismicIntensity/*",
+            "json/TokaiInformation.json",
+            "json/TsunamiWarning.json",
+            "json/VolcanicWarning.json",
+        ],
+        remote=True,
+    ),
+    "water_level_station": Step(
+        "water_level_station",
+        sources=["WaterLevelStation"],
+        outputs=["json/WaterLevelStation.json"],
+    ),
+    "wmo_observing_stations": Step(
+        "wmo_observing_stations",
+        sources=["WmoObservingStations"],
+        outputs=["json/WmoObservingStations.*"],
+    ),
+}
+
+# 各コード表のコードの桁数などを調べるため、他の変換スクリプトの後に実行する
+CONVERTERS["code_type_registry"] = Step(
+    "code_type_registry",
+    sources=["jmaxml_", "地震火山関連"],
+    inputs=[
+        "json/[A-Z]*.json",
+        "json/amedas_*.json",
+        "json/forecast_area_tree.json",
+    ],
+    outputs=["json/code_type_registry.json"],
+    deps=list(CONVERTERS),
+)
+
+STEPS: dict[str, Step] = {
+    **CONVERTERS,
+    "snapshot": Step(
+        "snapshot",
+        inputs=["json/*.json"],
+        outputs=["src/jma_codes/snapshot/*.pickle"],
+        deps=list(CONVERTERS),
+    ),
+    "code_index": Step(
+        "code_index",
+        inputs=["json/Point*SeismicIntensity.json", "src/jma_codes/codeindex.py"],
+        outputs=["src/jma_codes/snapshot/*.idx"],
+        deps=["seis_and_volc"],
+    ),
+    "spatial_index": Step(
+        "spatial_index",
+        inputs=[
+            "json/amedas_*.json",
+            "json/WmoObservingStations.json",
+            "json/PointSeismicIntensity.json",
+            "json/PointTsunami.json",
+            "json/PointVolcano.json",
+            "src/jma_codes/spatial.py",
+        ],
+        outputs=["src/jma_codes/snapshot/*.kdtree"],
+        deps=["amedas", "wmo_observing_stations", "seis_and_volc"],
+    ),
+    "search_index": Step(
+        "search_index",
+        inputs=[
+            "json/forecast_area_tree.json",
+            "json/Area*.json",
+            "json/WaterLevelStation.json",
+            "json/PointVolcano.json",
+            "json/PointTsunami.json",
+            "json/PointSeismicIntensity.json",
+            "json/amedas_*.json",
+            "json/WmoObservingStations.json",
+            "src/jma_codes/search.py",
+        ],
+        outputs=["src/jma_codes/snapshot/*.ngram"],
+        deps=list(CONVERTERS),
+    ),
+    "record_types": Step(
+        "record_types",
+        inputs=[
+            "json/[A-Z]*.json",
+            "json/amedas_*.json",
+            "json/forecast_area_tree.json",
+        ],
+        outputs=["src/jma_codes/record_types.py"],
+        deps=list(CONVERTERS),
+    ),
+    "area_index": Step(
+        "area_index",
+        inputs=["datasrc/shape_properties/*.json", "src/jma_codes/area_index.py"],
+        outputs=["src/jma_codes/snapshot/*.rtree"],
+    ),
+    "cdn": Step(
+        "cdn",
+        inputs=["json/*.json", "json/*.geojson", "json/shards/*/*"],
+        outputs=["cdn/**/*"],
+        deps=list(CONVERTERS),
+    ),
+    "tiles": Step(
+        "tiles",
+        inputs=[
+            "json/amedas_*.json",
+            "json/WmoObservingStations.json",
+            "json/PointSeismicIntensity.json",
+            "json/PointTsunami.json",
+            "json/PointVolcano.json",
+            "src/jma_codes/spatial.py",
+        ],
+        outputs=["tiles/*"],
+        deps=["amedas", "wmo_observing_stations", "seis_and_volc"],
+    ),
+}
+
+
+def _init_worker() -> None:
+    # リモートのデータの取得時間などをビルドログに出力する
+    logging.basicConfig(level=logging.INFO, format="%(name)s: %(message)s")
+    # 各ステップの実行時間に pandas の読み込み時間が含まれないよう、先に読み込んでおく
+    import pandas  # noqa: F401
+
+
+def _run_step(name: str) -> tuple[float, dict[str, str]]:
+    """ワーカープロセスで、ステップを実行する
+
+    実行時間と、取得したリモートのデータのハッシュ値を返す
+    """
+
+    REMOTE_INPUTS.clear()
+    t = time.perf_counter()
+    importlib.import_module(f"tools.{STEPS[name].module}").process()
+    return time.perf_counter() - t, dict(REMOTE_INPUTS)
+
+
+def resolve(targets: list[str], with_deps: bool = True) -> list[str]:
+    """実行するステップを、依存関係の順に並べて返す"""
+
+    order: list[str] = []
+
+    def visit(name: str, path: tuple[str, ...]) -> None:
+        if name in path:
+            raise RuntimeError(f"circular dependency: {' -> '.join(path + (name,))}")
+        if name in order:
+            return
+        for dep in STEPS[name].deps:
+            if with_deps or dep in targets:
+                visit(dep, path + (name,))
+        order.append(name)
+
+    for name in targets:
+        visit(name, ())
+    return order
+
+
+def _is_up_to_date(
+    step: Step, inputs: Fingerprints, entry: Optional[dict[str, Any]]
+) -> bool:
+    """前回の実行から入力・出力ともに変化がないか"""
+
+    if entry is None or not same_contents(inputs, entry["inputs"]):
+        return False
+    outputs = fingerprint(expand(step.outputs), entry["outputs"])
+    return bool(outputs) and same_contents(outputs, entry["outputs"])
+
+
+def build(
+    targets: list[str],
+    jobs: int,
+    with_deps: bool = True,
+    force: bool = False,
+    refresh_remote: bool = False,
+) -> bool:
+    """ステップを実行する
+
+    force でなければ、前回から入力・出力が変化していないステップは実行しない。
+    リモートのデータは取得しないと変化がわからないため、リモートのデータを使う
+    ステップは、refresh_remote の場合のみ (入力ファイルが変化していなくても) 実行する
+    """
+
+    names = resolve(targets, with_deps)
+    manifest = load_manifest()
+    entries: dict[str, dict[str, Any]] = manifest["steps"]
+
+    def deps_of(name: str) -> set[str]:
+        return {d for d in STEPS[name].deps if d in names}
+
+    done: set[str] = set()
+    failed: list[str] = []
+    pending = list(names)
+    running: dict[Future, tuple[str, Fingerprints]] = {}
+    t = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as executor:
+        while pending or running:
+            # 依存先が完了したステップのうち、変化のないものは実行せずに完了とする
+            while ready := [n for n in pending if deps_of(n) <= done]:
+                for name in ready:
+                    pending.remove(name)
+                    step = STEPS[name]
+                    entry = entries.get(name)
+                    inputs = fingerprint(step.input_paths(), entry and entry["inputs"])
+                    if (
+                        force
+                        or (step.remote and refresh_remote)
+                        or not _is_up_to_date(step, inputs, entry)
+                    ):
+                        running[executor.submit(_run_step, name)] = (name, inputs)
+                    else:
+                        print(f"{name:<26} up to date")
+                        done.add(name)
+
+            if not running:
+                # 依存先が失敗したステップは実行しない
+                for name in pending:
+                    print(f"{name}: skipped", file=sys.stderr)
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, inputs = running.pop(future)
+                try:
+                    elapsed, remote = future.result()
+                except Exception as e:
+                    failed.append(name)
+                    print(f"{name}: failed: {e!r}", file=sys.stderr)
+                    continue
+                print(f"{name:<26} {elapsed:>7.2f} s")
+                entries[name] = {
+                    "inputs": inputs,
+                    "remote": remote,
+                    "outputs": fingerprint(expand(STEPS[name].outputs)),
+                }
+                done.add(name)
+
+    save_manifest(manifest)
+    print(f"{'total (wall)':<26} {time.perf_counter() - t:>7.2f} s")
+    return not failed and not pending
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m tools.build", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("steps", nargs="*", metavar="step", help=", ".join(STEPS))
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--no-deps", action="store_true", help="依存先のステップを実行しない"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="変化のないステップも実行する"
+    )
+    parser.add_argument(
+        "--refresh-remote",
+        action="store_true",
+        help="インターネット上のデータを使うステップを、取得し直して実行する",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="ネットワークに接続せず、キャッシュ済みのリモートのデータを使う",
+    )
+    parser.add_argument(
+        "--sheet-cache",
+        metavar="DIR",
+        help="読み込んだ Excel シートを保存し、次回以降に再利用するディレクトリ",
+    )
+    args = parser.parse_args()
+    if unknown := [s for s in args.steps if s not in STEPS]:
+        parser.error(f"unknown steps: {', '.join(unknown)}")
+    if args.offline:
+        os.environ[OFFLINE_ENV] = "1"
+    if args.sheet_cache:
+        os.environ[SHEET_CACHE_ENV] = args.sheet_cache  # ワーカープロセスに引き継がれる
+
+    if not build(
+        args.steps or list(CONVERTERS),
+        args.jobs,
+        with_deps=not args.no_deps,
+        force=args.force,
+        refresh_remote=args.refresh_remote,
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""JSON / GeoJSON の配信用ファイルを作る
+
+./json/ の各ファイル (都道府県ごとのシャードを含む) を空白を除いて (minify) ./cdn/ に
+書き出し、gzip と brotli で圧縮したもの (.gz, .br) もあわせて置きます。
+ファイル名には内容のハッシュ値を含めるため、長期間キャッシュさせることができます。
+
+元のファイル名と配信用のファイル名・ハッシュ値・サイズの対応は ./cdn/manifest.json に、
+サイズの一覧は標準出力に出力します。brotli は brotli または brotlicffi がある場合のみ作ります。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+JSON_DIR = Path("./json")
+CDN_DIR = Path("./cdn")
+PATTERNS = ["*.json", "*.geojson", "shards/*/*.json", "shards/*/*.geojson"]
+HASH_LENGTH = 12
+
+
+def _brotli_compressor() -> Optional[Callable[[bytes], bytes]]:
+    try:
+        import brotli
+    except ImportError:
+        try:
+            import brotlicffi as brotli
+        except ImportError:
+            return None
+    return lambda data: brotli.compress(data, quality=11)
+
+
+def minify(path: Path) -> bytes:
+    """JSON ファイルを、キーの順序を変えずに空白を除いたバイト列にする"""
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode(
+    path: Path, compress_br: Optional[Callable[[bytes], bytes]]
+) -> dict[str, bytes]:
+    """minify したものと、その圧縮版 (拡張子 -> 内容)"""
+
+    data = minify(path)
+    variants = {"": data, ".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if compress_br is not None:
+        variants[".br"] = compress_br(data)
+    return variants
+
+
+def process() -> None:
+    compress_br = _brotli_compressor()
+    if compress_br is None:
+        print("brotli is not available; skipping .br files")
+
+    CDN_DIR.mkdir(parents=True, exist_ok=True)
+    manifest: dict[str, dict[str, Any]] = {}
+    written: set[str] = {"manifest.json"}
+    totals = [0, 0, 0, 0]
+
+    paths = sorted(p for pattern in PATTERNS for p in JSON_DIR.glob(pattern))
+    print(f"{'file':<44} {'original':>10} {'minified':>10} {'gzip':>10} {'br':>10}")
+    # 圧縮は GIL を解放するため、スレッドで並列に行う
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        encoded = executor.map(lambda p: encode(p, compress_br), paths)
+    for path, variants in zip(paths, encoded):
+        data = variants[""]
+        digest = hashlib.sha256(data).hexdigest()
+        source = path.relative_to(JSON_DIR)
+        name = (
+            source.parent / f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}"
+        ).as_posix()
+
+        (CDN_DIR / name).parent.mkdir(parents=True, exist_ok=True)
+        for suffix, content in variants.items():
+            (CDN_DIR / f"{name}{suffix}").write_bytes(content)
+            written.add(f"{name}{suffix}")
+
+        manifest[source.as_posix()] = {
+            "path": name,
+            "sha256": digest,
+            "size": len(data),
+            **{
+                suffix[1:]: len(content)
+                for suffix, content in variants.items()
+                if suffix
+            },
+        }
+        sizes = [path.stat().st_size, len(data), len(variants[".gz"])]
+        sizes.append(len(variants[".br"]) if ".br" in variants else 0)
+        print(f"{source.as_posix():<44} " + " ".join(f"{s:>10,}" for s in sizes))
+        totals = [t + s for t, s in zip(totals, sizes)]
+    print(f"{'total':<44} " + " ".join(f"{s:>10,}" for s in totals))
+
+    with open(CDN_DIR / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, sort_keys=True, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+    # 以前に作った (内容の変わった) ファイルを消す
+    for path in CDN_DIR.rglob("*"):
+        if path.is_file() and path.relative_to(CDN_DIR).as_posix() not in written:
+            path.unlink()
+
+
+if __name__ == "__main__":
+    process()
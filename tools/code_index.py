@@ -0,0 +1,30 @@
+"""震度観測点の表から、mmap で検索できるインデックスを作る
+
+seis_and_volc.py が出力した JSON の pointToCity と cityToSaibun を、
+それぞれ jma_codes.codeindex の形式で書き出します。
+"""
+
+import json
+
+from jma_codes.codeindex import build_index, index_path
+
+TABLES: dict[str, list[str]] = {
+    "PointSeismicIntensity": ["pointToCity", "cityToSaibun"],
+    "PointRealtimeSeismicIntensity": ["pointToCity", "cityToSaibun"],
+}
+
+
+def process() -> None:
+    for name, parts in TABLES.items():
+        with open(f"./json/{name}.json", encoding="utf-8") as f:
+            data = json.load(f)
+
+        for part in parts:
+            path = index_path(name, part)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(build_index(data[part]))
+
+
+if __name__ == "__main__":
+    process()
@@ -0,0 +1,192 @@
+"""コードの種別 (codeType) とコード表の対応表
+
+jmaxml_*_code.xls の「対象地域・地点コード管理表」「警報等情報要素コード管理表」と、
+地震火山関連コード表.xls の「エクセルシート一覧」から、各種別について次のものを求め、
+./json/code_type_registry.json に書き出します。
+
+- codeTypes: 種別 -> コード名、引くべきコード表 (sources)、コードの桁数 (width)
+- infoKinds: 出現電文 (InfoKind) -> その電文に現れる種別
+- infoTypes: Information/@type, Warning/@type などの値 -> その要素の Kind/Code の種別 (kind) と、
+  区域・地点の種別 (areas)
+
+sources の各要素は、コード表の名前 (table) と部分 (part)、名前・ふりがなのフィールド名
+(name, kana。レコードが文字列の場合は null)、コード以外のフィールドをキーにする場合は
+そのフィールド名 (key) です。width は、コード表のコードがすべて同じ桁数の数字の場合の桁数で、
+ゼロ埋めを省いたコードを補うのに使います。
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+from .utils import get_filename_for
+from .utils.workbook import read_sheet
+
+AREA_SHEET = "対象地域・地点コード管理表"
+ELEMENT_SHEET = "警報等情報要素コード管理表"
+KIND_PREFIX = "警報等情報要素／"
+
+# コード名 -> 引くコード表 (表の名前, 部分, キーとするフィールド)
+# ここにないコード名は、同名の表があればその items を引く
+SOURCES: dict[str, list[tuple[str, str, Optional[str]]]] = {
+    "AreaForecastLocalM": [("forecast_area_tree", "items", None)],
+    "AreaInformationCity": [("forecast_area_tree", "items", None)],
+    # 地震情報／細分区域 の単独の表はないため、市町村等との対応表から引く
+    "AreaForecastLocalE": [("PointSeismicIntensity", "cityToSaibun", "seisSaibunCode")],
+    "PointSeismicIntensity": [("PointSeismicIntensity", "pointToCity", None)],
+    "PointRealtimeSeismicIntensity": [
+        ("PointRealtimeSeismicIntensity", "pointToCity", None)
+    ],
+    "PointAmedas": [("amedas_ame", "items", None), ("amedas_snow", "items", None)],
+    # 長周期地震動観測点ではなく、細分区域をキーにした表になっている
+    "PointSeismicLgIntensity": [],
+}
+
+NAME_FIELDS = ["name", "point", "text"]
+
+_CONDITION = re.compile(r'^(\w+)/@type="(.+)"の場合$')
+
+
+def _unquote(s: str) -> str:
+    return s.strip().strip('"')
+
+
+def read_management_sheet(
+    sheet_name: str,
+) -> tuple[dict[str, str], list[tuple[str, str, Optional[str]]]]:
+    """管理表から、種別 -> コード名 と、(種別, 出現電文, @type の値) の一覧を読む"""
+
+    df = read_sheet(
+        get_filename_for("jmaxml_"), sheet_name=sheet_name, skiprows=3, dtype=str
+    )
+    # コード名・属性は、次に値が現れるまで後続の行にも適用される
+    df["コード名"] = df["コード名"].ffill()
+    df["属性"] = df["属性"].ffill()
+    info_kinds = df["値"].where(df["属性"] == "出現電文(InfoKind)")
+    df["出現電文"] = info_kinds.groupby(df["コード名"]).ffill()
+
+    code_names: dict[str, str] = {}
+    appearances: list[tuple[str, str, Optional[str]]] = []
+    code_type = None
+    for code_name, attr, value, info_kind, desc in zip(
+        df["コード名"].tolist(),
+        df["属性"].tolist(),
+        df["値"].tolist(),
+        df["出現電文"].tolist(),
+        df["解説"].tolist(),
+    ):
+        if attr == "種別":
+            code_type = _unquote(value)
+            code_names[code_type] = code_name
+        elif attr == "出現電文(InfoKind)" and code_type and isinstance(info_kind, str):
+            m = _CONDITION.match(desc) if isinstance(desc, str) else None
+            info_type = m.group(2) if m and m.group(2) != "※" else None
+            appearances.append((code_type, _unquote(info_kind), info_type))
+    return code_names, appearances
+
+
+def read_seismic_code_types() -> dict[str, str]:
+    """地震火山関連コード表のシート一覧から、種別 -> コード名 を読む"""
+
+    df = read_sheet(
+        get_filename_for("地震火山関連"),
+        sheet_name="エクセルシート一覧",
+        skiprows=1,
+        dtype=str,
+    )
+    code_names: dict[str, str] = {}
+    for names, code_types in zip(df["コード表名"].tolist(), df["コード種別"].tolist()):
+        if not isinstance(code_types, str):
+            continue
+        names = [n.strip() for n in names.strip().removesuffix("コード表").split("・")]
+        for name, code_type in zip(names, re.findall(r'"([^"]+)"', code_types)):
+            code_names[code_type] = name
+    return code_names
+
+
+def _load(table: str) -> Optional[dict[str, Any]]:
+    try:
+        with open(f"./json/{table}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def describe_source(table: str, part: str, key: Optional[str]) -> dict[str, Any]:
+    """コード表の名前・ふりがなのフィールド名とコードの桁数を調べる"""
+
+    data = _load(table)
+    assert data is not None, table
+    records = list(data[part].values())
+    if key is None:
+        codes = list(data[part])
+        fields = {k for r in records if isinstance(r, dict) for k in r}
+        name = next((f for f in NAME_FIELDS if f in fields), None)
+        kana = "kana" if "kana" in fields else None
+    else:
+        codes = [r[key] for r in records]
+        prefix = key.removesuffix("Code")
+        name = f"{prefix}Name"
+        kana = f"{prefix}Kana" if any(f"{prefix}Kana" in r for r in records) else None
+
+    widths = {len(c) for c in codes}
+    uniform = len(widths) == 1 and all(c.isdigit() for c in codes)
+    return {
+        "table": table,
+        "part": part,
+        "key": key,
+        "name": name,
+        "kana": kana,
+        "width": widths.pop() if uniform else None,
+    }
+
+
+def process() -> None:
+    area_names, area_appearances = read_management_sheet(AREA_SHEET)
+    element_names, element_appearances = read_management_sheet(ELEMENT_SHEET)
+    code_names = {**read_seismic_code_types(), **element_names, **area_names}
+
+    code_types: dict[str, dict[str, Any]] = {}
+    for code_type, code_name in code_names.items():
+        if code_name in SOURCES:
+            specs = SOURCES[code_name]
+        elif _load(code_name) is not None:
+            specs = [(code_name, "items", None)]
+        else:
+            specs = []
+        sources = [describe_source(*spec) for spec in specs]
+        widths = {s.pop("width") for s in sources}
+        code_types[code_type] = {
+            "codeName": code_name,
+            "sources": sources,
+            "width": widths.pop() if len(widths) == 1 else None,
+        }
+
+    info_kinds: dict[str, set[str]] = {}
+    info_types: dict[str, dict[str, Any]] = {}
+    for code_type, info_kind, info_type in area_appearances + element_appearances:
+        info_kinds.setdefault(info_kind, set()).add(code_type)
+        if info_type is None:
+            continue
+        entry = info_types.setdefault(info_type, {"kind": None, "areas": set()})
+        if code_type.startswith(KIND_PREFIX):
+            assert entry["kind"] in (None, code_type), info_type
+            entry["kind"] = code_type
+        else:
+            entry["areas"].add(code_type)
+
+    registry = {
+        "codeTypes": code_types,
+        "infoKinds": {k: sorted(v) for k, v in info_kinds.items()},
+        "infoTypes": {
+            k: {"kind": v["kind"], "areas": sorted(v["areas"])}
+            for k, v in info_types.items()
+        },
+    }
+    with open("./json/code_type_registry.json", "w") as f:
+        json.dump(registry, f, sort_keys=True, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    process()
@@ -6,41 +6,29 @@
 """
 
 import json
-from typing import Optional
-
-import pandas as pd
 
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    df = pd.read_excel(get_filename_for("jmaxml_"), skiprows=3, dtype={"値": str})
-    result = {}
-    currentCodeName: Optional[str] = None
-    isValueMode = False
-    for _, row in df.iterrows():
-        cn = row["コード名"]
-        if not pd.isnull(cn):
-            currentCodeName = cn
-
-        attrib = row["属性"]
-        if not pd.isnull(attrib):
-            if attrib == "とりうる値":
-                isValueMode = True
-            else:
-                isValueMode = False
-
-        if isValueMode:
-            value = row["値"]
-            if not pd.isnull(value):
-                value = str(int(row["値"])).zfill(2)  # 数値に変換できる値である
-                desc = row["解説"]
-                desc = desc.replace(
-                    '（Control/Title="気象警報・注意報"の場合には出現しない。）', ""
-                )
-                if currentCodeName not in result:
-                    result[currentCodeName] = {}
-                result[currentCodeName][value] = desc
+    df = read_sheet(get_filename_for("jmaxml_"), skiprows=3, dtype={"値": str})
+    # コード名・属性は、次に値が現れるまで後続の行にも適用される
+    code_names = df["コード名"].ffill()
+    is_value_mode = df["属性"].ffill() == "とりうる値"
+
+    df = df[is_value_mode & df["値"].notnull()]
+    code_names = code_names[df.index]
+    values = df["値"].astype(int).astype(str).str.zfill(2)  # 数値に変換できる値である
+    descs = df["解説"].str.replace(
+        '（Control/Title="気象警報・注意報"の場合には出現しない。）', "", regex=False
+    )
+
+    result: dict[str, dict[str, str]] = {}
+    for code_name, value, desc in zip(
+        code_names.tolist(), values.tolist(), descs.tolist()
+    ):
+        result.setdefault(code_name, {})[value] = desc
 
     for codeType, values in result.items():
         with open(f"./json/{codeType}.json", "w") as f:
@@ -1,21 +1,22 @@
 """同一現象"""
 
 import json
-from typing import cast
-
-import pandas
 
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    df = pandas.read_excel(get_filename_for("PhenologicalType"), skiprows=1)
+    df = read_sheet(get_filename_for("PhenologicalType"), skiprows=1)
+
+    class_names = df["ClassName"].str.split("\n")
 
-    result = {}
-    for _, row in df.iterrows():
-        code = row["Code"]
-        classNames = [s.strip() for s in cast(str, row["ClassName"]).split("\n")]
-        result[code] = {"name": row["Name"], "classNames": classNames}
+    result = {
+        code: {"name": name, "classNames": [s.strip() for s in classNames]}
+        for code, name, classNames in zip(
+            df["Code"].tolist(), df["Name"].tolist(), class_names.tolist()
+        )
+    }
 
     with open("./json/PhenologicalType.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
@@ -0,0 +1,123 @@
+"""コード表のレコードの型 (NamedTuple) を生成する
+
+./json/ のコード表のうち、レコードが辞書である部分 (items, pointToCity など) について、
+各フィールドの値の型を調べ、src/jma_codes/record_types.py に NamedTuple として書き出します。
+すべてのレコードにあるフィールドを先に、一部のレコードにしかないフィールドを
+既定値 None として後に並べます。
+"""
+
+import json
+import keyword
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+OUTPUT = Path("./src/jma_codes/record_types.py")
+
+# コード表ではないもの
+EXCLUDE = {"code_type_registry"}
+
+HEADER = '''"""コード表のレコードの型
+
+tools/record_types.py で ./json/ のコード表から生成しています。直接編集しないでください。
+jma_codes.records.load_records でレコードをこれらの型に変換して読み込めます。
+"""
+
+from typing import {imports}
+'''
+
+
+def _value_type(value: Any) -> Optional[str]:
+    """値の型 (空のリスト・辞書は、要素の型がわからないため None)"""
+
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list) and value:
+        return f"tuple[{_union(_value_type(v) for v in value)}, ...]"
+    if isinstance(value, dict) and value:
+        return f"dict[str, {_union(_value_type(v) for v in value.values())}]"
+    return None
+
+
+def _union(types: Iterable[Optional[str]]) -> str:
+    """値の型をまとめる (int と float は float に、それ以外が混在すれば Any に)"""
+
+    kinds = {t for t in types if t is not None}
+    if kinds == {"int", "float"}:
+        return "float"
+    return kinds.pop() if len(kinds) == 1 else "Any"
+
+
+def class_name(table: str, part: str) -> str:
+    name = "".join(w[0].upper() + w[1:] for w in table.split("_"))
+    return name if part == "items" else name + part[0].upper() + part[1:]
+
+
+def record_fields(records: list[dict[str, Any]]) -> list[tuple[str, str, bool]]:
+    """(フィールド名, 型, すべてのレコードにあるか) の一覧"""
+
+    values: dict[str, list[Any]] = {}
+    for record in records:
+        for key, value in record.items():
+            values.setdefault(key, []).append(value)
+
+    fields = []
+    for key in sorted(values):
+        assert key.isidentifier() and not keyword.iskeyword(key), key
+        assert not key.startswith("_") and key not in ("count", "index"), key
+        present = [v for v in values[key] if v is not None]
+        annotation = _union(_value_type(v) for v in present)
+        required = len(present) == len(records)
+        fields.append((key, annotation, required))
+    return sorted(fields, key=lambda f: not f[2])
+
+
+def render_class(name: str, fields: list[tuple[str, str, bool]]) -> str:
+    lines = [f"class {name}(NamedTuple):"]
+    for key, annotation, required in fields:
+        if required:
+            lines.append(f"    {key}: {annotation}")
+        else:
+            lines.append(f"    {key}: Optional[{annotation}] = None")
+    return "\n".join(lines)
+
+
+def process() -> None:
+    classes: list[str] = []
+    record_types: list[tuple[str, str]] = []
+    for path in sorted(Path("./json").glob("*.json")):
+        if path.stem in EXCLUDE:
+            continue
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for part, records in data.items():
+            if not isinstance(records, dict) or not all(
+                isinstance(r, dict) for r in records.values()
+            ):
+                continue
+            name = class_name(path.stem, part)
+            classes.append(render_class(name, record_fields(list(records.values()))))
+            record_types.append((f"{path.stem}.{part}", name))
+
+    imports = "NamedTuple, Optional"
+    if any("Any" in c for c in classes):
+        imports = "Any, " + imports
+    header = HEADER.format(imports=imports).rstrip("\n")
+    source = "\n\n\n".join([header, *classes])
+    source += (
+        "\n\n\n# 「表の名前.部分」 -> レコードの型\nRECORD_TYPES: dict[str, type] = {\n"
+    )
+    source += "".join(f'    "{key}": {name},\n' for key, name in record_types)
+    source += "}\n"
+    with open(OUTPUT, "w", encoding="utf-8") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    process()
@@ -5,19 +5,14 @@
 
 import json
 
-import pandas
-
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    df = pandas.read_excel(get_filename_for("RiverOffice"), skiprows=2)
+    df = read_sheet(get_filename_for("RiverOffice"), skiprows=2)
 
-    result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        name = row["@name"]
-        result[code] = name
+    result = dict(zip(df["@code"].tolist(), df["@name"].tolist()))
 
     with open("./json/RiverOffice.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
@@ -0,0 +1,24 @@
+"""区域・観測点の表の名前とふりがなから、検索のための n-gram インデックスを作る
+
+jma_codes.search.SOURCES の各表を、jma_codes.search の形式で書き出します。
+"""
+
+import json
+
+from jma_codes.search import SOURCES, build_index, index_path
+
+
+def process() -> None:
+    tables = {}
+    for name, (part, _) in SOURCES.items():
+        with open(f"./json/{name}.json", encoding="utf-8") as f:
+            tables[name] = json.load(f)[part]
+
+    path = index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(build_index(tables))
+
+
+if __name__ == "__main__":
+    process()
@@ -1,11 +1,19 @@
 """地震火山関連コード表.xls を JSON に変換する"""
 
 import json
-from typing import Any, cast
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import cast
 
 import pandas as pd
 
+from jma_codes.intensity import normalize
+
 from .utils import get_filename_for, seisvolc_point
+from .utils.dataframe import records, strip
+from .utils.json_writer import point_features, write_feature_collection
+from .utils.shards import group_by_prefecture, shard_path, write_shard_index
+from .utils.workbook import read_sheet
 
 SHEETS_IGNORE: list[str] = ["エクセルシート一覧", "更新履歴"]
 
@@ -85,23 +93,58 @@ SHEET_CODE_ZERO_PAD: dict[str, int] = {
 }
 
 
-def process() -> None:
-    dfs = pd.read_excel(
-        get_filename_for("地震火山関連"),
-        sheet_name=None,
-        skiprows=2,
-        dtype={
-            "Code": str,
-            "Code.1": str,
-            "Code.2": str,
-        },
+def write_intensity_shards(name: str, result: dict[str, dict]) -> None:
+    """震度観測点の表を、市町村等のコードの上2桁 (都道府県) ごとに分割して書き出す"""
+
+    points = group_by_prefecture(
+        result["pointToCity"].items(), lambda item: item["cityCode"][:2]
     )
+    cities = group_by_prefecture(
+        result["cityToSaibun"].items(), lambda item: item["cityCode"][:2]
+    )
+    for prefecture, items in points.items():
+        shard = {
+            "pointToCity": dict(items),
+            "cityToSaibun": dict(cities.get(prefecture, [])),
+        }
+        with open(shard_path(name, prefecture, ".json"), "w", encoding="utf-8") as f:
+            json.dump(shard, f, sort_keys=True, ensure_ascii=False, indent=2)
+            f.write("\n")
+    write_shard_index(name, {p: len(items) for p, items in points.items()}, [".json"])
+
+
+def write_normalized(name: str, result: dict[str, dict]) -> None:
+    """震度観測点の表を、細分区域・市町村等・観測点の表に分けた形式でも書き出す"""
+
+    path = Path(f"./json/normalized/{name}.json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(normalize(result), f, sort_keys=True, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def process() -> None:
+    # インターネット上のソースの取得を、ワークブックの読み込みと並行して行う
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        remote = executor.submit(seisvolc_point.prefetch)
+        dfs = read_sheet(
+            get_filename_for("地震火山関連"),
+            sheet_name=None,
+            skiprows=2,
+            dtype={
+                "Code": str,
+                "Code.1": str,
+                "Code.2": str,
+            },
+        )
+        remote.result()
 
     # 震度観測点の座標をインターネット上のソースから取得
     intensity_points = seisvolc_point.IntensityPoints()
     # 火山の座標をインターネット上のソースから取得
     volc_points = seisvolc_point.get_volc_points()
 
+    volcanoes: dict[str, dict] = {}
     for sheet_name, df in dfs.items():
         sheet_name = sheet_name.strip()
         if sheet_name in SHEETS_IGNORE:
@@ -110,18 +153,18 @@ def process() -> None:
         if sheet_name in RENAME_COLUMNS:
             df = df.rename(columns=RENAME_COLUMNS[sheet_name])
 
-        items: dict[str, dict] = {}
-        for _, row in df.iterrows():
-            r: dict[str, Any] = {}
-            for k, v in NAME_MAP.items():
-                if k in row and (not pd.isnull(row[k])):
-                    value = cast(str, row[k]).strip()
-                    if ("Code" in k) and (sheet_name in SHEET_CODE_ZERO_PAD):
-                        value = value.zfill(SHEET_CODE_ZERO_PAD[sheet_name])
-                    r[v] = value
-
-            code = cast(str, row["Code"])
+        columns = {}
+        for k, v in NAME_MAP.items():
+            if k in df.columns:
+                s = strip(df[k])
+                if ("Code" in k) and (sheet_name in SHEET_CODE_ZERO_PAD):
+                    s = s.str.zfill(SHEET_CODE_ZERO_PAD[sheet_name])
+                columns[v] = s
 
+        items: dict[str, dict] = {}
+        for code, r in zip(
+            df["Code"].tolist(), records(pd.DataFrame(columns, index=df.index))
+        ):
             # PointSeismicIntensity に座標を与える
             if sheet_name in ["24"]:
                 station = intensity_points.find_station(
@@ -172,6 +215,8 @@ def process() -> None:
         else:
             # 震度観測点以外の表
             result = {"items": items}
+            if sheet_name == "82":
+                volcanoes = items
 
         with open(
             f"./json/{SHEET_NAME_MAP[sheet_name]}.json", "w", encoding="utf-8"
@@ -179,30 +224,18 @@ def process() -> None:
             json.dump(result, f, sort_keys=True, ensure_ascii=False, indent=2)
             f.write("\n")
 
-    # PointVolcano の .geojson 版を作る
-    with open("./json/PointVolcano.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    features = []
-    for volc in data["items"].values():
-        if lnglat := volc.pop("lnglat", None):
-            features.append(
-                {
-                    "type": "Feature",
-                    "properties": volc,
-                    "geometry": {"type": "Point", "coordinates": lnglat},
-                }
-            )
+        if sheet_name in ["24", "25"]:
+            write_normalized(SHEET_NAME_MAP[sheet_name], result)
+        if sheet_name == "24":
+            write_intensity_shards(SHEET_NAME_MAP[sheet_name], result)
 
+    # PointVolcano の .geojson 版を作る (PointVolcano.json と同じく、コード順・キー順)
     with open("./json/PointVolcano.geojson", "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "type": "FeatureCollection",
-                "features": features,
-            },
+        write_feature_collection(
             f,
-            ensure_ascii=False,
-            indent=2,
+            point_features(
+                (volcanoes[code] for code in sorted(volcanoes)), sort_properties=True
+            ),
         )
 
 
@@ -0,0 +1,41 @@
+"""JSONファイル群から、読み込み用のスナップショット (pickle) を作る
+
+同じ値の文字列を1つのオブジェクトにまとめてから pickle 化するため、
+JSONよりも小さく、json.load よりも数倍速く読み込めます。
+"""
+
+import json
+import pickle
+from pathlib import Path
+from typing import Any
+
+SNAPSHOT_DIR = Path("./src/jma_codes/snapshot")
+
+
+def dedupe_strings(obj: Any, memo: dict[str, str]) -> Any:
+    """同じ値の文字列が同じオブジェクトを指すようにしたコピーを返す"""
+
+    if isinstance(obj, str):
+        return memo.setdefault(obj, obj)
+    elif isinstance(obj, dict):
+        return {memo.setdefault(k, k): dedupe_strings(v, memo) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [dedupe_strings(v, memo) for v in obj]
+    return obj
+
+
+def write_snapshot(name: str, result: Any) -> None:
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    with open(SNAPSHOT_DIR / f"{name}.pickle", "wb") as f:
+        pickle.dump(dedupe_strings(result, {}), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def process() -> None:
+    for path in sorted(Path("./json").glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            result = json.load(f)
+        write_snapshot(path.stem, result)
+
+
+if __name__ == "__main__":
+    process()
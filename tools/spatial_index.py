@@ -0,0 +1,23 @@
+"""座標を持つ地点の表から、最近傍検索などのための空間インデックスを作る
+
+jma_codes.spatial.LAYERS の各レイヤを、jma_codes.spatial の形式で書き出します。
+"""
+
+import json
+
+from jma_codes.spatial import LAYERS, build_index, index_path, points_of
+
+
+def process() -> None:
+    for layer, (name, part) in LAYERS.items():
+        with open(f"./json/{name}.json", encoding="utf-8") as f:
+            data = json.load(f)
+
+        path = index_path(layer)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(build_index(points_of(data[part])))
+
+
+if __name__ == "__main__":
+    process()
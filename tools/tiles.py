@@ -0,0 +1,156 @@
+"""地点のレイヤをベクトルタイル (MVT) にして、1つの PMTiles ファイルに書き出す
+
+アメダス・WMO 観測所・火山・津波観測点・震度観測点の各レイヤを、
+ズームレベル MINZOOM から MAXZOOM までタイルに分割し、./tiles/points.pmtiles に書き出します。
+
+低いズームレベルでは、タイル上で CELL_SIZE px 四方の格子ごとに1地点だけを残して間引きます。
+一度表示された地点は、それより高いズームレベルでも表示されます。
+"""
+
+import gzip
+import json
+import math
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from jma_codes.spatial import LAYERS
+
+from .utils.mvt import EXTENT, PointFeature, encode_tile, is_property_value
+from .utils.pmtiles import write_pmtiles
+
+OUTPUT = Path("./tiles/points.pmtiles")
+MINZOOM = 0
+MAXZOOM = 10
+CELL_SIZE = 32  # 256 px のタイル上での間引きの格子の大きさ (px)
+_MAX_LAT = 85.0511287798
+
+
+def _mercator(lng: float, lat: float) -> tuple[float, float]:
+    """経度・緯度をウェブメルカトルの [0, 1) の座標にする"""
+
+    lat = max(-_MAX_LAT, min(_MAX_LAT, lat))
+    x = (lng + 180) / 360
+    s = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return (min(x, 1 - 1e-12), min(y, 1 - 1e-12))
+
+
+class _Point(NamedTuple):
+    code: str
+    lng: float
+    lat: float
+    x: float  # ウェブメルカトルの [0, 1) の座標
+    y: float
+    properties: dict[str, Any]
+
+
+def _field_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "Boolean"
+    if isinstance(value, (int, float)):
+        return "Number"
+    return "String"
+
+
+def load_points(name: str, part: str) -> list[_Point]:
+    """座標を持つ地点のリスト (コード順)"""
+
+    with open(f"./json/{name}.json", encoding="utf-8") as f:
+        items = json.load(f)[part]
+
+    points = []
+    for code in sorted(items):
+        item = items[code]
+        if not (lnglat := item.get("lnglat")):
+            continue
+        x, y = _mercator(lnglat[0], lnglat[1])
+        properties = {"code": code}
+        properties.update(
+            (k, v) for k, v in item.items() if k != "lnglat" and is_property_value(v)
+        )
+        points.append(_Point(code, lnglat[0], lnglat[1], x, y, properties))
+    return points
+
+
+def min_zooms(points: list[_Point]) -> list[int]:
+    """各地点が表示され始めるズームレベル
+
+    ズームレベルごとに、すでに表示されている地点から順に格子を占め、
+    空いている格子の地点を新たに表示する (MAXZOOM ではすべて表示する)
+    """
+
+    result = [MAXZOOM] * len(points)
+    for z in range(MINZOOM, MAXZOOM):
+        scale = 256 * (1 << z) / CELL_SIZE
+        occupied = set()
+        order = sorted(range(len(points)), key=lambda i: (result[i] >= z, i))
+        for i in order:
+            cell = (int(points[i].x * scale), int(points[i].y * scale))
+            if result[i] < z:
+                occupied.add(cell)
+            elif cell not in occupied:
+                occupied.add(cell)
+                result[i] = z
+    return result
+
+
+def process() -> None:
+    layers = {layer: load_points(*table) for layer, table in LAYERS.items()}
+    zooms = {layer: min_zooms(points) for layer, points in layers.items()}
+
+    # (z, x, y) -> レイヤ名 -> 地物
+    tiles: dict[tuple[int, int, int], dict[str, list[PointFeature]]] = {}
+    for layer, points in layers.items():
+        for point, minzoom in zip(points, zooms[layer]):
+            feature_id = int(point.code) if point.code.isdigit() else None
+            for z in range(minzoom, MAXZOOM + 1):
+                n = 1 << z
+                tx, ty = int(point.x * n), int(point.y * n)
+                feature = PointFeature(
+                    x=int((point.x * n - tx) * EXTENT),
+                    y=int((point.y * n - ty) * EXTENT),
+                    properties=point.properties,
+                    id=feature_id,
+                )
+                tiles.setdefault((z, tx, ty), {}).setdefault(layer, []).append(feature)
+
+    all_points = [point for points in layers.values() for point in points]
+    bounds = (
+        min(p.lng for p in all_points),
+        min(p.lat for p in all_points),
+        max(p.lng for p in all_points),
+        max(p.lat for p in all_points),
+    )
+    metadata = {
+        "name": "jma-codes points",
+        "format": "pbf",
+        "vector_layers": [
+            {
+                "id": layer,
+                "minzoom": min(zooms[layer], default=MINZOOM),
+                "maxzoom": MAXZOOM,
+                "fields": {
+                    key: _field_type(value)
+                    for point in points
+                    for key, value in point.properties.items()
+                },
+            }
+            for layer, points in layers.items()
+        ],
+    }
+
+    write_pmtiles(
+        OUTPUT,
+        (
+            (z, x, y, gzip.compress(encode_tile(tile), compresslevel=9, mtime=0))
+            for (z, x, y), tile in tiles.items()
+        ),
+        metadata,
+        bounds,
+        ((bounds[0] + bounds[2]) / 2, (bounds[1] + bounds[3]) / 2, 4),
+    )
+    print(f"{OUTPUT}: {len(tiles)} tiles, {OUTPUT.stat().st_size:,} bytes")
+
+
+if __name__ == "__main__":
+    process()
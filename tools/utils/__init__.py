@@ -1,7 +1,21 @@
 """ユーティリティ"""
 
+import hashlib
 from pathlib import Path
 
+# Excel シートのキャッシュを保存するディレクトリを指定する環境変数 (workbook.py)
+SHEET_CACHE_ENV = "JMA_CODES_SHEET_CACHE"
+
+# 指定すると、リモートのデータをキャッシュのみから読む環境変数 (http_cache.py)
+OFFLINE_ENV = "JMA_CODES_OFFLINE"
+
+# 変換中に取得したリモートのデータ (URL -> SHA-256)。ビルドのマニフェストに記録する
+REMOTE_INPUTS: dict[str, str] = {}
+
+
+def record_remote_input(url: str, content: bytes) -> None:
+    REMOTE_INPUTS[url] = hashlib.sha256(content).hexdigest()
+
 
 def get_filename_for(codeType: str) -> str:
     """指定されたコード表に該当するファイルを返す
@@ -0,0 +1,43 @@
+"""DataFrame をカラム単位で加工するためのユーティリティ"""
+
+from typing import Any
+
+import pandas as pd
+
+
+def is_missing(s: pd.Series) -> pd.Series:
+    """欠損値、または文字列 "nan" であるか"""
+
+    return s.isnull() | (s == "nan")
+
+
+def normalize_nfkc(s: pd.Series) -> pd.Series:
+    """文字列の値だけを NFKC 正規化する (それ以外の値はそのまま)"""
+
+    if s.dtype != object:
+        return s
+    normalized = s.str.normalize("NFKC")
+    return normalized.where(normalized.notnull(), s)
+
+
+def strip(s: pd.Series) -> pd.Series:
+    """文字列の値の前後の空白を取り除く (それ以外の値はそのまま)"""
+
+    if s.dtype != object:
+        return s
+    stripped = s.str.strip()
+    return stripped.where(stripped.notnull(), s)
+
+
+def degree_minute(degree: pd.Series, minute: pd.Series) -> pd.Series:
+    """度と分の組を、度の小数に変換する"""
+
+    return degree + minute / 60.0
+
+
+def records(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """各行を、欠損値のカラムを除いた辞書にする"""
+
+    return [
+        {k: v for k, v in r.items() if not pd.isnull(v)} for r in df.to_dict("records")
+    ]
@@ -0,0 +1,172 @@
+"""インターネット上のデータソースのキャッシュ
+
+取得したデータを ./datasrc/remote_cache/ 配下に URL のホスト名とパスに対応する
+ファイル名で保存し、次回以降は ETag / Last-Modified で更新の有無を確認します。
+
+環境変数 JMA_CODES_OFFLINE=1 を指定すると、ネットワークに接続せず
+キャッシュのみを使います (キャッシュがない場合はエラー)。
+キャッシュの場所は環境変数 JMA_CODES_REMOTE_CACHE で変更できます。
+
+接続は1つのセッションで使い回し、タイムアウトと (バックオフ付きの) リトライを設定します。
+fetch_all で複数の URL を並行して取得できます。取得にかかった時間はログに出力します。
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import OFFLINE_ENV, record_remote_input
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "JMA_CODES_REMOTE_CACHE"
+DEFAULT_CACHE_DIR = "./datasrc/remote_cache"
+
+TIMEOUT = (10, 60)  # (接続, 読み込み) 秒
+RETRY = Retry(
+    total=3,
+    backoff_factor=1.0,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=["GET"],
+)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# 同じプロセス内で取得済みのデータ
+_fetched: dict[str, bytes] = {}
+
+
+def session() -> requests.Session:
+    """共有のセッションを返す"""
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(max_retries=RETRY, pool_maxsize=16)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def is_offline() -> bool:
+    return os.environ.get(OFFLINE_ENV, "") not in ("", "0")
+
+
+def cache_dir() -> Path:
+    """キャッシュのディレクトリ (環境変数 JMA_CODES_REMOTE_CACHE で変更できる)"""
+
+    return Path(os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR))
+
+
+def cache_path(url: str) -> Path:
+    """URL に対応するキャッシュファイルのパス"""
+
+    parts = urlsplit(url)
+    path = parts.path.lstrip("/") or "index"
+    if parts.query:
+        path += "?" + parts.query
+    host = parts.netloc.replace(":", "_")
+    return cache_dir() / host / path
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".meta.json")
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """一時ファイルに書いてから置き換える (中断しても書きかけのファイルを残さない)"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def fetch(url: str, headers: Optional[dict[str, str]] = None) -> bytes:
+    """URL の内容を取得する (キャッシュがあれば、更新されている場合のみ取得する)
+
+    同じプロセス内で取得済みの URL は、再び取得せずに同じ内容を返す。
+    いずれの場合も、取得した内容をビルドのマニフェストに記録する
+    """
+
+    if (content := _fetched.get(url)) is None:
+        content = _fetch(url, headers)
+        _fetched[url] = content
+    record_remote_input(url, content)
+    return content
+
+
+def fetch_all(sources: dict[str, Optional[dict[str, str]]]) -> dict[str, bytes]:
+    """複数の URL を並行して取得する
+
+    sources は URL -> リクエストヘッダ
+    """
+
+    with ThreadPoolExecutor(max_workers=max(len(sources), 1)) as executor:
+        futures = {
+            url: executor.submit(fetch, url, headers)
+            for url, headers in sources.items()
+        }
+        return {url: future.result() for url, future in futures.items()}
+
+
+def _fetch(url: str, headers: Optional[dict[str, str]]) -> bytes:
+    path = cache_path(url)
+    meta_path = _meta_path(path)
+
+    if is_offline():
+        if not path.exists():
+            raise RuntimeError(f"{url} is not cached (offline mode)")
+        return path.read_bytes()
+
+    request_headers = dict(headers or {})
+    if path.exists() and meta_path.exists():
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if etag := meta.get("etag"):
+            request_headers["If-None-Match"] = etag
+        if last_modified := meta.get("last_modified"):
+            request_headers["If-Modified-Since"] = last_modified
+
+    t = time.perf_counter()
+    res = session().get(url, headers=request_headers, timeout=TIMEOUT)
+    logger.info(f"{url}: {res.status_code} in {time.perf_counter() - t:.2f} s")
+    if res.status_code == 304:
+        content = path.read_bytes()
+    elif res.status_code >= 300:
+        raise RuntimeError(f"failed to get {url}: {res.status_code}")
+    else:
+        content = res.content
+        meta = {
+            "url": url,
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+        }
+        # 本文とメタデータが食い違わないよう、古いメタデータを消してから本文を書く
+        # (途中で中断すると、次回はメタデータがないため再取得する)
+        meta_path.unlink(missing_ok=True)
+        _write_atomic(path, content)
+        _write_atomic(
+            meta_path,
+            json.dumps(meta, ensure_ascii=False, indent=2).encode("utf-8") + b"\n",
+        )
+
+    return content
@@ -0,0 +1,69 @@
+"""JSON / GeoJSON を1件ずつ書き出す
+
+出力は、全体を json.dump(..., ensure_ascii=False, indent=2) した場合と同じバイト列になります。
+全体の辞書や地物のリストを作らずに、レコードを1件ずつ文字列にして書き出します。
+"""
+
+import json
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, TextIO
+
+INDENT = 2
+
+
+def _dumps(obj: Any, level: int, sort_keys: bool = False) -> str:
+    """level 段の深さに置く値を、json.dump(indent=2) と同じ形で文字列にする"""
+
+    text = json.dumps(obj, sort_keys=sort_keys, ensure_ascii=False, indent=INDENT)
+    return text.replace("\n", "\n" + " " * (INDENT * level))
+
+
+def write_items(f: TextIO, items: Iterable[tuple[Any, Mapping[str, Any]]]) -> None:
+    """{"items": {コード: レコード}} を書き出す
+
+    json.dump({"items": ...}, f, sort_keys=True, ensure_ascii=False, indent=2) と
+    末尾の改行に相当する。items はコードの昇順 (sort_keys と同じ順) で与えること
+    """
+
+    pad = " " * (INDENT * 2)
+    f.write('{\n  "items": {')
+    sep = "\n"
+    for code, record in items:
+        key = json.dumps(str(code), ensure_ascii=False)
+        f.write(f"{sep}{pad}{key}: {_dumps(record, 2, sort_keys=True)}")
+        sep = ",\n"
+    f.write("\n  }\n}\n" if sep != "\n" else "}\n}\n")
+
+
+def point_features(
+    items: Iterable[Mapping[str, Any]], sort_properties: bool = False
+) -> Iterator[dict[str, Any]]:
+    """lnglat を持つレコードから、lnglat 以外のフィールドを properties とする地物を作る"""
+
+    for item in items:
+        if not (lnglat := item.get("lnglat")):
+            continue
+        properties = {k: v for k, v in item.items() if k != "lnglat"}
+        if sort_properties:
+            properties = dict(sorted(properties.items()))
+        yield {
+            "type": "Feature",
+            "properties": properties,
+            "geometry": {"type": "Point", "coordinates": lnglat},
+        }
+
+
+def write_feature_collection(f: TextIO, features: Iterable[Mapping[str, Any]]) -> None:
+    """GeoJSON の FeatureCollection を書き出す
+
+    json.dump({"type": "FeatureCollection", "features": ...}, f,
+    ensure_ascii=False, indent=2) に相当する (末尾の改行なし)
+    """
+
+    pad = " " * (INDENT * 2)
+    f.write('{\n  "type": "FeatureCollection",\n  "features": [')
+    sep = "\n"
+    for feature in features:
+        f.write(f"{sep}{pad}{_dumps(feature, 2)}")
+        sep = ",\n"
+    f.write("\n  ]\n}" if sep != "\n" else "]\n}")
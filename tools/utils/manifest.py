@@ -0,0 +1,83 @@
+"""ビルドのマニフェスト
+
+ステップごとに、入力ファイル・リモートから取得したデータ・出力ファイルの
+ハッシュ値を記録し、前回から変化がないステップを判定できるようにします。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+MANIFEST_PATH = Path("./.cache/build_manifest.json")
+
+# path -> {"sha256": ..., "size": ..., "mtime_ns": ...}
+Fingerprints = dict[str, dict[str, Any]]
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def expand(patterns: list[str]) -> list[str]:
+    """glob パターンに一致するファイルのパスを返す"""
+
+    paths: set[str] = set()
+    for pattern in patterns:
+        paths.update(p.as_posix() for p in Path(".").glob(pattern) if p.is_file())
+    return sorted(paths)
+
+
+def fingerprint(
+    paths: list[str], previous: Optional[Fingerprints] = None
+) -> Fingerprints:
+    """ファイルのハッシュ値を求める
+
+    サイズと更新日時が前回と同じファイルは、前回のハッシュ値を使う
+    """
+
+    previous = previous or {}
+    result: Fingerprints = {}
+    for path in paths:
+        stat = os.stat(path)
+        prev = previous.get(path)
+        if (
+            prev
+            and prev["size"] == stat.st_size
+            and prev["mtime_ns"] == stat.st_mtime_ns
+        ):
+            sha256 = prev["sha256"]
+        else:
+            sha256 = _sha256(path)
+        result[path] = {
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    return result
+
+
+def same_contents(a: Fingerprints, b: Fingerprints) -> bool:
+    """同じファイル群が同じ内容であるか (更新日時は問わない)"""
+
+    return a.keys() == b.keys() and all(a[p]["sha256"] == b[p]["sha256"] for p in a)
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"steps": {}}
+
+
+def save_manifest(manifest: dict[str, Any], path: Path = MANIFEST_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, sort_keys=True, ensure_ascii=False, indent=2)
+        f.write("\n")
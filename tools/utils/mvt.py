@@ -0,0 +1,120 @@
+"""Mapbox Vector Tile (MVT, 仕様 2.1) のエンコーダ
+
+地点 (Point) の地物のみに対応します。Protocol Buffers のエンコードも自前で行います。
+https://github.com/mapbox/vector-tile-spec/tree/master/2.1
+"""
+
+import math
+import struct
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+EXTENT = 4096
+VERSION = 2
+
+_GEOM_POINT = 1
+_MOVE_TO = 1
+
+
+def encode_varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+
+def _tag(number: int, wire_type: int) -> bytes:
+    return encode_varint((number << 3) | wire_type)
+
+
+def _length_delimited(number: int, data: bytes) -> bytes:
+    return _tag(number, 2) + encode_varint(len(data)) + data
+
+
+def _packed(number: int, values: Iterable[int]) -> bytes:
+    return _length_delimited(number, b"".join(encode_varint(v) for v in values))
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bool):
+        return _tag(7, 0) + encode_varint(int(value))
+    if isinstance(value, int):
+        if value < 0:
+            return _tag(6, 0) + encode_varint(_zigzag(value))
+        return _tag(5, 0) + encode_varint(value)
+    if isinstance(value, float):
+        return _tag(3, 1) + struct.pack("<d", value)
+    return _length_delimited(1, str(value).encode("utf-8"))
+
+
+def is_property_value(value: Any) -> bool:
+    """MVT の属性値として書き出せる値か (文字列・数値・真偽値。NaN は除く)"""
+
+    if isinstance(value, float):
+        return not math.isnan(value)
+    return isinstance(value, (str, int, bool))
+
+
+@dataclass
+class PointFeature:
+    x: int  # タイル内の座標 (0 から extent)
+    y: int
+    properties: Mapping[str, Any] = field(default_factory=dict)
+    id: Optional[int] = None
+
+
+def encode_layer(
+    name: str, features: Iterable[PointFeature], extent: int = EXTENT
+) -> bytes:
+    """1つのレイヤをエンコードする"""
+
+    keys: dict[str, int] = {}
+    values: dict[tuple[str, Any], int] = {}
+    encoded_features = []
+    for feature in features:
+        tags = []
+        for key, value in feature.properties.items():
+            if not is_property_value(value):
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value).__name__, value), len(values)))
+        geometry = [(1 << 3) | _MOVE_TO, _zigzag(feature.x), _zigzag(feature.y)]
+        encoded_features.append(
+            (_tag(1, 0) + encode_varint(feature.id) if feature.id is not None else b"")
+            + _packed(2, tags)
+            + _tag(3, 0)
+            + encode_varint(_GEOM_POINT)
+            + _packed(4, geometry)
+        )
+
+    return b"".join(
+        [
+            _tag(15, 0) + encode_varint(VERSION),
+            _length_delimited(1, name.encode("utf-8")),
+            *(_length_delimited(2, f) for f in encoded_features),
+            *(_length_delimited(3, k.encode("utf-8")) for k in keys),
+            *(_length_delimited(4, _encode_value(v)) for _, v in values),
+            _tag(5, 0) + encode_varint(extent),
+        ]
+    )
+
+
+def encode_tile(layers: Mapping[str, Iterable[PointFeature]]) -> bytes:
+    """レイヤ名 -> 地物 からタイルをエンコードする (地物のないレイヤは含めない)"""
+
+    out = []
+    for name, features in layers.items():
+        features = list(features)
+        if features:
+            out.append(_length_delimited(3, encode_layer(name, features)))
+    return b"".join(out)
@@ -0,0 +1,166 @@
+"""PMTiles (v3) 形式のタイルアーカイブの書き出し
+
+タイル群を1つのファイルにまとめ、クライアントが HTTP の Range リクエストで
+必要なタイルだけを読めるようにします。
+https://github.com/protomaps/PMTiles/blob/main/spec/v3/spec.md
+"""
+
+import gzip
+import hashlib
+import json
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .mvt import encode_varint
+
+HEADER_SIZE = 127
+_HEADER = struct.Struct("<7sB11Q6B4iBii")
+ROOT_DIRECTORY_MAX = 16384 - HEADER_SIZE
+
+COMPRESSION_NONE = 1
+COMPRESSION_GZIP = 2
+TILE_TYPE_MVT = 1
+
+
+def tile_id(z: int, x: int, y: int) -> int:
+    """ズームレベルごとのヒルベルト曲線の順に振ったタイルの通し番号"""
+
+    acc = ((1 << (z * 2)) - 1) // 3
+    for a in range(z - 1, -1, -1):
+        s = 1 << a
+        rx = s & x
+        ry = s & y
+        acc += ((3 * rx) ^ ry) << a
+        if ry == 0:
+            if rx != 0:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+    return acc
+
+
+@dataclass
+class Entry:
+    tile_id: int
+    offset: int
+    length: int
+    run_length: int
+
+
+def _compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _serialize_directory(entries: list[Entry]) -> bytes:
+    out = [encode_varint(len(entries))]
+    last_id = 0
+    for e in entries:
+        out.append(encode_varint(e.tile_id - last_id))
+        last_id = e.tile_id
+    out.extend(encode_varint(e.run_length) for e in entries)
+    out.extend(encode_varint(e.length) for e in entries)
+    for i, e in enumerate(entries):
+        prev = entries[i - 1] if i else None
+        if prev is not None and e.offset == prev.offset + prev.length:
+            out.append(encode_varint(0))
+        else:
+            out.append(encode_varint(e.offset + 1))
+    return _compress(b"".join(out))
+
+
+def _build_directories(entries: list[Entry]) -> tuple[bytes, bytes]:
+    """ルートディレクトリと、(ルートに収まらない場合の) リーフディレクトリ群"""
+
+    root = _serialize_directory(entries)
+    if len(root) <= ROOT_DIRECTORY_MAX:
+        return root, b""
+
+    leaf_size = 4096
+    while True:
+        root_entries = []
+        leaves = bytearray()
+        for i in range(0, len(entries), leaf_size):
+            leaf = _serialize_directory(entries[i : i + leaf_size])
+            root_entries.append(Entry(entries[i].tile_id, len(leaves), len(leaf), 0))
+            leaves += leaf
+        root = _serialize_directory(root_entries)
+        if len(root) <= ROOT_DIRECTORY_MAX:
+            return root, bytes(leaves)
+        leaf_size *= 2
+
+
+def write_pmtiles(
+    path: Path,
+    tiles: Iterable[tuple[int, int, int, bytes]],
+    metadata: dict[str, Any],
+    bounds: tuple[float, float, float, float],
+    center: tuple[float, float, int],
+) -> None:
+    """(z, x, y, gzip 圧縮した MVT) のタイル群を PMTiles ファイルに書き出す
+
+    同じ内容のタイルは1つにまとめる。bounds は (西, 南, 東, 北)、center は (経度, 緯度, ズーム)
+    """
+
+    by_id = sorted((tile_id(z, x, y), z, data) for z, x, y, data in tiles)
+    entries: list[Entry] = []
+    offsets: dict[bytes, int] = {}
+    tile_data = bytearray()
+    for tid, _, data in by_id:
+        digest = hashlib.sha256(data).digest()
+        if (offset := offsets.get(digest)) is None:
+            offset = offsets[digest] = len(tile_data)
+            tile_data += data
+        last = entries[-1] if entries else None
+        if (
+            last is not None
+            and last.offset == offset
+            and last.tile_id + last.run_length == tid
+        ):
+            last.run_length += 1
+        else:
+            entries.append(Entry(tid, offset, len(data), 1))
+
+    root, leaves = _build_directories(entries)
+    meta = _compress(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+    zooms = [z for _, z, _ in by_id]
+
+    root_offset = HEADER_SIZE
+    meta_offset = root_offset + len(root)
+    leaves_offset = meta_offset + len(meta)
+    data_offset = leaves_offset + len(leaves)
+    header = _HEADER.pack(
+        b"PMTiles",
+        3,
+        root_offset,
+        len(root),
+        meta_offset,
+        len(meta),
+        leaves_offset,
+        len(leaves),
+        data_offset,
+        len(tile_data),
+        len(by_id),
+        len(entries),
+        len(offsets),
+        1,  # clustered (タイルの並びが通し番号順)
+        COMPRESSION_GZIP,
+        COMPRESSION_GZIP,
+        TILE_TYPE_MVT,
+        min(zooms, default=0),
+        max(zooms, default=0),
+        *(round(v * 1e7) for v in bounds),
+        center[2],
+        round(center[0] * 1e7),
+        round(center[1] * 1e7),
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(root)
+        f.write(meta)
+        f.write(leaves)
+        f.write(tile_data)
@@ -10,60 +10,34 @@ import numpy as np
 import pandas as pd
 import requests
 
-logger = logging.getLogger(__name__)
+from .dataframe import degree_minute
+from .http_cache import fetch, fetch_all
+from .prefecture import PREFECTURE_MAP
 
-_REMOVE_CITY_PAT = re.compile("^.*?(?:市|町|村|区)")
+logger = logging.getLogger(__name__)
 
-PREFECTURE_MAP = {
-    "01": "北海道",
-    "02": "青森県",
-    "03": "岩手県",
-    "04": "宮城県",
-    "05": "秋田県",
-    "06": "山形県",
-    "07": "福島県",
-    "08": "茨城県",
-    "09": "栃木県",
-    "10": "群馬県",
-    "11": "埼玉県",
-    "12": "千葉県",
-    "13": "東京都",
-    "14": "神奈川県",
-    "15": "新潟県",
-    "16": "富山県",
-    "17": "石川県",
-    "18": "福井県",
-    "19": "山梨県",
-    "20": "長野県",
-    "21": "岐阜県",
-    "22": "静岡県",
-    "23": "愛知県",
-    "24": "三重県",
-    "25": "滋賀県",
-    "26": "京都府",
-    "27": "大阪府",
-    "28": "兵庫県",
-    "29": "奈良県",
-    "30": "和歌山県",
-    "31": "鳥取県",
-    "32": "島根県",
-    "33": "岡山県",
-    "34": "広島県",
-    "35": "山口県",
-    "36": "徳島県",
-    "37": "香川県",
-    "38": "愛媛県",
-    "39": "高知県",
-    "40": "福岡県",
-    "41": "佐賀県",
-    "42": "長崎県",
-    "43": "熊本県",
-    "44": "大分県",
-    "45": "宮崎県",
-    "46": "鹿児島県",
-    "47": "沖縄県",
+JMA_SHINDO_URL = "https://www.data.jma.go.jp/eqev/data/kyoshin/jma-shindo.html"
+JMA_STATIONS_URL = "https://www.data.jma.go.jp/eqev/data/intens-st/stations.json"
+NIED_KNET_URL = (
+    "https://www.kyoshin.bosai.go.jp/kyoshin/pubdata/knet/sitedb/sitepub_knet_sj.csv"
+)
+NIED_HEADERS = {"Referer": "https://www.kyoshin.bosai.go.jp/"}
+VOLCANO_LIST_URL = "https://www.jma.go.jp/bosai/volcano/const/volcano_list.json"
+TSUNAMI_STATIONS_URL = (
+    "https://www.data.jma.go.jp/svd/eqev/data/bulletin/data/tsunami/stat_j.txt"
+)
+
+# 座標を取得するインターネット上のソース (URL -> リクエストヘッダ)
+SOURCES: dict[str, Optional[dict[str, str]]] = {
+    JMA_STATIONS_URL: None,
+    JMA_SHINDO_URL: None,
+    NIED_KNET_URL: NIED_HEADERS,
+    VOLCANO_LIST_URL: None,
+    TSUNAMI_STATIONS_URL: None,
 }
 
+_REMOVE_CITY_PAT = re.compile("^.*?(?:市|町|村|区)")
+
 
 @dataclass
 class PointInfo:
@@ -82,6 +56,44 @@ class PointTsunamiInfo:
     owner: str
 
 
+class NameIndex:
+    """文字列に部分文字列として含まれる名前を探すための索引
+
+    文字列の部分文字列のうち、登録された名前と同じ長さのものだけを引く
+    """
+
+    def __init__(self, points: dict[str, PointInfo]):
+        self._points = points
+        self._order = {name: i for i, name in enumerate(points)}
+        self._lengths = sorted({len(name) for name in points})
+
+    def find_in(self, text: str) -> list[PointInfo]:
+        """text に含まれる名前の地点を、登録順に返す"""
+
+        order = self._order
+        found: dict[str, int] = {}
+        for n in self._lengths:
+            for i in range(len(text) - n + 1):
+                if (i_order := order.get(text[i : i + n])) is not None:
+                    found[text[i : i + n]] = i_order
+        return [self._points[name] for name in sorted(found, key=found.__getitem__)]
+
+
+def _allow_weak_dh() -> None:
+    # OpenSSL の警告 DH_KEY_TOO_SMALL を無視する
+    requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS = "ALL:@SECLEVEL=1"
+
+
+def prefetch() -> None:
+    """座標のソースをまとめて並行に取得しておく
+
+    取得した内容は http_cache.fetch が保持し、以降の読み込みで使われる
+    """
+
+    _allow_weak_dh()
+    fetch_all(SOURCES)
+
+
 class IntensityPoints:
     def __init__(self):
         self._load_jma_json()
@@ -94,10 +106,8 @@ class IntensityPoints:
         https://www.data.jma.go.jp/eqev/data/kyoshin/jma-shindo.html#hokkaido
         """
 
-        res = requests.get(
-            "https://www.data.jma.go.jp/eqev/data/kyoshin/jma-shindo.html"
-        )
-        doc = html.fromstring(res.content)
+        content = fetch(JMA_SHINDO_URL)
+        doc = html.fromstring(content)
         self._jma_points = {}
         for tr in doc.iterfind(".//tr"):
             tds = [td.text for td in tr.iterfind("./td")]
@@ -114,10 +124,8 @@ class IntensityPoints:
 
     def _load_jma_json(self) -> None:
         """気象庁の震度観測点マップのJSONを読み込む"""
-        res = requests.get(
-            "https://www.data.jma.go.jp/eqev/data/intens-st/stations.json"
-        )
-        data = res.json()
+        content = fetch(JMA_STATIONS_URL)
+        data = json.loads(content)
         self._jma_json_points = {}
         for station in data:
             name = station["name"]
@@ -135,35 +143,42 @@ class IntensityPoints:
         https://www.kyoshin.bosai.go.jp/kyoshin/db/index.html
         """
 
-        # OpenSSL の警告 DH_KEY_TOO_SMALL を無視する
-        requests.packages.urllib3.util.ssl_.DEFAULT_CIPHERS = "ALL:@SECLEVEL=1"
-
-        res = requests.get(
-            "https://www.kyoshin.bosai.go.jp/kyoshin/pubdata/knet/sitedb/sitepub_knet_sj.csv",
-            headers={"Referer": "https://www.kyoshin.bosai.go.jp/"},
-        )
-        if res.status_code > 300:
-            raise RuntimeError(f"failed to get NIED stations: {res.status_code}")
+        _allow_weak_dh()
+        content = fetch(NIED_KNET_URL, headers=NIED_HEADERS)
         columns = ["code", "name", "name_rome", "lat", "lng", "a", "b", "pref"]
         df = pd.read_csv(
-            io.BytesIO(res.content),
+            io.BytesIO(content),
             encoding="cp932",
             names=np.array(columns),
             usecols=np.array(columns),
         )
 
         self._nied_points = {}
-        for _, row in df.iterrows():
-            pref = row["pref"]
-            name = row["name"]
+        for pref, name, lat, lng in zip(
+            df["pref"].tolist(),
+            df["name"].tolist(),
+            df["lat"].tolist(),
+            df["lng"].tolist(),
+        ):
             info = PointInfo(
                 kind="k-net",
                 name=name,
-                lat=row["lat"],
-                lng=row["lng"],
-                prefecture=row["pref"],
+                lat=lat,
+                lng=lng,
+                prefecture=pref,
             )
             self._nied_points[(pref, name)] = info
+        self._index_nied()
+
+    def _index_nied(self) -> None:
+        """K-net の観測点の、都道府県ごとの名前の索引を作る"""
+
+        by_prefecture: dict[str, dict[str, PointInfo]] = {}
+        for (pref, name), info in self._nied_points.items():
+            by_prefecture.setdefault(pref, {})[name] = info
+        self._nied_index = {
+            pref: NameIndex(points) for pref, points in by_prefecture.items()
+        }
 
     def find_station(self, jma_name: str, jma_city_code: str) -> Optional[PointInfo]:
         # JMA のサイト上のテーブル
@@ -172,13 +187,10 @@ class IntensityPoints:
 
         # NIED K-net CSV
         prefecture = PREFECTURE_MAP[jma_city_code[:2]]
-        found: list[PointInfo] = []
         stripped_jma_name = _REMOVE_CITY_PAT.sub("", jma_name)
-        for (_, name), info in self._nied_points.items():
-            if info.prefecture != prefecture:
-                continue
-            if name in stripped_jma_name:
-                found.append(info)
+        found: list[PointInfo] = []
+        if index := self._nied_index.get(prefecture):
+            found = index.find_in(stripped_jma_name)
         if not found:
             pass
         elif len(found) == 1:
@@ -199,8 +211,8 @@ class IntensityPoints:
 
 
 def get_volc_points():
-    res = requests.get("https://www.jma.go.jp/bosai/volcano/const/volcano_list.json")
-    volcs = res.json()
+    content = fetch(VOLCANO_LIST_URL)
+    volcs = json.loads(content)
     result: dict[str, tuple[float, float]] = {}
     for volc in volcs:
         code = volc["code"]
@@ -216,10 +228,8 @@ def get_volc_points():
 def get_point_tsunami_locations() -> dict[str, PointTsunamiInfo]:
     r: dict[str, PointTsunamiInfo] = {}
 
-    res = requests.get(
-        "https://www.data.jma.go.jp/svd/eqev/data/bulletin/data/tsunami/stat_j.txt"
-    )
-    text = res.content.decode("cp932")
+    content = fetch(TSUNAMI_STATIONS_URL)
+    text = content.decode("cp932")
     text = text.replace("度 分  度 分", "度 分  度 分  所属機関")  # fix headers
     text = text.replace("以下，", "# 以下，")  # comment out
 
@@ -234,14 +244,13 @@ def get_point_tsunami_locations() -> dict[str, PointTsunamiInfo]:
     )
 
     df = df.dropna(subset="度")
+    df = df[~df["コード"].str.startswith("以下")]
 
-    for _, row in df.iterrows():
-        code = row["コード"]
-        if code.startswith("以下"):
-            continue
-        lat = row["度"] + (row["分"] / 60.0)
-        lng = row["度.1"] + (row["分.1"] / 60.0)
-        owner = row["所属機関"]
+    lats = degree_minute(df["度"], df["分"])
+    lngs = degree_minute(df["度.1"], df["分.1"])
+    for code, lat, lng, owner in zip(
+        df["コード"].tolist(), lats.tolist(), lngs.tolist(), df["所属機関"].tolist()
+    ):
         r[code] = PointTsunamiInfo(lat=lat, lng=lng, owner=owner)
 
     with open("./datasrc/manual_input/point_tsunami.json", encoding="utf-8") as f:
@@ -0,0 +1,59 @@
+"""都道府県ごとに分割したファイル (シャード) の書き出し
+
+./json/shards/<表の名前>/<都道府県コード>.json などと、その一覧 index.json を書き出します。
+"""
+
+import json
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import TypeVar
+
+from .prefecture import PREFECTURE_MAP
+
+SHARDS_DIR = Path("./json/shards")
+
+T = TypeVar("T")
+
+
+def group_by_prefecture(
+    items: Iterable[tuple[str, T]], prefecture_of: Callable[[T], str]
+) -> dict[str, list[tuple[str, T]]]:
+    """(コード, レコード) を都道府県コードごとに分ける (都道府県コード順、各々は元の順)"""
+
+    groups: dict[str, list[tuple[str, T]]] = {}
+    for code, item in items:
+        groups.setdefault(prefecture_of(item), []).append((code, item))
+    return dict(sorted(groups.items()))
+
+
+def shard_path(table: str, prefecture: str, suffix: str) -> Path:
+    path = SHARDS_DIR / table / f"{prefecture}{suffix}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def write_shard_index(table: str, counts: dict[str, int], suffixes: list[str]) -> None:
+    """シャードの一覧 (index.json) を書き出し、一覧にない古いシャードを消す"""
+
+    prefectures = {
+        prefecture: {
+            "name": PREFECTURE_MAP[prefecture],
+            "count": count,
+            "files": [f"{prefecture}{suffix}" for suffix in suffixes],
+        }
+        for prefecture, count in counts.items()
+    }
+    with open(shard_path(table, "index", ".json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {"prefectures": prefectures},
+            f,
+            sort_keys=True,
+            ensure_ascii=False,
+            indent=2,
+        )
+        f.write("\n")
+
+    files = {name for p in prefectures.values() for name in p["files"]}
+    for path in (SHARDS_DIR / table).iterdir():
+        if path.name != "index.json" and path.name not in files:
+            path.unlink()
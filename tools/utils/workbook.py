@@ -0,0 +1,80 @@
+"""Excel ワークブックの読み込み
+
+ワークブックはプロセス内で一度だけ開き、シートの読み込み結果もキャッシュします。
+環境変数 JMA_CODES_SHEET_CACHE にディレクトリを指定すると、読み込んだシートを
+pickle で保存し、次回以降は xlrd を使わずにそちらから読み込みます。
+キャッシュはファイルのパスと更新日時・サイズ、読み込みオプションをキーとするため、
+データソースを更新すれば自動的に読み直されます。
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Union
+
+import pandas as pd
+
+from . import SHEET_CACHE_ENV
+
+Sheet = Union[pd.DataFrame, dict[str, pd.DataFrame]]
+
+_sheets: dict[str, Sheet] = {}
+
+
+@lru_cache(maxsize=None)
+def _open_workbook(path: str, mtime_ns: int) -> pd.ExcelFile:
+    return pd.ExcelFile(path)
+
+
+def open_workbook(path: str) -> pd.ExcelFile:
+    """ワークブックを開く
+
+    同じプロセス内では、ファイルが更新されていなければ一度開いたものを使い回す
+    """
+
+    return _open_workbook(path, os.stat(path).st_mtime_ns)
+
+
+def _cache_key(path: str, sheet_name: Any, kwargs: dict[str, Any]) -> str:
+    stat = os.stat(path)
+    key = repr(
+        (
+            os.path.abspath(path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            sheet_name,
+            sorted(kwargs.items()),
+        )
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _copy(sheet: Sheet) -> Sheet:
+    if isinstance(sheet, dict):
+        return {name: df.copy() for name, df in sheet.items()}
+    return sheet.copy()
+
+
+def read_sheet(path: str, sheet_name: Any = 0, **kwargs: Any) -> Sheet:
+    """シートを読み込む
+
+    引数は pd.read_excel と同じ (sheet_name=None の場合はすべてのシートを読み込む)
+    """
+
+    key = _cache_key(path, sheet_name, kwargs)
+    if (sheet := _sheets.get(key)) is None:
+        cache_file = None
+        if cache_dir := os.environ.get(SHEET_CACHE_ENV):
+            cache_file = Path(cache_dir) / f"{key}.pickle"
+
+        if cache_file is not None and cache_file.exists():
+            sheet = pd.read_pickle(cache_file)
+        else:
+            sheet = pd.read_excel(open_workbook(path), sheet_name=sheet_name, **kwargs)
+            if cache_file is not None:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                pd.to_pickle(sheet, cache_file)
+        _sheets[key] = sheet
+
+    return _copy(sheet)
@@ -6,23 +6,24 @@
 
 import json
 
-import pandas
-
 from .utils import get_filename_for
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    df = pandas.read_excel(get_filename_for("WaterLevelStation"), skiprows=2)
-
-    result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        name = row["@name"]
-        river = row["（参考）予報区域名"]
-        result[code] = {
+    df = read_sheet(get_filename_for("WaterLevelStation"), skiprows=2)
+
+    result = {
+        code: {
             "name": name,
             "river": river,
         }
+        for code, name, river in zip(
+            df["@code"].tolist(),
+            df["@name"].tolist(),
+            df["（参考）予報区域名"].tolist(),
+        )
+    }
 
     with open("./json/WaterLevelStation.json", "w") as f:
         json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
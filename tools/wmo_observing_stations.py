@@ -14,58 +14,38 @@
     "MeteorologicalInfos/@type"が"天候情報"の場合に利用
 """
 
-import json
-from typing import cast
-
-import pandas
-
 from .utils import get_filename_for
+from .utils.dataframe import degree_minute
+from .utils.json_writer import point_features, write_feature_collection, write_items
+from .utils.workbook import read_sheet
 
 
 def process() -> None:
-    df = pandas.read_excel(get_filename_for("WmoObservingStations"), skiprows=2)
+    df = read_sheet(get_filename_for("WmoObservingStations"), skiprows=2)
 
+    lat = degree_minute(df["緯度（度）"], df["緯度（分）"])
+    lng = degree_minute(df["経度（度）"], df["経度（分）"])
+
+    # NOTE: @name は従来から出力されていない
     result = {}
-    for _, row in df.iterrows():
-        code = row["@code"]
-        lat = cast(float, row["緯度（度）"]) + cast(float, row["緯度（分）"]) / 60
-        lng = cast(float, row["経度（度）"]) + cast(float, row["経度（分）"]) / 60
+    for code, point, kana, lnglat in zip(
+        df["@code"].tolist(),
+        df["コードが示す地点"].tolist(),
+        df["ふりがな"].tolist(),
+        zip(lng.tolist(), lat.tolist()),
+    ):
         result[code] = {
-            "point": row["コードが示す地点"],
-            "lnglat": [lng, lat],
+            "point": point,
+            "lnglat": list(lnglat),
         }
-        name = (row["@name"],)
-        if isinstance(name, str):
-            result[code]["name"] = name
-        kana = row["ふりがな"]
         if isinstance(kana, str):
             result[code]["kana"] = kana
 
     with open("./json/WmoObservingStations.json", "w") as f:
-        json.dump({"items": result}, f, sort_keys=True, ensure_ascii=False, indent=2)
-        f.write("\n")
-
-    result_geojson = []
-    for item in result.values():
-        lnglat = item.pop("lnglat")
-        result_geojson.append(
-            {
-                "type": "Feature",
-                "properties": item,
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": lnglat,
-                },
-            }
-        )
+        write_items(f, ((code, result[code]) for code in sorted(result)))
 
     with open("./json/WmoObservingStations.geojson", "w") as f:
-        json.dump(
-            {"type": "FeatureCollection", "features": result_geojson},
-            f,
-            ensure_ascii=False,
-            indent=2,
-        )
+        write_feature_collection(f, point_features(result.values()))
 
 
 if __name__ == "__main__":